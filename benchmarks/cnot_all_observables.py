@@ -1,5 +1,6 @@
 import argparse
 from pathlib import Path
+from typing import Sequence
 
 import stim
 from tqecd.construction import annotate_detectors_automatically
@@ -15,14 +16,14 @@ ASSETS_FOLDER = TQEC_FOLDER / "assets"
 CNOT_DAE_FILE = ASSETS_FOLDER / "logical_cnot.dae"
 
 
-def generate_stim_circuit(
-    compiled_graph: CompiledGraph, k: int, p: float
-) -> stim.Circuit:
-    circuit_without_detectors = compiled_graph.generate_stim_circuit(
-        k, noise_model=NoiseModel.uniform_depolarizing(p)
+def generate_stim_circuits(
+    compiled_graph: CompiledGraph, ks: Sequence[int], p: float
+) -> list[stim.Circuit]:
+    circuits_without_detectors = compiled_graph.generate_stim_circuits(
+        ks, noise_model=NoiseModel.uniform_depolarizing(p)
     )
     # For now, we annotate the detectors as post-processing step
-    return annotate_detectors_automatically(circuit_without_detectors)
+    return [annotate_detectors_automatically(c) for c in circuits_without_detectors]
 
 
 def generate_cnot_circuits(*ks: int) -> None:
@@ -40,8 +41,7 @@ def generate_cnot_circuits(*ks: int) -> None:
         observables=[observables[1]],
     )
 
-    for k in ks:
-        _ = generate_stim_circuit(compiled_graph, k, 0.001)
+    _ = generate_stim_circuits(compiled_graph, ks, 0.001)
 
 
 def main() -> None:
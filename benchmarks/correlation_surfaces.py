@@ -0,0 +1,105 @@
+"""Measure the time needed to find all the correlation surfaces of ZX graphs.
+
+The benchmarked graphs are the three CNOTs example from the gallery and
+synthetic CNOT ladders, i.e. ``n`` qubits with a CNOT between qubits ``i`` and
+``i + 1`` at time step ``i + 1``.
+
+Example:
+
+    python correlation_surfaces.py -n 3 4 5 6 --num-workers 1 4
+"""
+
+import argparse
+import time
+from functools import partial
+from typing import Callable, Literal
+
+from tqec.computation.correlation import find_correlation_surfaces
+from tqec.computation.zx_graph import ZXGraph, ZXKind, ZXNode
+from tqec.gallery.three_cnots import three_cnots_zx_graph
+from tqec.position import Position3D
+
+
+def cnot_ladder_zx_graph(n: int, port_kind: Literal["X", "Z", "OPEN"]) -> ZXGraph:
+    """Build the ZX graph of a ladder of ``n - 1`` CNOTs on ``n`` qubits."""
+    g = ZXGraph(f"CNOT ladder on {n} qubits")
+
+    def node(qubit: int, time_step: int) -> ZXNode:
+        if time_step == 0 or time_step == n:
+            label = f"{'In' if time_step == 0 else 'Out'}_{qubit}"
+            return ZXNode(Position3D(qubit, 0, time_step), ZXKind.P, label)
+        kind = ZXKind.X if qubit == time_step else ZXKind.Z
+        return ZXNode(Position3D(qubit, 0, time_step), kind)
+
+    for qubit in range(n):
+        for time_step in range(n):
+            g.add_edge(node(qubit, time_step), node(qubit, time_step + 1))
+    for control in range(n - 1):
+        g.add_edge(node(control, control + 1), node(control + 1, control + 1))
+    if port_kind != "OPEN":
+        g.fill_ports(ZXKind(port_kind))
+    return g
+
+
+def benchmark(
+    build_graph: Callable[[], ZXGraph], num_workers: int, repetitions: int
+) -> tuple[int, float]:
+    best = float("inf")
+    num_surfaces = 0
+    for _ in range(repetitions):
+        zx_graph = build_graph()
+        start = time.perf_counter()
+        num_surfaces = len(find_correlation_surfaces(zx_graph, num_workers))
+        best = min(best, time.perf_counter() - start)
+    return num_surfaces, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n",
+        help="Number of qubits of the benchmarked CNOT ladders.",
+        nargs="+",
+        type=int,
+        default=[3, 4, 5, 6],
+    )
+    parser.add_argument(
+        "--num-workers",
+        help="Number of processes used to search from the different leaves.",
+        nargs="+",
+        type=int,
+        default=[1],
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        help="Number of timed searches for each graph, the best one is reported.",
+        type=int,
+        default=3,
+    )
+    args = parser.parse_args()
+    port_kinds: list[Literal["X", "OPEN"]] = ["X", "OPEN"]
+    graphs: list[tuple[str, Callable[[], ZXGraph]]] = []
+    for port_kind in port_kinds:
+        graphs.append(
+            (f"three CNOTs {port_kind}", partial(three_cnots_zx_graph, port_kind))
+        )
+    for n in args.n:
+        for port_kind in port_kinds:
+            graphs.append(
+                (
+                    f"ladder n={n} {port_kind}",
+                    partial(cnot_ladder_zx_graph, n, port_kind),
+                )
+            )
+    print(f"{'graph':>24} {'workers':>8} {'surfaces':>9} {'time (s)':>10}")
+    for name, build_graph in graphs:
+        for num_workers in args.num_workers:
+            num_surfaces, duration = benchmark(
+                build_graph, num_workers, args.repetitions
+            )
+            print(f"{name:>24} {num_workers:>8} {num_surfaces:>9} {duration:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
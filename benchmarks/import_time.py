@@ -0,0 +1,78 @@
+"""Check that the ``tqec`` command line entry point starts quickly.
+
+The module imported by the ``tqec`` executable is imported in a fresh
+interpreter with ``-X importtime`` and its cumulative import time is compared
+to a budget. The heaviest imported modules are listed to help finding the
+culprit when the budget is exceeded.
+
+Example:
+
+    python import_time.py --budget-ms 300
+"""
+
+import argparse
+import subprocess
+import sys
+
+_ENTRY_POINT_MODULE = "tqec._cli.tqec"
+
+
+def measure_import_times(module: str) -> dict[str, float]:
+    """Return the cumulative import time, in milliseconds, of each module
+    imported when importing ``module`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        cumulative_times[name.strip()] = int(cumulative) / 1000
+    return cumulative_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget-ms",
+        help="Maximum cumulative import time allowed for the entry point.",
+        type=float,
+        default=300,
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        help="Number of timed imports, the best one is compared to the budget.",
+        type=int,
+        default=5,
+    )
+    parser.add_argument(
+        "--top",
+        help="Number of heaviest imported modules to list.",
+        type=int,
+        default=10,
+    )
+    args = parser.parse_args()
+    measurements = [
+        measure_import_times(_ENTRY_POINT_MODULE) for _ in range(args.repetitions)
+    ]
+    best = min(measurements, key=lambda times: times[_ENTRY_POINT_MODULE])
+    total = best[_ENTRY_POINT_MODULE]
+    print(f"Importing {_ENTRY_POINT_MODULE} took {total:.1f} ms.")
+    print(f"{'module':>40} {'cumulative (ms)':>16}")
+    heaviest = sorted(best.items(), key=lambda item: item[1], reverse=True)
+    for name, duration in heaviest[: args.top]:
+        print(f"{name:>40} {duration:>16.1f}")
+    if total > args.budget_ms:
+        print(f"Import time exceeds the budget of {args.budget_ms:.1f} ms.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
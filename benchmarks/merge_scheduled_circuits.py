@@ -0,0 +1,75 @@
+"""Measure how merging plaquette circuits scales with the number of plaquettes.
+
+For each requested size ``n``, a ``n x n`` grid of alternating X and Z
+surface code plaquettes is built and the time spent in
+``merge_scheduled_circuits`` is reported, along with the time per plaquette
+that should stay roughly constant when ``n`` grows.
+
+Example:
+
+    python merge_scheduled_circuits.py -n 10 50 100 200
+"""
+
+import argparse
+import time
+
+from tqec.circuit.schedule import (
+    ScheduledCircuit,
+    merge_scheduled_circuits,
+    relabel_circuits_qubit_indices,
+)
+from tqec.plaquette.library.css import make_css_surface_code_plaquette
+from tqec.position import Displacement
+
+
+def build_plaquette_circuits(n: int) -> list[ScheduledCircuit]:
+    plaquettes = [make_css_surface_code_plaquette(basis) for basis in "XZ"]
+    circuits: list[ScheduledCircuit] = []
+    for i in range(n):
+        for j in range(n):
+            plaquette = plaquettes[(i + j) % 2]
+            offset = Displacement(2 * j, 2 * i)
+            circuits.append(
+                plaquette.circuit.map_to_qubits(
+                    lambda q: q + offset, inplace_qubit_map=False
+                )
+            )
+    return circuits
+
+
+def benchmark_merge(n: int, repetitions: int) -> float:
+    circuits, qubit_map = relabel_circuits_qubit_indices(build_plaquette_circuits(n))
+    mergeable_instructions = make_css_surface_code_plaquette("X").mergeable_instructions
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        merge_scheduled_circuits(circuits, qubit_map, mergeable_instructions)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n",
+        help="Number of plaquettes on each side of the square grids to merge.",
+        nargs="+",
+        type=int,
+        default=[10, 25, 50, 100, 150],
+    )
+    parser.add_argument(
+        "-r",
+        "--repetitions",
+        help="Number of timed merges for each size, the best one is reported.",
+        type=int,
+        default=3,
+    )
+    args = parser.parse_args()
+    print(f"{'plaquettes':>12} {'merge (s)':>12} {'per plaquette (us)':>20}")
+    for n in args.n:
+        duration = benchmark_merge(n, args.repetitions)
+        print(f"{n * n:>12} {duration:>12.4f} {1e6 * duration / (n * n):>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
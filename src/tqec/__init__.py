@@ -1,48 +1,155 @@
-from ._version import __version__
-from .circuit import ScheduledCircuit as ScheduledCircuit
-from .circuit import ScheduleException as ScheduleException
-from .circuit import generate_circuit as generate_circuit
-from .circuit import merge_scheduled_circuits as merge_scheduled_circuits
-from .circuit import QubitMap as QubitMap
-from .compile import compile_block_graph as compile_block_graph
-from .computation import BlockGraph as BlockGraph
-from .computation import BlockKind as BlockKind
-from .computation import Cube as Cube
-from .computation import CubeKind as CubeKind
-from .computation import Pipe as Pipe
-from .computation import PipeKind as PipeKind
-from .computation import Port as Port
-from .computation import YCube as YCube
-from .computation import ZXCube as ZXCube
-from .computation import ZXEdge as ZXEdge
-from .computation import ZXGraph as ZXGraph
-from .computation import ZXKind as ZXKind
-from .computation import ZXNode as ZXNode
-from .exceptions import TQECException as TQECException
-from .interop import RGBA as RGBA
-from .interop import TQECColor as TQECColor
-from .interop import display_collada_model as display_collada_model
-from .interop import read_block_graph_from_dae_file as read_block_graph_from_dae_file
-from .interop import write_block_graph_to_dae_file as write_block_graph_to_dae_file
-from .interval import Interval as Interval
-from .noise_model import NoiseModel as NoiseModel
-from .plaquette import Plaquette as Plaquette
-from .plaquette import PlaquetteQubits as PlaquetteQubits
-from .plaquette import SquarePlaquetteQubits as SquarePlaquetteQubits
-from .plaquette import RPNG as RPNG
-from .plaquette import RG as RG
-from .plaquette import RPNGDescription as RPNGDescription
-from .plaquette import RAPNG as RAPNG
-from .plaquette import RAPNGDescription as RAPNGDescription
-from .plaquette.enums import PlaquetteOrientation as PlaquetteOrientation
-from .position import Direction3D as Direction3D
-from .position import Displacement as Displacement
-from .position import Position2D as Position2D
-from .position import Position3D as Position3D
-from .position import Shape2D as Shape2D
-from .position import SignedDirection3D as SignedDirection3D
-from .scale import LinearFunction as LinearFunction
-from .scale import Scalable2D as Scalable2D
-from .scale import round_or_fail as round_or_fail
-from .templates import Template as Template
-from .templates.enums import TemplateOrientation as TemplateOrientation
+"""The ``tqec`` package.
+
+The objects re-exported here are imported from their submodule on first
+access (see :pep:`562`), so that importing ``tqec``, for example to run the
+command-line interface, does not import heavy dependencies such as
+``matplotlib`` or ``pycollada`` until they are needed. This also applies to
+``__version__``, which is read from the installed package metadata.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._version import __version__ as __version__
+    from .circuit import ScheduledCircuit as ScheduledCircuit
+    from .circuit import ScheduleException as ScheduleException
+    from .circuit import generate_circuit as generate_circuit
+    from .circuit import merge_scheduled_circuits as merge_scheduled_circuits
+    from .circuit import QubitMap as QubitMap
+    from .compile import compile_block_graph as compile_block_graph
+    from .computation import BlockGraph as BlockGraph
+    from .computation import BlockKind as BlockKind
+    from .computation import Cube as Cube
+    from .computation import CubeKind as CubeKind
+    from .computation import Pipe as Pipe
+    from .computation import PipeKind as PipeKind
+    from .computation import Port as Port
+    from .computation import YCube as YCube
+    from .computation import ZXCube as ZXCube
+    from .computation import ZXEdge as ZXEdge
+    from .computation import ZXGraph as ZXGraph
+    from .computation import ZXKind as ZXKind
+    from .computation import ZXNode as ZXNode
+    from .exceptions import TQECException as TQECException
+    from .interop import RGBA as RGBA
+    from .interop import TQECColor as TQECColor
+    from .interop import display_collada_model as display_collada_model
+    from .interop import (
+        read_block_graph_from_dae_file as read_block_graph_from_dae_file,
+    )
+    from .interop import write_block_graph_to_dae_file as write_block_graph_to_dae_file
+    from .interval import Interval as Interval
+    from .noise_model import NoiseModel as NoiseModel
+    from .noise_model import ParametricNoisyCircuit as ParametricNoisyCircuit
+    from .plaquette import Plaquette as Plaquette
+    from .plaquette import PlaquetteQubits as PlaquetteQubits
+    from .plaquette import SquarePlaquetteQubits as SquarePlaquetteQubits
+    from .plaquette import RPNG as RPNG
+    from .plaquette import RG as RG
+    from .plaquette import RPNGDescription as RPNGDescription
+    from .plaquette import RAPNG as RAPNG
+    from .plaquette import RAPNGDescription as RAPNGDescription
+    from .plaquette.enums import PlaquetteOrientation as PlaquetteOrientation
+    from .position import Direction3D as Direction3D
+    from .position import Displacement as Displacement
+    from .position import Position2D as Position2D
+    from .position import Position3D as Position3D
+    from .position import Shape2D as Shape2D
+    from .position import SignedDirection3D as SignedDirection3D
+    from .scale import LinearFunction as LinearFunction
+    from .scale import Scalable2D as Scalable2D
+    from .scale import round_or_fail as round_or_fail
+    from .templates import Template as Template
+    from .templates.enums import TemplateOrientation as TemplateOrientation
+
+_LAZY_IMPORTS: dict[str, str] = {
+    "__version__": "._version",
+    "ScheduledCircuit": ".circuit",
+    "ScheduleException": ".circuit",
+    "generate_circuit": ".circuit",
+    "merge_scheduled_circuits": ".circuit",
+    "QubitMap": ".circuit",
+    "compile_block_graph": ".compile",
+    "BlockGraph": ".computation",
+    "BlockKind": ".computation",
+    "Cube": ".computation",
+    "CubeKind": ".computation",
+    "Pipe": ".computation",
+    "PipeKind": ".computation",
+    "Port": ".computation",
+    "YCube": ".computation",
+    "ZXCube": ".computation",
+    "ZXEdge": ".computation",
+    "ZXGraph": ".computation",
+    "ZXKind": ".computation",
+    "ZXNode": ".computation",
+    "TQECException": ".exceptions",
+    "RGBA": ".interop",
+    "TQECColor": ".interop",
+    "display_collada_model": ".interop",
+    "read_block_graph_from_dae_file": ".interop",
+    "write_block_graph_to_dae_file": ".interop",
+    "Interval": ".interval",
+    "NoiseModel": ".noise_model",
+    "ParametricNoisyCircuit": ".noise_model",
+    "Plaquette": ".plaquette",
+    "PlaquetteQubits": ".plaquette",
+    "SquarePlaquetteQubits": ".plaquette",
+    "RPNG": ".plaquette",
+    "RG": ".plaquette",
+    "RPNGDescription": ".plaquette",
+    "RAPNG": ".plaquette",
+    "RAPNGDescription": ".plaquette",
+    "PlaquetteOrientation": ".plaquette.enums",
+    "Direction3D": ".position",
+    "Displacement": ".position",
+    "Position2D": ".position",
+    "Position3D": ".position",
+    "Shape2D": ".position",
+    "SignedDirection3D": ".position",
+    "LinearFunction": ".scale",
+    "Scalable2D": ".scale",
+    "round_or_fail": ".scale",
+    "Template": ".templates",
+    "TemplateOrientation": ".templates.enums",
+}
+"""Maps each lazily re-exported object to the module it is imported from."""
+
+_SUBMODULES = frozenset(
+    [
+        "circuit",
+        "compile",
+        "computation",
+        "exceptions",
+        "gallery",
+        "interop",
+        "interval",
+        "noise_model",
+        "plaquette",
+        "position",
+        "scale",
+        "simulation",
+        "templates",
+    ]
+)
+"""Submodules that can be accessed as attributes without importing them."""
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache the value so that __getattr__ is only called once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_IMPORTS, *_SUBMODULES})
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from typing_extensions import override
+
+from tqec._cli.subcommands.base import TQECSubCommand
+
+_NOISE_MODELS = ["uniform_depolarizing", "si1000"]
+"""Names of the :class:`~tqec.noise_model.NoiseModel` static methods that can
+be used to build the applied noise model."""
+
+
+class AddNoiseTQECSubCommand(TQECSubCommand):
+    @staticmethod
+    @override
+    def add_subcommand(
+        main_parser: argparse._SubParsersAction[argparse.ArgumentParser],
+    ) -> None:
+        parser: argparse.ArgumentParser = main_parser.add_parser(
+            "add-noise",
+            description=(
+                "Apply a noise model to existing .stim files. Files are streamed "
+                "and never entirely loaded in memory."
+            ),
+        )
+        parser.add_argument(
+            "stim_files",
+            help="The .stim files to apply noise to.",
+            nargs="+",
+            type=Path,
+        )
+        parser.add_argument(
+            "--out-dir",
+            help=(
+                "Directory to save the noisy circuits to. Each noisy circuit has "
+                "the same file name as the circuit it has been built from."
+            ),
+            type=Path,
+            required=True,
+        )
+        parser.add_argument(
+            "--noise-model",
+            help="The noise model to apply.",
+            choices=_NOISE_MODELS,
+            default="uniform_depolarizing",
+        )
+        parser.add_argument(
+            "-p",
+            help="The noise strength of the noise model.",
+            type=float,
+            required=True,
+        )
+        parser.add_argument(
+            "--num-workers",
+            help="Number of processes used to apply noise to several files.",
+            type=int,
+            default=1,
+        )
+        parser.set_defaults(func=AddNoiseTQECSubCommand.execute)
+
+    @staticmethod
+    @override
+    def execute(args: argparse.Namespace) -> None:
+        import itertools
+        from concurrent.futures import ProcessPoolExecutor
+
+        from tqec.noise_model import NoiseModel, write_noisy_stim_file
+
+        out_dir: Path = args.out_dir.resolve()
+        if not out_dir.exists():
+            out_dir.mkdir(parents=True)
+        input_paths: list[Path] = [path.resolve() for path in args.stim_files]
+        output_paths = [out_dir / path.name for path in input_paths]
+        if len(set(output_paths)) != len(output_paths):
+            raise ValueError("The provided .stim files should have distinct names.")
+        if any(path in input_paths for path in output_paths):
+            raise ValueError("The output directory would overwrite input files.")
+        noise_model: NoiseModel = getattr(NoiseModel, args.noise_model)(args.p)
+
+        num_workers: int = args.num_workers
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                list(
+                    executor.map(
+                        write_noisy_stim_file,
+                        input_paths,
+                        output_paths,
+                        itertools.repeat(noise_model),
+                    )
+                )
+        else:
+            for input_path, output_path in zip(input_paths, output_paths):
+                write_noisy_stim_file(input_path, output_path, noise_model)
+        print(f"Write noisy circuits to {out_dir}.")
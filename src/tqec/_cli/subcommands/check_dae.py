@@ -6,7 +6,6 @@ from pathlib import Path
 from typing_extensions import override
 
 from tqec._cli.subcommands.base import TQECSubCommand
-from tqec.computation.block_graph import BlockGraph
 
 
 class CheckDaeTQECSubCommand(TQECSubCommand):
@@ -25,6 +24,8 @@ class CheckDaeTQECSubCommand(TQECSubCommand):
     @staticmethod
     @override
     def execute(args: argparse.Namespace) -> None:
+        from tqec.computation.block_graph import BlockGraph
+
         dae_absolute_path: Path = args.dae_file.resolve()
         try:
             BlockGraph.from_dae_file(
@@ -3,14 +3,9 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from tqecd.construction import annotate_detectors_automatically
 from typing_extensions import override
 
 from tqec._cli.subcommands.base import TQECSubCommand
-from tqec._cli.subcommands.dae2observables import save_correlation_surfaces_to
-from tqec.compile.compile import compile_block_graph
-from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_BUILDER
-from tqec.computation.block_graph import BlockGraph
 
 
 class Dae2CircuitsTQECSubCommand(TQECSubCommand):
@@ -58,12 +53,31 @@ class Dae2CircuitsTQECSubCommand(TQECSubCommand):
             help="Whether to add detectors to the circuits.",
             action="store_true",
         )
+        parser.add_argument(
+            "--cache-dir",
+            help=(
+                "Directory used to cache the observables and the compiled graph. "
+                "Re-running on an unchanged .dae file re-uses the cached results."
+            ),
+            type=Path,
+        )
         # TODO: add noise models
         parser.set_defaults(func=Dae2CircuitsTQECSubCommand.execute)
 
     @staticmethod
     @override
     def execute(args: argparse.Namespace) -> None:
+        from tqecd.construction import annotate_detectors_automatically
+
+        from tqec._cli.subcommands.dae2observables import save_correlation_surfaces_to
+        from tqec.compile.cache import CompilationCache
+        from tqec.compile.compile import compile_block_graph
+        from tqec.compile.specs.library.css import (
+            CSS_BLOCK_BUILDER,
+            CSS_SUBSTITUTION_BUILDER,
+        )
+        from tqec.computation.block_graph import BlockGraph
+
         dae_absolute_path: Path = args.dae_file.resolve()
         out_dir: Path = args.out_dir.resolve()
         if not out_dir.exists():
@@ -79,8 +93,15 @@ class Dae2CircuitsTQECSubCommand(TQECSubCommand):
         # Save the plotted observables to a subdirectory
         observable_out_dir = out_dir / "observables"
         observable_out_dir.mkdir(exist_ok=True)
+        cache: CompilationCache | None = (
+            CompilationCache(args.cache_dir.resolve())
+            if args.cache_dir is not None
+            else None
+        )
         abstract_observables, correlation_surfaces = (
-            block_graph.get_abstract_observables()
+            cache.get_abstract_observables(block_graph)
+            if cache is not None
+            else block_graph.get_abstract_observables()
         )
         obs_indices: list[int] = args.obs_include
         if not obs_indices:
@@ -99,7 +120,10 @@ class Dae2CircuitsTQECSubCommand(TQECSubCommand):
         # Compile the block graph and generate stim circuits
         circuits_out_dir = out_dir / "circuits"
         circuits_out_dir.mkdir(exist_ok=True)
-        compiled_graph = compile_block_graph(
+        compile_graph = (
+            cache.compile_block_graph if cache is not None else compile_block_graph
+        )
+        compiled_graph = compile_graph(
             block_graph,
             CSS_BLOCK_BUILDER,
             CSS_SUBSTITUTION_BUILDER,
@@ -108,8 +132,12 @@ class Dae2CircuitsTQECSubCommand(TQECSubCommand):
         ks: list[int] = args.k
         add_detectors: bool = args.add_detectors
         for k in ks:
-            circuit = compiled_graph.generate_stim_circuit(k)
+            circuit_path = circuits_out_dir / f"{k=}.stim"
             if add_detectors:
+                circuit = compiled_graph.generate_stim_circuit(k)
                 circuit = annotate_detectors_automatically(circuit)
-            circuit.to_file(circuits_out_dir / f"{k=}.stim")
+                circuit.to_file(circuit_path)
+            else:
+                # Stream the circuit to the file to avoid holding it in memory.
+                compiled_graph.write_stim_circuit(circuit_path, k)
             print(f"Write circuit to {circuits_out_dir}.")
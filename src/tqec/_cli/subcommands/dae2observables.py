@@ -3,17 +3,15 @@ from __future__ import annotations
 import argparse
 import os
 from pathlib import Path
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.axes3d import Axes3D
 from typing_extensions import override
 
 from tqec._cli.subcommands.base import TQECSubCommand
-from tqec.computation.block_graph import BlockGraph
-from tqec.computation.correlation import CorrelationSurface
-from tqec.computation.zx_graph import ZXGraph
-from tqec.computation.zx_plot import draw_correlation_surface_on, draw_zx_graph_on
+
+if TYPE_CHECKING:
+    from tqec.computation.correlation import CorrelationSurface
+    from tqec.computation.zx_graph import ZXGraph
 
 
 class Dae2ObservablesTQECSubCommand(TQECSubCommand):
@@ -39,6 +37,8 @@ class Dae2ObservablesTQECSubCommand(TQECSubCommand):
     @staticmethod
     @override
     def execute(args: argparse.Namespace) -> None:
+        from tqec.computation.block_graph import BlockGraph
+
         dae_absolute_path: Path = args.dae_file.resolve()
         block_graph = BlockGraph.from_dae_file(
             dae_absolute_path, graph_name=str(dae_absolute_path)
@@ -60,6 +60,14 @@ class Dae2ObservablesTQECSubCommand(TQECSubCommand):
 def save_correlation_surfaces_to(
     zx_graph: ZXGraph, out_dir: Path, correlation_surfaces: list[CorrelationSurface]
 ) -> None:
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.axes3d import Axes3D
+
+    from tqec.computation.zx_plot import (
+        draw_correlation_surface_on,
+        draw_zx_graph_on,
+    )
+
     for i, correlation_surface in enumerate(correlation_surfaces):
         fig = plt.figure(figsize=(5, 6))
         ax = cast(Axes3D, fig.add_subplot(111, projection="3d"))
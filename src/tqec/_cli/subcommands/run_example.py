@@ -2,25 +2,12 @@ from __future__ import annotations
 
 import argparse
 import logging
-from multiprocessing import cpu_count
 from pathlib import Path
 from typing import Literal
 
-import matplotlib.pyplot as plt
-import numpy as np
-import sinter
 from typing_extensions import override
 
 from tqec._cli.subcommands.base import TQECSubCommand
-from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_BUILDER
-from tqec.compile.specs.library.zxxz import (
-    ZXXZ_BLOCK_BUILDER,
-    ZXXZ_SUBSTITUTION_BUILDER,
-)
-from tqec.gallery import logical_cnot_block_graph
-from tqec.noise_model import NoiseModel
-from tqec.simulation.plotting.inset import plot_observable_as_inset
-from tqec.simulation.simulation import start_simulation_using_sinter
 
 
 class RunExampleTQECSubCommand(TQECSubCommand):
@@ -52,10 +39,12 @@ class RunExampleTQECSubCommand(TQECSubCommand):
 
         parser.add_argument(
             "-p",
-            help="The noise levels applied to the simulation.",
+            help=(
+                "The noise levels applied to the simulation. Default to 10 "
+                "noise levels logarithmically spaced between 1e-4 and 1e-1."
+            ),
             nargs="+",
             type=float,
-            default=list(np.logspace(-4, -1, 10)),
         )
 
         parser.add_argument(
@@ -84,6 +73,25 @@ class RunExampleTQECSubCommand(TQECSubCommand):
     @staticmethod
     @override
     def execute(args: argparse.Namespace) -> None:
+        from multiprocessing import cpu_count
+
+        import matplotlib.pyplot as plt
+        import numpy as np
+        import sinter
+
+        from tqec.compile.specs.library.css import (
+            CSS_BLOCK_BUILDER,
+            CSS_SUBSTITUTION_BUILDER,
+        )
+        from tqec.compile.specs.library.zxxz import (
+            ZXXZ_BLOCK_BUILDER,
+            ZXXZ_SUBSTITUTION_BUILDER,
+        )
+        from tqec.gallery import logical_cnot_block_graph
+        from tqec.noise_model import NoiseModel
+        from tqec.simulation.plotting.inset import plot_observable_as_inset
+        from tqec.simulation.simulation import start_simulation_using_sinter
+
         # Parse args
         logging.info("Parsing arguments.")
         out_dir: Path = args.out_dir.resolve()
@@ -91,7 +99,9 @@ class RunExampleTQECSubCommand(TQECSubCommand):
         style: str = args.code_style
         port_type: Literal["X", "Z"] = args.basis
         ks: list[int] = args.k
-        ps: list[float] = args.p
+        ps: list[float] = (
+            args.p if args.p is not None else list(np.logspace(-4, -1, 10))
+        )
 
         # Set up the output directories
         logging.info("Setting up output directories.")
@@ -1,6 +1,7 @@
 import argparse
 import sys
 
+from tqec._cli.subcommands.add_noise import AddNoiseTQECSubCommand
 from tqec._cli.subcommands.check_dae import CheckDaeTQECSubCommand
 from tqec._cli.subcommands.dae2observables import Dae2ObservablesTQECSubCommand
 from tqec._cli.subcommands.dae2circuits import Dae2CircuitsTQECSubCommand
@@ -18,6 +19,7 @@ def main() -> None:
     CheckDaeTQECSubCommand.add_subcommand(subparser)
     Dae2CircuitsTQECSubCommand.add_subcommand(subparser)
     RunExampleTQECSubCommand.add_subcommand(subparser)
+    AddNoiseTQECSubCommand.add_subcommand(subparser)
 
     args = parser.parse_args(args=None if sys.argv[1:] else ["--help"])
     args.func(args)
@@ -18,9 +18,15 @@ Note that these methods do not work with ``REPEAT`` instructions.
 
 from __future__ import annotations
 
+import itertools
+
 import numpy
 import numpy.typing as npt
+import stim
 
+from tqec.circuit.moment import Moment
+from tqec.circuit.qubit import GridQubit
+from tqec.circuit.qubit_map import QubitMap
 from tqec.circuit.schedule import (
     ScheduledCircuit,
     merge_scheduled_circuits,
@@ -120,6 +126,237 @@ def generate_circuit_from_instantiation(
     if indices[0] == 0:
         indices = indices[1:]
 
+    if all(_is_tileable(plaquettes[i].circuit) for i in indices):
+        return _generate_tiled_circuit(plaquette_array, plaquettes, increments, indices)
+    return _generate_merged_circuit(plaquette_array, plaquettes, increments, indices)
+
+
+def _is_tileable(circuit: ScheduledCircuit) -> bool:
+    """Check if ``circuit`` can be used by :func:`_generate_tiled_circuit`.
+
+    Tiling requires that all the instruction targets are plain qubit targets,
+    so that translating the circuit only amounts to changing the target values.
+    """
+    return all(
+        target.is_qubit_target and not target.is_inverted_result_target
+        for moment in circuit.moments
+        for instruction in moment.instructions
+        for target in instruction.targets_copy()
+    )
+
+
+def _generate_tiled_circuit(
+    plaquette_array: npt.NDArray[numpy.int_],
+    plaquettes: Plaquettes,
+    increments: Displacement,
+    indices: npt.NDArray[numpy.int_],
+) -> ScheduledCircuit:
+    """Generate the circuit by tiling each distinct plaquette circuit.
+
+    All the instances of a given plaquette apply the same circuit, up to a
+    translation. Instead of building, relabelling and merging one circuit per
+    instance, the global qubit indices of all the translated plaquette qubits
+    are computed at once and each instruction of each distinct plaquette is
+    translated for all its instances in a single array operation.
+
+    The returned circuit is exactly the one that would be obtained by merging
+    the circuits of each instance with
+    :func:`~tqec.circuit.schedule.manipulation.merge_scheduled_circuits`:
+    qubits are indexed in sorted order, non-mergeable instructions appear in
+    the row-major order of the instances and mergeable instructions are
+    de-duplicated and appended at the end of each moment.
+    """
+    _, num_columns = plaquette_array.shape
+    mergeable_instructions: set[str] = set()
+    # Row-major rank of each instance, used to order the instructions.
+    instance_ranks: list[npt.NDArray[numpy.int_]] = []
+    # Column of each plaquette-local qubit index in the global index arrays.
+    local_columns: list[dict[int, int]] = []
+    coordinates: list[npt.NDArray[numpy.int_]] = []
+    for plaquette_index in indices:
+        plaquette = plaquettes[plaquette_index]
+        mergeable_instructions |= plaquette.mergeable_instructions
+        rows, columns = numpy.nonzero(plaquette_array == plaquette_index)
+        instance_ranks.append(rows * num_columns + columns)
+        offsets = numpy.stack(
+            [
+                plaquette.origin.x + columns * increments.x,
+                plaquette.origin.y + rows * increments.y,
+            ],
+            axis=-1,
+        )
+        qubit_map = plaquette.circuit.qubit_map
+        local_columns.append({i: c for c, i in enumerate(qubit_map.indices)})
+        local_coordinates = numpy.array(
+            [(q.x, q.y) for q in qubit_map.qubits], dtype=numpy.int_
+        ).reshape(-1, 2)
+        coordinates.append(
+            offsets[:, numpy.newaxis, :] + local_coordinates[numpy.newaxis, :, :]
+        )
+
+    # Sorting the coordinates lexicographically matches GridQubit ordering, so
+    # the global qubit indices are the same as the ones that would be assigned
+    # by relabel_circuits_qubit_indices.
+    unique_coordinates, inverse = numpy.unique(
+        numpy.concatenate([c.reshape(-1, 2) for c in coordinates]),
+        axis=0,
+        return_inverse=True,
+    )
+    inverse = inverse.reshape(-1)
+    sizes = [c.shape[0] * c.shape[1] for c in coordinates]
+    global_indices: list[npt.NDArray[numpy.int_]] = [
+        block.reshape(c.shape[0], c.shape[1])
+        for block, c in zip(numpy.split(inverse, numpy.cumsum(sizes)[:-1]), coordinates)
+    ]
+    global_qubit_map = QubitMap(
+        {i: GridQubit(x, y) for i, (x, y) in enumerate(unique_coordinates.tolist())}
+    )
+
+    moments_by_schedule: dict[int, list[tuple[int, Moment]]] = {}
+    for i, plaquette_index in enumerate(indices):
+        for schedule, moment in plaquettes[plaquette_index].circuit.scheduled_moments:
+            moments_by_schedule.setdefault(schedule, []).append((i, moment))
+
+    all_schedules = sorted(moments_by_schedule)
+    all_moments = [
+        _tile_moments(
+            moments_by_schedule[schedule],
+            instance_ranks,
+            local_columns,
+            global_indices,
+            frozenset(mergeable_instructions),
+        )
+        for schedule in all_schedules
+    ]
+    return ScheduledCircuit(
+        all_moments, all_schedules, global_qubit_map, _avoid_checks=True
+    )
+
+
+def _tile_moments(
+    moments: list[tuple[int, Moment]],
+    instance_ranks: list[npt.NDArray[numpy.int_]],
+    local_columns: list[dict[int, int]],
+    global_indices: list[npt.NDArray[numpy.int_]],
+    mergeable_instructions: frozenset[str],
+) -> Moment:
+    """Build the moment obtained by applying each of the provided moments on
+    all the instances of the plaquette it comes from.
+
+    Args:
+        moments: pairs ``(i, moment)`` where ``i`` is the position of the
+            plaquette in the other arguments.
+        instance_ranks: row-major rank of each instance of each plaquette.
+        local_columns: mapping from plaquette-local qubit indices to columns of
+            the arrays in ``global_indices``.
+        global_indices: global qubit indices of shape
+            ``(num_instances, num_local_qubits)`` for each plaquette.
+        mergeable_instructions: names of the instructions that should be
+            de-duplicated.
+
+    Returns:
+        the tiled moment.
+    """
+    instruction_keys: dict[tuple[str, tuple[float, ...]], int] = {}
+    # One block per instruction of each plaquette moment. Each block describes
+    # one piece of the final instruction stream per instance.
+    block_ranks: list[npt.NDArray[numpy.int_]] = []
+    block_positions: list[npt.NDArray[numpy.int_]] = []
+    block_keys: list[npt.NDArray[numpy.int_]] = []
+    block_targets: list[npt.NDArray[numpy.int_]] = []
+    mergeable_groups: dict[int, list[npt.NDArray[numpy.int_]]] = {}
+    mergeable_first_appearance: dict[int, tuple[int, int]] = {}
+    for i, moment in moments:
+        ranks = instance_ranks[i]
+        for position, instruction in enumerate(moment.instructions):
+            key = instruction_keys.setdefault(
+                (instruction.name, tuple(instruction.gate_args_copy())),
+                len(instruction_keys),
+            )
+            groups = instruction.target_groups()
+            group_columns = [[local_columns[i][t.value] for t in g] for g in groups]
+            if instruction.name in mergeable_instructions:
+                group_size = len(group_columns[0]) if group_columns else 1
+                mergeable_groups.setdefault(key, []).append(
+                    global_indices[i][
+                        :, list(itertools.chain.from_iterable(group_columns))
+                    ].reshape(-1, group_size)
+                )
+                appearance = (int(ranks[0]), position)
+                mergeable_first_appearance[key] = min(
+                    mergeable_first_appearance.get(key, appearance), appearance
+                )
+                continue
+            # Translations preserve the ordering of qubits, so target groups
+            # can be sorted once for all the instances.
+            first_instance = global_indices[i][0]
+            group_columns.sort(key=lambda g: tuple(first_instance[g].tolist()))
+            block_ranks.append(ranks)
+            block_positions.append(numpy.full_like(ranks, position))
+            block_keys.append(numpy.full_like(ranks, key))
+            block_targets.append(
+                global_indices[i][:, list(itertools.chain.from_iterable(group_columns))]
+            )
+
+    names_and_args = list(instruction_keys)
+    # Appending a large number of targets with stim.Circuit.append is much
+    # slower than parsing them, so the moment is built from its text form.
+    lines: list[str] = []
+    if block_targets:
+        # Order the pieces as the instances were iterated in row-major order,
+        # and gather their targets in that order.
+        widths = numpy.concatenate(
+            [
+                numpy.full(t.shape[0], t.shape[1], dtype=numpy.int_)
+                for t in block_targets
+            ]
+        )
+        starts = numpy.cumsum(widths) - widths
+        order = numpy.lexsort(
+            (numpy.concatenate(block_positions), numpy.concatenate(block_ranks))
+        )
+        ordered_widths = widths[order]
+        ordered_ends = numpy.cumsum(ordered_widths)
+        gather = numpy.repeat(
+            starts[order] - ordered_ends + ordered_widths, ordered_widths
+        )
+        gather += numpy.arange(gather.size)
+        targets = numpy.concatenate([t.ravel() for t in block_targets])[gather]
+        # Consecutive pieces with the same instruction are appended at once.
+        keys = numpy.concatenate(block_keys)[order]
+        run_starts = numpy.flatnonzero(numpy.diff(keys, prepend=-1))
+        run_ends = numpy.append(run_starts[1:], keys.size)
+        for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+            name, args = names_and_args[keys[run_start]]
+            begin = int(ordered_ends[run_start] - ordered_widths[run_start])
+            end = int(ordered_ends[run_end - 1])
+            lines.append(_instruction_line(name, args, targets[begin:end]))
+    for key in sorted(mergeable_groups, key=mergeable_first_appearance.__getitem__):
+        name, args = names_and_args[key]
+        groups = numpy.unique(numpy.concatenate(mergeable_groups[key]), axis=0)
+        lines.append(_instruction_line(name, args, groups.ravel()))
+    return Moment(stim.Circuit("\n".join(lines)))
+
+
+def _instruction_line(
+    name: str, args: tuple[float, ...], targets: npt.NDArray[numpy.int_]
+) -> str:
+    """Return the ``stim`` text representation of an instruction."""
+    parenthesized_args = f"({','.join(map(repr, args))})" if args else ""
+    return f"{name}{parenthesized_args} {' '.join(map(str, targets.tolist()))}"
+
+
+def _generate_merged_circuit(
+    plaquette_array: npt.NDArray[numpy.int_],
+    plaquettes: Plaquettes,
+    increments: Displacement,
+    indices: npt.NDArray[numpy.int_],
+) -> ScheduledCircuit:
+    """Generate the circuit by merging one circuit per plaquette instance.
+
+    This is the generic implementation, used when some plaquette circuits
+    cannot be tiled by :func:`_generate_tiled_circuit`.
+    """
     # Plaquettes indices are starting at 1 in template_plaquettes. To avoid
     # offsets in the following code, we add an empty circuit at position 0.
     plaquette_circuits = {0: ScheduledCircuit.empty()} | {
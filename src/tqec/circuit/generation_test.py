@@ -1,11 +1,27 @@
+import numpy
+import pytest
 import stim
 
-from tqec.circuit.generation import generate_circuit
+from tqec.circuit.generation import (
+    _generate_merged_circuit,  # pyright: ignore[reportPrivateUsage]
+    _generate_tiled_circuit,  # pyright: ignore[reportPrivateUsage]
+    generate_circuit,
+    generate_circuit_from_instantiation,
+)
+from tqec.circuit.qubit_map import QubitMap
+from tqec.circuit.schedule import ScheduledCircuit
+from tqec.compile.specs.library._utils import (
+    _build_plaquettes_for_rotated_surface_code,  # pyright: ignore[reportPrivateUsage]
+)
+from tqec.computation.cube import ZXBasis
 from tqec.plaquette.enums import PlaquetteOrientation
 from tqec.plaquette.frozendefaultdict import FrozenDefaultDict
 from tqec.plaquette.library import make_css_surface_code_plaquette
-from tqec.plaquette.plaquette import Plaquettes
+from tqec.plaquette.plaquette import Plaquette, Plaquettes
+from tqec.plaquette.qubit import SquarePlaquetteQubits
+from tqec.position import Displacement
 from tqec.templates._testing import FixedTemplate
+from tqec.templates.qubit import QubitTemplate
 
 
 def test_generate_circuit_one_plaquette() -> None:
@@ -73,3 +89,60 @@ TICK
 M 3 9
 MX 4 8
 """)
+
+
+@pytest.mark.parametrize("k", [1, 2, 5])
+def test_tiled_circuit_matches_merged_circuit(k: int) -> None:
+    template = QubitTemplate()
+    plaquette_array = template.instantiate(k)
+    plaquettes = _build_plaquettes_for_rotated_surface_code(
+        make_css_surface_code_plaquette, "HORIZONTAL", temporal_basis=ZXBasis.Z
+    )
+    indices = numpy.unique(plaquette_array)
+    increments = template.get_increments()
+    tiled = _generate_tiled_circuit(plaquette_array, plaquettes, increments, indices)
+    merged = _generate_merged_circuit(plaquette_array, plaquettes, increments, indices)
+    assert tiled.qubit_map == merged.qubit_map
+    assert tiled.get_circuit() == merged.get_circuit()
+
+
+def test_tiled_circuit_with_gate_arguments() -> None:
+    qubits = SquarePlaquetteQubits()
+    plaquette = Plaquette(
+        "noisy",
+        qubits,
+        ScheduledCircuit.from_circuit(
+            stim.Circuit(
+                "RX 0\nTICK\nDEPOLARIZE1(0.125) 0 1\nX_ERROR(0.5) 4\nTICK\nM 4"
+            ),
+            qubit_map=QubitMap.from_qubits(qubits),
+        ),
+        mergeable_instructions=frozenset(["RX"]),
+    )
+    plaquette_array = numpy.array([[1, 1], [1, 1]])
+    plaquettes = Plaquettes(FrozenDefaultDict({1: plaquette}))
+    indices = numpy.array([1])
+    increments = Displacement(2, 2)
+    tiled = _generate_tiled_circuit(plaquette_array, plaquettes, increments, indices)
+    merged = _generate_merged_circuit(plaquette_array, plaquettes, increments, indices)
+    assert tiled.get_circuit() == merged.get_circuit()
+
+
+def test_generate_circuit_from_instantiation_non_qubit_targets() -> None:
+    qubits = SquarePlaquetteQubits()
+    plaquette = Plaquette(
+        "measure_and_detect",
+        qubits,
+        ScheduledCircuit.from_circuit(
+            stim.Circuit("M 4\nDETECTOR rec[-1]"),
+            qubit_map=QubitMap.from_qubits(qubits),
+        ),
+    )
+    circuit = generate_circuit_from_instantiation(
+        numpy.array([[1, 1]]),
+        Plaquettes(FrozenDefaultDict({1: plaquette})),
+        Displacement(2, 2),
+    )
+    assert circuit.get_circuit(include_qubit_coords=False) == stim.Circuit(
+        "M 2\nDETECTOR rec[-1]\nM 5\nDETECTOR rec[-1]"
+    )
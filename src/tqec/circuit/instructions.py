@@ -1,5 +1,7 @@
-"""Defines a few functions to analyse and create ``stim.CircuitInstruction``
-instances."""
+"""Defines a few functions to analyse, create and write
+``stim.CircuitInstruction`` instances."""
+
+from typing import Iterator
 
 import stim
 
@@ -38,3 +40,52 @@ def is_multi_qubit_measurement_instruction(
 
 def is_annotation_instruction(instruction: stim.CircuitInstruction) -> bool:
     return instruction.name in ANNOTATION_INSTRUCTION_NAMES
+
+
+def instruction_to_exact_text(instruction: stim.CircuitInstruction) -> str:
+    """Returns the ``stim`` text representation of ``instruction``, writing
+    its arguments without loss of precision.
+
+    ``str(instruction)`` only keeps 6 significant digits of each argument, so
+    that the text it returns might not be parsed back to ``instruction``.
+    """
+    text = str(instruction)
+    args = instruction.gate_args_copy()
+    if not args:
+        return text
+    # Targets never contain parentheses, so the last parentheses are the ones
+    # enclosing the arguments.
+    closing = text.rindex(")")
+    opening = text.rindex("(", 0, closing)
+    formatted_args = ", ".join(_float_to_exact_text(arg) for arg in args)
+    return f"{text[:opening]}({formatted_args}){text[closing + 1 :]}"
+
+
+def circuit_to_exact_text(circuit: stim.Circuit) -> str:
+    """Returns the ``stim`` text representation of ``circuit``, writing the
+    instruction arguments without loss of precision.
+
+    Contrary to ``str(circuit)``, ``stim.Circuit(circuit_to_exact_text(circuit))``
+    is always equal to ``circuit``.
+    """
+    text = str(circuit)
+    # Most circuits only have arguments that are written exactly by stim, in
+    # which case the text can be used as is.
+    if stim.Circuit(text) == circuit:
+        return text
+    return "\n".join(_iter_exact_lines(circuit))
+
+
+def _iter_exact_lines(circuit: stim.Circuit, indent: str = "") -> Iterator[str]:
+    for instruction in circuit:
+        if isinstance(instruction, stim.CircuitRepeatBlock):
+            yield f"{indent}REPEAT {instruction.repeat_count} {{"
+            yield from _iter_exact_lines(instruction.body_copy(), indent + "    ")
+            yield f"{indent}}}"
+        else:
+            yield indent + instruction_to_exact_text(instruction)
+
+
+def _float_to_exact_text(value: float) -> str:
+    text = f"{value:g}"
+    return text if float(text) == value else repr(value)
@@ -0,0 +1,32 @@
+import pytest
+import stim
+
+from tqec.circuit.instructions import circuit_to_exact_text, instruction_to_exact_text
+
+
+@pytest.mark.parametrize(
+    "instruction",
+    [
+        stim.CircuitInstruction("H", [0, 1]),
+        stim.CircuitInstruction("X_ERROR", [0], [1 / 3000]),
+        stim.CircuitInstruction("DETECTOR", [stim.target_rec(-1)], [0.5, 1, 2]),
+        stim.CircuitInstruction("QUBIT_COORDS", [3], [0.1234567891, 1e-10]),
+        stim.CircuitInstruction("M", [0], [0.001], tag="a(b)"),
+    ],
+)
+def test_instruction_to_exact_text(instruction: stim.CircuitInstruction) -> None:
+    assert stim.Circuit(instruction_to_exact_text(instruction))[0] == instruction
+
+
+def test_circuit_to_exact_text() -> None:
+    circuit = stim.Circuit("H 0\nTICK\nX_ERROR(0.001) 0\nDETECTOR(1, 2.5) rec[-1]")
+    assert circuit_to_exact_text(circuit) == str(circuit)
+
+    circuit.append("DEPOLARIZE1", [0, 1], [1 / 3000])
+    circuit.append(
+        stim.CircuitRepeatBlock(
+            3, stim.Circuit("REPEAT 2 {\nSHIFT_COORDS(0.1234567891)\n}\nH 0")
+        )
+    )
+    assert stim.Circuit(circuit_to_exact_text(circuit)) == circuit
+    assert stim.Circuit(str(circuit)) != circuit
@@ -4,12 +4,16 @@ class used to represent and query measurement offsets in a circuit.
 This module defines :class:`MeasurementRecordsMap`. This class implements the
 necessary interface to register, modify and query measurement offsets from a
 ``stim.Circuit``.
+
+It also defines :class:`IncrementalMeasurementRecordsMap`, a mutable
+counterpart that can be efficiently extended with the measurements of
+successive circuits.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Sequence
+from typing import Sequence, overload
 
 import numpy
 import stim
@@ -197,3 +201,104 @@ class MeasurementRecordsMap:
                     [o - i * num_measurements_without_repetition for o in offsets]
                 )
         return MeasurementRecordsMap(records)
+
+
+class _RelativeMeasurementRecords(Sequence[int]):
+    """Read-only view over the absolute measurement indices of a qubit,
+    returning measurement record offsets relative to a given number of
+    measurements."""
+
+    def __init__(self, absolute_indices: list[int], num_measurements: int) -> None:
+        self._absolute_indices = absolute_indices
+        self._num_measurements = num_measurements
+
+    def __len__(self) -> int:
+        return len(self._absolute_indices)
+
+    @overload
+    def __getitem__(self, index: int) -> int: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[int]: ...
+
+    def __getitem__(self, index: int | slice) -> int | list[int]:
+        if isinstance(index, slice):
+            return [i - self._num_measurements for i in self._absolute_indices[index]]
+        return self._absolute_indices[index] - self._num_measurements
+
+
+class IncrementalMeasurementRecordsMap:
+    def __init__(self) -> None:
+        """A mapping from measurements to their record offsets that can be
+        extended in-place.
+
+        This class provides the same queries as :class:`MeasurementRecordsMap`
+        but stores, for each qubit, the absolute index of its measurements
+        (i.e., the index of the measurement from the start of the circuit)
+        along with the total number of measurements. Adding measurements from
+        a new part of the circuit does not need to shift the previous records,
+        which makes its cost only depend on the number of added measurements,
+        and record offsets relative to the end of the circuit are computed on
+        the fly, in constant time.
+        """
+        self._absolute_indices: dict[GridQubit, list[int]] = {}
+        self._num_measurements: int = 0
+
+    @property
+    def num_measurements(self) -> int:
+        """Total number of measurements represented by ``self``."""
+        return self._num_measurements
+
+    def add_measurements(
+        self, mrecords_map: MeasurementRecordsMap, repetitions: int = 1
+    ) -> None:
+        """Add in-place the provided measurements after the measurements
+        already represented by ``self``.
+
+        Args:
+            mrecords_map: records of measurements happening after the measurements
+                represented by ``self``.
+            repetitions: number of time the measurements from ``mrecords_map`` are
+                repeated, for example because they are in a ``REPEAT`` block.
+                Default to 1.
+        """
+        num_measurements_without_repetition = sum(
+            len(offsets) for offsets in mrecords_map.mapping.values()
+        )
+        for q, offsets in mrecords_map.mapping.items():
+            absolute_indices = self._absolute_indices.setdefault(q, [])
+            for i in range(repetitions):
+                end = (
+                    self._num_measurements
+                    + (i + 1) * num_measurements_without_repetition
+                )
+                absolute_indices.extend(end + o for o in offsets)
+        self._num_measurements += repetitions * num_measurements_without_repetition
+
+    def add_scheduled_circuit(
+        self, circuit: ScheduledCircuit, repetitions: int = 1
+    ) -> None:
+        """Add in-place the measurements of the provided ``circuit`` after the
+        measurements already represented by ``self``.
+
+        Args:
+            circuit: circuit containing the measurements to add.
+            repetitions: number of time ``circuit`` is repeated. Default to 1.
+        """
+        self.add_measurements(
+            MeasurementRecordsMap.from_scheduled_circuit(circuit), repetitions
+        )
+
+    # Explicitly returns a Sequence to show that the returned value is read-only.
+    def __getitem__(self, qubit: GridQubit) -> Sequence[int]:
+        return _RelativeMeasurementRecords(
+            self._absolute_indices[qubit], self._num_measurements
+        )
+
+    def __contains__(self, qubit: GridQubit) -> bool:
+        return qubit in self._absolute_indices
+
+    def to_measurement_records_map(self) -> MeasurementRecordsMap:
+        """Return a :class:`MeasurementRecordsMap` with the record offsets
+        relative to the end of the measurements represented by ``self``."""
+        return MeasurementRecordsMap({q: list(self[q]) for q in self._absolute_indices})
@@ -3,7 +3,10 @@ import re
 import pytest
 import stim
 
-from tqec.circuit.measurement_map import MeasurementRecordsMap
+from tqec.circuit.measurement_map import (
+    IncrementalMeasurementRecordsMap,
+    MeasurementRecordsMap,
+)
 from tqec.circuit.qubit import GridQubit
 from tqec.circuit.qubit_map import QubitMap
 from tqec.circuit.schedule import ScheduledCircuit
@@ -88,3 +91,38 @@ def test_with_added_measurements() -> None:
         GridQubit(1, 1): [-28, -25, -22, -19, -16, -13, -10, -7, -4, -1],
         GridQubit(2, 2): [-29, -26, -23, -20, -17, -14, -11, -8, -5, -2],
     }
+
+
+def test_incremental_measurement_records_map() -> None:
+    qubit_map = QubitMap({i: GridQubit(i, i) for i in range(3)})
+    rec_map = MeasurementRecordsMap.from_circuit(stim.Circuit("M 0 2 1"), qubit_map)
+    other_map = MeasurementRecordsMap.from_circuit(stim.Circuit("M 1 1"), qubit_map)
+
+    incremental_map = IncrementalMeasurementRecordsMap()
+    assert incremental_map.num_measurements == 0
+    assert GridQubit(0, 0) not in incremental_map
+
+    expected = MeasurementRecordsMap()
+    for mrecords_map, repetitions in [(rec_map, 1), (other_map, 3), (rec_map, 2)]:
+        incremental_map.add_measurements(mrecords_map, repetitions)
+        expected = expected.with_added_measurements(mrecords_map, repetitions)
+        assert incremental_map.to_measurement_records_map() == expected
+    assert incremental_map.num_measurements == 15
+    assert GridQubit(1, 1) in incremental_map
+    assert incremental_map[GridQubit(0, 0)][-1] == -3
+    assert incremental_map[GridQubit(0, 0)][0] == -15
+    assert list(incremental_map[GridQubit(2, 2)][-2:]) == [-5, -2]
+    with pytest.raises(KeyError):
+        incremental_map[GridQubit(5, 5)]
+
+
+def test_incremental_measurement_records_map_from_scheduled_circuit() -> None:
+    circuit = ScheduledCircuit.from_circuit(
+        stim.Circuit("QUBIT_COORDS(0, 0) 0\nQUBIT_COORDS(1, 1) 1\nM 0 1\nTICK\nM 0")
+    )
+    incremental_map = IncrementalMeasurementRecordsMap()
+    incremental_map.add_scheduled_circuit(circuit)
+    incremental_map.add_scheduled_circuit(circuit, repetitions=2)
+    assert incremental_map.to_measurement_records_map() == MeasurementRecordsMap(
+        {GridQubit(0, 0): [-9, -7, -6, -4, -3, -1], GridQubit(1, 1): [-8, -5, -2]}
+    )
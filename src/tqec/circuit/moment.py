@@ -4,21 +4,219 @@ This module defines :class:`Moment` that is very close to the external
 `cirq.Moment <https://quantumai.google/reference/python/cirq/Moment>`_
 class.
 
-Internally, :class:`Moment` stores the instructions using ``stim.Circuit``
-instead of using ``cirq`` data-structures.
+Internally, :class:`Moment` stores the instructions in a columnar way: each
+instruction that is only applied on qubit targets is stored as a ``numpy``
+array of qubit indices, which makes remapping, filtering and checking the
+validity of a moment vectorized operations. Other instructions (e.g.,
+instructions with measurement record targets) are stored as
+``stim.CircuitInstruction`` instances. The equivalent ``stim.Circuit`` is only
+built when requested.
 """
 
 from __future__ import annotations
 
-from typing import Any, Callable, Iterable, Iterator, cast
+import functools
+from copy import copy
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, cast
 
+import numpy
+import numpy.typing as npt
 import stim
 
 from tqec.circuit.instructions import is_annotation_instruction
-from tqec.circuit.qubit import count_qubit_accesses, get_used_qubit_indices
+from tqec.circuit.qubit import ANNOTATION_INSTRUCTIONS
 from tqec.exceptions import TQECException
 
 
+@dataclass(frozen=True)
+class _QubitInstruction:
+    """Columnar representation of an instruction that is only applied on
+    (non-inverted) qubit targets.
+
+    The ``targets`` array should never be mutated, as it might be shared between
+    several instances.
+    """
+
+    name: str
+    args: tuple[float, ...]
+    targets: npt.NDArray[numpy.int_]
+
+    @staticmethod
+    def from_instruction(
+        instruction: stim.CircuitInstruction,
+    ) -> _QubitInstruction | None:
+        """Build the columnar representation of ``instruction``, or return
+        ``None`` if ``instruction`` has targets that are not qubits."""
+        if getattr(instruction, "tag", ""):
+            return None
+        # Parsing the text representation avoids creating one stim.GateTarget
+        # instance per target.
+        text = str(instruction)
+        args = instruction.gate_args_copy()
+        targets = text[text.index(")") + 1 :] if args else text[len(instruction.name) :]
+        if not targets.replace(" ", "").isdigit():
+            return None
+        return _QubitInstruction(
+            instruction.name,
+            tuple(args),
+            numpy.fromstring(targets, dtype=numpy.int_, sep=" "),
+        )
+
+    def to_text(self) -> str:
+        """Return the ``stim`` text representation of ``self``."""
+        args = f"({','.join(map(repr, self.args))})" if self.args else ""
+        return f"{self.name}{args} {' '.join(map(str, self.targets.tolist()))}"
+
+    @property
+    def target_group_size(self) -> int:
+        return _target_group_size(self.name)
+
+
+@functools.cache
+def _target_group_size(name: str) -> int:
+    return 2 if stim.gate_data(name).is_two_qubit_gate else 1
+
+
+def _to_instructions(
+    circuit: stim.Circuit,
+) -> list[_QubitInstruction | stim.CircuitInstruction]:
+    """Convert each instruction of ``circuit`` to its columnar representation
+    when possible.
+
+    Raises:
+        TQECException: if the provided ``circuit`` contains one or more
+            ``TICK`` instruction.
+        TQECException: if the provided ``circuit`` contains a ``REPEAT``
+            block instruction.
+    """
+    if circuit.num_ticks > 0:
+        raise TQECException(
+            "Cannot initialize a Moment with a stim.Circuit instance "
+            "containing at least one TICK instruction."
+        )
+    instructions: list[_QubitInstruction | stim.CircuitInstruction] = []
+    for instruction in circuit:
+        if isinstance(instruction, stim.CircuitRepeatBlock):
+            raise TQECException(
+                "Moment instances should no contain any instance "
+                "of stim.CircuitRepeatBlock."
+            )
+        instructions.append(
+            _QubitInstruction.from_instruction(instruction) or instruction
+        )
+    return instructions
+
+
+def _to_circuit(
+    instructions: Iterable[_QubitInstruction | stim.CircuitInstruction],
+) -> stim.Circuit:
+    """Build the ``stim.Circuit`` represented by the provided instructions."""
+    circuit = stim.Circuit()
+    # Parsing the text representation of a large number of targets is much
+    # faster than appending them with stim.Circuit.append.
+    lines: list[str] = []
+    for instruction in instructions:
+        if isinstance(instruction, _QubitInstruction):
+            lines.append(instruction.to_text())
+            continue
+        if lines:
+            circuit += stim.Circuit("\n".join(lines))
+            lines.clear()
+        circuit.append(instruction)
+    if lines:
+        circuit += stim.Circuit("\n".join(lines))
+    return circuit
+
+
+def _accessed_qubits(
+    instructions: Iterable[_QubitInstruction | stim.CircuitInstruction],
+) -> npt.NDArray[numpy.int_]:
+    """Return the qubit indices accessed by the non-annotation instructions, with
+    repetitions.
+
+    See :func:`~tqec.circuit.qubit.count_qubit_accesses` for the definition of
+    an access.
+    """
+    accesses: list[npt.NDArray[numpy.int_]] = [numpy.empty(0, dtype=numpy.int_)]
+    for instruction in instructions:
+        if instruction.name in ANNOTATION_INSTRUCTIONS:
+            continue
+        if isinstance(instruction, _QubitInstruction):
+            accesses.append(instruction.targets)
+            continue
+        accesses.append(
+            numpy.array(
+                [
+                    t.qubit_value
+                    for t in instruction.targets_copy()
+                    if t.is_qubit_target
+                ],
+                dtype=numpy.int_,
+            )
+        )
+    return numpy.concatenate(accesses)
+
+
+def qubit_index_map_to_array(
+    qubit_index_map: dict[int, int] | npt.NDArray[numpy.int_],
+) -> npt.NDArray[numpy.int_]:
+    """Return a lookup array ``a`` such that ``a[i] == qubit_index_map[i]``,
+    with ``-1`` for the indices that are not mapped.
+
+    The returned array can be provided to
+    :meth:`Moment.with_mapped_qubit_indices` in place of ``qubit_index_map``
+    to avoid re-building it for each moment.
+
+    Args:
+        qubit_index_map: a map from qubit indices to qubit indices. If a
+            ``numpy`` array is provided, it is assumed to already be a lookup
+            array and is returned as is.
+
+    Returns:
+        the lookup array.
+    """
+    if isinstance(qubit_index_map, numpy.ndarray):
+        return qubit_index_map
+    size = max(qubit_index_map.keys(), default=-1) + 1
+    lookup = numpy.full(size, -1, dtype=numpy.int_)
+    lookup[
+        numpy.fromiter(
+            qubit_index_map.keys(), dtype=numpy.int_, count=len(qubit_index_map)
+        )
+    ] = numpy.fromiter(
+        qubit_index_map.values(), dtype=numpy.int_, count=len(qubit_index_map)
+    )
+    return lookup
+
+
+def _map_qubit_indices(
+    indices: npt.NDArray[numpy.int_], lookup: npt.NDArray[numpy.int_]
+) -> npt.NDArray[numpy.int_]:
+    """Map ``indices`` with ``lookup``, raising a ``KeyError`` on any index
+    that is not mapped."""
+    if indices.size == 0:
+        return indices
+    mapped = lookup[numpy.minimum(indices, lookup.size - 1)] if lookup.size else indices
+    unmapped = (indices >= lookup.size) | (mapped < 0)
+    if numpy.any(unmapped):
+        raise KeyError(int(indices[numpy.argmax(unmapped)]))
+    return mapped
+
+
+class MutationCounter:
+    """Counter incremented each time one of the :class:`Moment` instances it
+    is attached to is mutated.
+
+    Objects caching data computed from several moments attach a single counter
+    to all of them, so that checking if the cached data is still valid only
+    requires comparing one integer.
+    """
+
+    def __init__(self) -> None:
+        self.value: int = 0
+
+
 class Moment:
     """A collection of instructions that can be executed in parallel.
 
@@ -74,17 +272,56 @@ class Moment:
             TQECException: if the provided ``circuit`` contains a ``REPEAT``
                 block instruction.
         """
+        self._instructions = _to_instructions(circuit)
         if not _avoid_checks:
-            Moment.check_is_valid_moment(circuit)
-        self._circuit: stim.Circuit = circuit
+            Moment._check_instructions_are_valid_moment(self._instructions)
+        # Cached stim.Circuit equivalent to self._instructions, or None if it
+        # has not been built yet.
+        self._circuit: stim.Circuit | None = circuit
+        # Counters incremented each time self is mutated, which allows instances
+        # that cache data computed from self to detect modifications.
+        self._mutation_counters: list[MutationCounter] = []
         self._used_qubits: set[int]
         if used_qubits is not None:
             self._used_qubits = used_qubits
         else:
-            self._used_qubits = get_used_qubit_indices(self._circuit)
+            self._used_qubits = set(
+                numpy.unique(_accessed_qubits(self._instructions)).tolist()
+            )
+
+    @staticmethod
+    def _from_instructions(
+        instructions: list[_QubitInstruction | stim.CircuitInstruction],
+        used_qubits: set[int],
+    ) -> Moment:
+        """Build a :class:`Moment` from its internal representation, without
+        any check."""
+        moment = Moment.__new__(Moment)
+        moment._instructions = instructions
+        moment._circuit = None
+        moment._mutation_counters = []
+        moment._used_qubits = used_qubits
+        return moment
+
+    def _invalidate_circuit(self) -> None:
+        """Mark ``self`` as mutated, dropping the cached ``stim.Circuit``."""
+        self._circuit = None
+        for counter in self._mutation_counters:
+            counter.value += 1
+
+    def _attach_mutation_counter(self, counter: MutationCounter) -> None:
+        """Increment ``counter`` each time ``self`` is mutated."""
+        if all(c is not counter for c in self._mutation_counters):
+            self._mutation_counters.append(counter)
 
     @property
     def circuit(self) -> stim.Circuit:
+        """``stim.Circuit`` instance representing ``self``.
+
+        The returned circuit is cached and should not be mutated.
+        """
+        if self._circuit is None:
+            self._circuit = _to_circuit(self._instructions)
         return self._circuit
 
     @staticmethod
@@ -103,22 +340,18 @@ class Moment:
             TQECException: if the provided ``circuit`` contains a ``REPEAT``
                 block instruction.
         """
-        if circuit.num_ticks > 0:
-            raise TQECException(
-                "Cannot initialize a Moment with a stim.Circuit instance "
-                "containing at least one TICK instruction."
-            )
-        qubit_usage = count_qubit_accesses(circuit)
-        if any(usage_count > 1 for usage_count in qubit_usage.values()):
+        Moment._check_instructions_are_valid_moment(_to_instructions(circuit))
+
+    @staticmethod
+    def _check_instructions_are_valid_moment(
+        instructions: Iterable[_QubitInstruction | stim.CircuitInstruction],
+    ) -> None:
+        accesses = _accessed_qubits(instructions)
+        if numpy.unique(accesses).size != accesses.size:
             raise TQECException(
                 "Moment instances cannot be initialized with a stim.Circuit "
                 "instance containing gates applied on the same qubit."
             )
-        if any(isinstance(inst, stim.CircuitRepeatBlock) for inst in circuit):
-            raise TQECException(
-                "Moment instances should no contain any instance "
-                "of stim.CircuitRepeatBlock."
-            )
 
     @property
     def qubits_indices(self) -> set[int]:
@@ -137,19 +370,19 @@ class Moment:
     def contains_instruction(self, instruction_name: str) -> bool:
         """Return ``True`` if ``self`` contains at least one operation with the
         provided name."""
-        return any(instr.name == instruction_name for instr in self._circuit)
+        return any(instr.name == instruction_name for instr in self._instructions)
 
     def remove_all_instructions_inplace(
         self, instructions_to_remove: frozenset[str]
     ) -> None:
         """Remove in-place all the instructions that have their name in the
         provided ``instructions_to_remove``."""
-        new_circuit = stim.Circuit()
-        for inst in self._circuit:
-            if inst.name in instructions_to_remove:
-                continue
-            new_circuit.append(inst)
-        self._circuit = new_circuit
+        self._instructions = [
+            inst
+            for inst in self._instructions
+            if inst.name not in instructions_to_remove
+        ]
+        self._invalidate_circuit()
 
     def __iadd__(self, other: Moment) -> Moment:
         """Add instructions in-place in ``self``."""
@@ -158,7 +391,8 @@ class Moment:
             raise TQECException(
                 "Trying to add an overlapping quantum circuit to a Moment instance."
             )
-        self._circuit += other._circuit
+        self._instructions.extend(other._instructions)
+        self._invalidate_circuit()
         return self
 
     @staticmethod
@@ -226,7 +460,10 @@ class Moment:
                 f"{overlapping_qubits} being already in use."
             )
         self._used_qubits.update(instruction_qubits)
-        self._circuit.append(instruction)
+        self._instructions.append(
+            _QubitInstruction.from_instruction(instruction) or instruction
+        )
+        self._invalidate_circuit()
 
     def append_annotation(
         self, annotation_instruction: stim.CircuitInstruction
@@ -252,7 +489,8 @@ class Moment:
                 "That is not a valid annotation. Call append_instruction for "
                 "generic instructions."
             )
-        self._circuit.append(annotation_instruction)
+        self._instructions.append(annotation_instruction)
+        self._invalidate_circuit()
 
     @property
     def instructions(self) -> Iterator[stim.CircuitInstruction]:
@@ -265,7 +503,7 @@ class Moment:
         #    prevents that case.
         # So we know for sure that there are only `stim.CircuitInstruction`
         # instances.
-        yield from self._circuit  # type: ignore
+        yield from self.circuit  # type: ignore
 
     @property
     def num_measurements(self) -> int:
@@ -275,15 +513,31 @@ class Moment:
         # error: Returning Any from function declared to return "int"
         # I do not understand why, but it probably has to do with Stim typing
         # so let's ignore it for the moment.
-        return self._circuit.num_measurements  # type: ignore
+        return self.circuit.num_measurements  # type: ignore
 
     def filter_by_qubits(self, qubits_to_keep: Iterable[int]) -> Moment:
         """Return a new :class:`Moment` instance containing only the
         instructions that are applied on the provided qubits."""
         qubits = frozenset(qubits_to_keep)
+        sorted_qubits = numpy.sort(
+            numpy.fromiter(qubits, dtype=numpy.int_, count=len(qubits))
+        )
         used_qubits: set[int] = set()
-        new_circuit = stim.Circuit()
-        for instruction in self.instructions:
+        instructions: list[_QubitInstruction | stim.CircuitInstruction] = []
+        for instruction in self._instructions:
+            if isinstance(instruction, _QubitInstruction):
+                groups = instruction.targets.reshape(-1, instruction.target_group_size)
+                kept_groups = groups[
+                    numpy.all(numpy.isin(groups, sorted_qubits), axis=1)
+                ].ravel()
+                if kept_groups.size:
+                    instructions.append(
+                        _QubitInstruction(
+                            instruction.name, instruction.args, kept_groups
+                        )
+                    )
+                    used_qubits.update(kept_groups.tolist())
+                continue
             targets: list[stim.GateTarget] = []
             for target_group in instruction.target_groups():
                 qubit_targets = [
@@ -294,31 +548,32 @@ class Moment:
                 targets.extend(target_group)
                 used_qubits.update(qubit_targets)
             if targets:
-                new_circuit.append(
-                    instruction.name, targets, instruction.gate_args_copy()
+                instructions.append(
+                    stim.CircuitInstruction(
+                        instruction.name, targets, instruction.gate_args_copy()
+                    )
                 )
-        return Moment(new_circuit, used_qubits=used_qubits, _avoid_checks=True)
+        return Moment._from_instructions(instructions, used_qubits)
 
     @property
     def is_empty(self) -> bool:
         """Return ``True`` if the :class:`Moment` instance is empty."""
-        return len(self._circuit) == 0
+        return len(self._instructions) == 0
 
     def __copy__(self) -> Moment:
-        return Moment(
-            self._circuit,
-            used_qubits=self._used_qubits,
-            _avoid_checks=True,
-        )
+        moment = Moment._from_instructions(list(self._instructions), self._used_qubits)
+        moment._circuit = self._circuit
+        return moment
 
     def __deepcopy__(self, _: dict[Any, Any]) -> Moment:
-        return Moment(
-            self._circuit.copy(),
-            used_qubits=self._used_qubits,
-            _avoid_checks=True,
+        # Instructions are never mutated in place, so copying the list is enough.
+        return Moment._from_instructions(
+            list(self._instructions), copy(self._used_qubits)
         )
 
-    def with_mapped_qubit_indices(self, qubit_index_map: dict[int, int]) -> Moment:
+    def with_mapped_qubit_indices(
+        self, qubit_index_map: dict[int, int] | npt.NDArray[numpy.int_]
+    ) -> Moment:
         """Map the qubits **indices** the :class:`Moment` instance is applied
         on.
 
@@ -333,27 +588,47 @@ class Moment:
             a modified copy of ``self`` with the qubit gate targets mapped according
             to the provided ``qubit_index_map``.
         """
-        circuit = stim.Circuit()
-        for instr in self.instructions:
+        lookup = qubit_index_map_to_array(qubit_index_map)
+        instructions: list[_QubitInstruction | stim.CircuitInstruction] = []
+        for instr in self._instructions:
+            if isinstance(instr, _QubitInstruction):
+                instructions.append(
+                    _QubitInstruction(
+                        instr.name,
+                        instr.args,
+                        _map_qubit_indices(instr.targets, lookup),
+                    )
+                )
+                continue
             mapped_targets: list[stim.GateTarget] = []
             for target in instr.targets_copy():
                 # Non qubit targets are left untouched.
                 if not target.is_qubit_target:
                     mapped_targets.append(target)
                     continue
-                # Qubit targets are mapped using `qubit_index_map`
-                target_qubit = cast(int, target.qubit_value)
+                # Qubit targets are mapped using `lookup`
+                target_qubit = int(
+                    _map_qubit_indices(
+                        numpy.array([cast(int, target.qubit_value)]), lookup
+                    )[0]
+                )
                 mapped_targets.append(
-                    stim.GateTarget(qubit_index_map[target_qubit])
+                    stim.GateTarget(target_qubit)
                     if not target.is_inverted_result_target
-                    else stim.GateTarget(-qubit_index_map[target_qubit])
+                    else stim.target_inv(target_qubit)
                 )
-            circuit.append(instr.name, mapped_targets, instr.gate_args_copy())
-        return Moment(
-            circuit,
-            used_qubits={qubit_index_map[q] for q in self._used_qubits},
-            _avoid_checks=True,
+            instructions.append(
+                stim.CircuitInstruction(
+                    instr.name, mapped_targets, instr.gate_args_copy()
+                )
+            )
+        used_qubits = _map_qubit_indices(
+            numpy.fromiter(
+                self._used_qubits, dtype=numpy.int_, count=len(self._used_qubits)
+            ),
+            lookup,
         )
+        return Moment._from_instructions(instructions, set(used_qubits.tolist()))
 
 
 def iter_stim_circuit_without_repeat_by_moments(
@@ -367,12 +642,9 @@ def iter_stim_circuit_without_repeat_by_moments(
 
     Args:
         circuit: circuit to iterate over. Should not contain any ``REPEAT`` block.
-        collected_before_use: if ``True``, the returned :class:`Moment` instances
-            will contain a copy of the temporary ``stim.Circuit`` instance
-            representing the moment. This is needed if the yielded
-            :class:`Moment` instances are not used directly because the
-            underlying ``stim.Circuit`` instance is cleared when resuming the
-            generator.
+        collected_before_use: kept for backward compatibility. The yielded
+            :class:`Moment` instances never share data with each other, so
+            they can always be collected before use.
 
     Yields:
         :class`Moment` instances.
@@ -384,9 +656,8 @@ def iter_stim_circuit_without_repeat_by_moments(
             inserted such that instructions between two ``TICK`` instructions
             are always applied on disjoint sets of qubits.
     """
-    copy_func: Callable[[stim.Circuit], stim.Circuit] = (
-        (lambda c: c.copy()) if collected_before_use else (lambda c: c)
-    )
+    # Note: a new stim.Circuit instance is created for each moment, because the
+    #       returned Moment instances keep a reference to it.
     cur_moment = stim.Circuit()
     for inst in circuit:
         if isinstance(inst, stim.CircuitRepeatBlock):
@@ -395,10 +666,9 @@ def iter_stim_circuit_without_repeat_by_moments(
                 "explicitly not supported by this method."
             )
         elif inst.name == "TICK":
-            yield Moment(copy_func(cur_moment))
-            cur_moment.clear()
+            yield Moment(cur_moment)
+            cur_moment = stim.Circuit()
         else:
             cur_moment.append(inst)
     if cur_moment:
-        # No need to copy the last moment
         yield Moment(cur_moment)
@@ -1,7 +1,13 @@
+from copy import copy
+
 import pytest
 import stim
 
-from tqec.circuit.moment import Moment, iter_stim_circuit_without_repeat_by_moments
+from tqec.circuit.moment import (
+    Moment,
+    iter_stim_circuit_without_repeat_by_moments,
+    qubit_index_map_to_array,
+)
 from tqec.exceptions import TQECException
 
 _VALID_MOMENT_CIRCUITS: list[stim.Circuit] = [
@@ -255,3 +261,35 @@ def test_moment_with_mapped_qubit_indices() -> None:
         "QUBIT_COORDS(0, 0) 12\nQUBIT_COORDS(0, 1) 56\nH 12 56\nDETECTOR(0, 0) rec[-1]"
     )
     assert mapped_moment.qubits_indices == {12, 56}
+
+
+def test_moment_with_mapped_qubit_indices_lookup_array() -> None:
+    moment = Moment(stim.Circuit("CX 0 1\nX_ERROR(0.125) 2\nM !2\nDETECTOR rec[-1]"))
+    mapped_moment = moment.with_mapped_qubit_indices(
+        qubit_index_map_to_array({0: 4, 1: 3, 2: 5})
+    )
+    assert mapped_moment.circuit == stim.Circuit(
+        "CX 4 3\nX_ERROR(0.125) 5\nM !5\nDETECTOR rec[-1]"
+    )
+    assert mapped_moment.qubits_indices == {3, 4, 5}
+
+
+def test_moment_with_mapped_qubit_indices_missing_index() -> None:
+    moment = Moment(stim.Circuit("H 0 1"))
+    with pytest.raises(KeyError):
+        moment.with_mapped_qubit_indices({0: 1})
+
+
+def test_moment_filter_by_qubits_two_qubit_gates() -> None:
+    moment = Moment(stim.Circuit("CX 0 1 2 3 4 5\nDEPOLARIZE2(0.1) 0 1 2 3"))
+    assert moment.filter_by_qubits([0, 1, 2, 5]).circuit == stim.Circuit(
+        "CX 0 1\nDEPOLARIZE2(0.1) 0 1"
+    )
+
+
+def test_moment_copy_is_independent() -> None:
+    moment = Moment(stim.Circuit("H 0"))
+    copied_moment = copy(moment)
+    copied_moment.append("H", [1], [])
+    assert moment.circuit == stim.Circuit("H 0")
+    assert copied_moment.circuit == stim.Circuit("H 0 1")
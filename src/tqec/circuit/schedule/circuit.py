@@ -17,7 +17,12 @@ from typing import Any, Callable, Iterable, Iterator, Sequence
 import stim
 
 from tqec.circuit.instructions import is_annotation_instruction
-from tqec.circuit.moment import Moment, iter_stim_circuit_without_repeat_by_moments
+from tqec.circuit.moment import (
+    Moment,
+    MutationCounter,
+    iter_stim_circuit_without_repeat_by_moments,
+    qubit_index_map_to_array,
+)
 from tqec.circuit.qubit import GridQubit
 from tqec.circuit.qubit_map import QubitMap, get_qubit_map
 from tqec.circuit.schedule.exception import ScheduleException
@@ -32,6 +37,7 @@ class ScheduledCircuit:
         schedule: Schedule | list[int] | int,
         qubit_map: QubitMap,
         _avoid_checks: bool = False,
+        _mutation_counter: MutationCounter | None = None,
     ) -> None:
         """Represent a quantum circuit with scheduled moments.
 
@@ -56,6 +62,9 @@ class ScheduledCircuit:
                 violation and it is up to the user to ensure that
                 :class:`ScheduledCircuit` pre-conditions are checked by the
                 provided input.
+            _mutation_counter: counter already attached to each of the provided
+                ``moments`` and shared with the instance(s) owning them. If
+                ``None``, a new counter is created and attached to the moments.
 
         Raises:
             ScheduleError: if the provided ``schedule`` is invalid.
@@ -87,6 +96,16 @@ class ScheduledCircuit:
         self._moments: list[Moment] = moments
         self._qubit_map: QubitMap = qubit_map
         self._schedule: Schedule = schedule
+        # Incremented each time self or one of its moments is mutated. Used to
+        # know if a cached stim.Circuit is still valid.
+        if _mutation_counter is None:
+            _mutation_counter = MutationCounter()
+            for moment in moments:
+                moment._attach_mutation_counter(_mutation_counter)
+        self._mutation_counter: MutationCounter = _mutation_counter
+        # Cached results of get_circuit, indexed by include_qubit_coords, with
+        # the value of the mutation counter when they were built.
+        self._circuit_cache: dict[bool, tuple[int, stim.Circuit]] = {}
 
     @staticmethod
     def empty() -> ScheduledCircuit:
@@ -171,12 +190,24 @@ class ScheduledCircuit:
         """Build and return the ``stim.Circuit`` instance represented by
         ``self``.
 
-        Warning:
-            The circuit is re-built at each call! Use that function wisely.
+        Note:
+            The built circuit is cached until ``self`` is mutated, so calling
+            this method several times on an unchanged instance only builds the
+            circuit once. Each call returns a copy of the cached circuit that
+            can be freely mutated by the caller.
 
         Returns:
             ``stim.Circuit`` instance represented by ``self``.
         """
+        version = self._mutation_counter.value
+        cached = self._circuit_cache.get(include_qubit_coords)
+        if cached is None or cached[0] != version:
+            cached = (version, self._build_circuit(include_qubit_coords))
+            self._circuit_cache[include_qubit_coords] = cached
+        return cached[1].copy()
+
+    def _build_circuit(self, include_qubit_coords: bool) -> stim.Circuit:
+        """Build the ``stim.Circuit`` instance represented by ``self``."""
         ret = stim.Circuit()
         if not self._moments:
             return ret
@@ -207,8 +238,9 @@ class ScheduledCircuit:
         """Build and return the ``stim.Circuit`` instance represented by
         ``self`` encapsulated in a ``REPEAT`` block.
 
-        Warning:
-            The circuit is re-built at each call! Use that function wisely.
+        Note:
+            The body of the ``REPEAT`` block is obtained from
+            :meth:`get_circuit` and so benefits from its cache.
 
         Warning:
             An extra ``TICK`` instruction is appended by default at the end of the
@@ -277,13 +309,18 @@ class ScheduledCircuit:
         mapped_final_qubits = QubitMap(
             {qubit_index_map[qi]: q for qi, q in self._qubit_map.items()}
         )
-        mapped_moments: list[Moment] = []
-        for moment in self._moments:
-            mapped_moments.append(moment.with_mapped_qubit_indices(qubit_index_map))
+        # Build the lookup array once for all the moments.
+        lookup = qubit_index_map_to_array(qubit_index_map)
+        mapped_moments: list[Moment] = [
+            moment.with_mapped_qubit_indices(lookup) for moment in self._moments
+        ]
 
         if inplace:
             self._qubit_map = mapped_final_qubits
             self._moments = mapped_moments
+            for moment in mapped_moments:
+                moment._attach_mutation_counter(self._mutation_counter)
+            self._mutation_counter.value += 1
             return self
         else:
             return ScheduledCircuit(
@@ -321,11 +358,18 @@ class ScheduledCircuit:
         """
         operand = self if inplace_qubit_map else copy(self)
         operand._qubit_map = operand._qubit_map.with_mapped_qubits(qubit_map)
+        operand._circuit_cache.clear()
         return operand
 
     def __copy__(self) -> ScheduledCircuit:
+        # The copy shares its moments with self, so it also shares the counter
+        # tracking their mutations.
         return ScheduledCircuit(
-            self._moments, self._schedule, self._qubit_map, _avoid_checks=True
+            self._moments,
+            self._schedule,
+            self._qubit_map,
+            _avoid_checks=True,
+            _mutation_counter=self._mutation_counter,
         )
 
     def __deepcopy__(self, _: dict[Any, Any]) -> ScheduledCircuit:
@@ -446,6 +490,8 @@ class ScheduledCircuit:
             insertion_index = bisect.bisect_left(self._schedule, schedule)
             self._schedule.insert(insertion_index, schedule)
             self._moments.insert(insertion_index, moment)
+            moment._attach_mutation_counter(self._mutation_counter)
+            self._mutation_counter.value += 1
         else:
             # Else, the schedule already exists, in which case we just need to
             # add the operations to an existing moment. Note that this might
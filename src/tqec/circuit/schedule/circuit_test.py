@@ -1,3 +1,5 @@
+from copy import copy
+
 import pytest
 import stim
 
@@ -251,3 +253,52 @@ def test_scheduled_circuit_filter_by_qubit() -> None:
     filtered_circuit = circuit.filter_by_qubits([GridQubit(0, 0), GridQubit(0, 1)])
     assert filtered_circuit.get_circuit() == stim.Circuit("QUBIT_COORDS(0, 0) 0\nH 0")
     assert filtered_circuit.schedule == Schedule([0])
+
+
+def test_scheduled_circuit_get_circuit_cache() -> None:
+    circuit = ScheduledCircuit.from_circuit(stim.Circuit("QUBIT_COORDS(0, 0) 0\nH 0"))
+    built_circuit = circuit.get_circuit()
+    # The returned circuit is a copy, mutating it should not change the cache.
+    built_circuit.append("M", [0], [])
+    assert circuit.get_circuit() == stim.Circuit("QUBIT_COORDS(0, 0) 0\nH 0")
+    assert circuit.get_circuit(include_qubit_coords=False) == stim.Circuit("H 0")
+
+    circuit.append_new_moment(Moment(stim.Circuit("M 0")))
+    assert circuit.get_circuit() == stim.Circuit("QUBIT_COORDS(0, 0) 0\nH 0\nTICK\nM 0")
+    circuit.append_annotation(
+        stim.CircuitInstruction("DETECTOR", [stim.target_rec(-1)])
+    )
+    assert circuit.get_circuit(include_qubit_coords=False) == stim.Circuit(
+        "H 0\nTICK\nM 0\nDETECTOR rec[-1]"
+    )
+    circuit.map_qubit_indices({0: 1}, inplace=True)
+    assert circuit.get_circuit() == stim.Circuit(
+        "QUBIT_COORDS(0, 0) 1\nH 1\nTICK\nM 1\nDETECTOR rec[-1]"
+    )
+    circuit.map_to_qubits(lambda q: q + GridQubit(1, 1), inplace_qubit_map=True)
+    assert circuit.get_circuit() == stim.Circuit(
+        "QUBIT_COORDS(1, 1) 1\nH 1\nTICK\nM 1\nDETECTOR rec[-1]"
+    )
+
+
+def test_scheduled_circuit_get_circuit_cache_shared_moments() -> None:
+    circuit = ScheduledCircuit.from_circuit(stim.Circuit("H 0\nTICK\nM 0"))
+    shallow_copy = copy(circuit)
+    assert circuit.get_circuit() == stim.Circuit("H 0\nTICK\nM 0")
+    # Moments are shared, so an annotation added to the copy is visible in the
+    # original instance.
+    shallow_copy.append_annotation(
+        stim.CircuitInstruction("DETECTOR", [stim.target_rec(-1)])
+    )
+    assert circuit.get_circuit() == stim.Circuit("H 0\nTICK\nM 0\nDETECTOR rec[-1]")
+    # The list of moments is also shared, so are new moments.
+    shallow_copy.append_new_moment(Moment(stim.Circuit("H 0")))
+    assert circuit.get_circuit() == stim.Circuit(
+        "H 0\nTICK\nM 0\nDETECTOR rec[-1]\nTICK\nH 0"
+    )
+    # Moments shared with an unrelated instance also invalidate the cache.
+    other = ScheduledCircuit(list(circuit.moments), 0, QubitMap())
+    other.append_annotation(stim.CircuitInstruction("DETECTOR", [stim.target_rec(-1)]))
+    assert circuit.get_circuit() == stim.Circuit(
+        "H 0\nTICK\nM 0\nDETECTOR rec[-1]\nTICK\nH 0\nDETECTOR rec[-1]"
+    )
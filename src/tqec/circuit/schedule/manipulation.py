@@ -17,6 +17,7 @@ This module implement a few central functions for the :mod:`tqec` library:
 
 from __future__ import annotations
 
+import heapq
 import itertools
 import warnings
 from typing import Iterable, Sequence, cast
@@ -58,6 +59,16 @@ class _ScheduledCircuits:
         self._global_qubit_map = global_qubit_map
         self._iterators = [circuit.scheduled_moments for circuit in self._circuits]
         self._current_moments = [next(it, None) for it in self._iterators]
+        # Priority queue of the circuits that have a pending moment, ordered by
+        # the schedule of that moment and then by circuit index. Finding the
+        # moments at the minimum schedule is then logarithmic in the number of
+        # circuits instead of linear.
+        self._pending_schedules: list[tuple[int, int]] = [
+            (scheduled_moment[0], index)
+            for index, scheduled_moment in enumerate(self._current_moments)
+            if scheduled_moment is not None
+        ]
+        heapq.heapify(self._pending_schedules)
 
     def has_pending_moment(self) -> bool:
         """Checks if any of the managed instances has a pending moment.
@@ -65,7 +76,7 @@ class _ScheduledCircuits:
         Any moment that has not been collected by using collect_moment
         is considered to be pending.
         """
-        return any(self._has_pending_moment(i) for i in range(len(self._circuits)))
+        return bool(self._pending_schedules)
 
     def _has_pending_moment(self, index: int) -> bool:
         """Check if the managed instance at the given index has a pending
@@ -83,6 +94,11 @@ class _ScheduledCircuits:
         """Recover and mark as collected the pending moment for the instance at
         the given index.
 
+        Note:
+            the caller is responsible for removing ``index`` from the priority
+            queue. If the instance has another pending moment, it is pushed to
+            the priority queue by this method.
+
         Raises:
             AssertionError: ``if not self.has_pending_operation(index)``.
         """
@@ -92,7 +108,10 @@ class _ScheduledCircuits:
                 "Trying to pop a Moment instance from a ScheduledCircuit with "
                 "all its moments already collected."
             )
-        self._current_moments[index] = next(self._iterators[index], None)
+        next_moment = next(self._iterators[index], None)
+        self._current_moments[index] = next_moment
+        if next_moment is not None:
+            heapq.heappush(self._pending_schedules, (next_moment[0], index))
         return ret
 
     @property
@@ -103,25 +122,26 @@ class _ScheduledCircuits:
         """Collect all the moments that can be collected.
 
         This method collects and returns a list of all the moments that should
-        be scheduled next.
+        be scheduled next. Moments are returned in the order of the circuits
+        they originate from.
 
         Returns:
             a list of :class:`~tqec.circuit.moment.Moment` instances that should
             be added next to the QEC circuit.
         """
         assert self.has_pending_moment()
-        circuit_indices_organised_by_schedule: dict[int, list[int]] = dict()
-        for circuit_index in range(self.number_of_circuits):
-            if not self._has_pending_moment(circuit_index):
-                continue
-            schedule, _ = self._peek_scheduled_moment(circuit_index)
-            circuit_indices_organised_by_schedule.setdefault(schedule, list()).append(
-                circuit_index
-            )
-
-        minimum_schedule = min(circuit_indices_organised_by_schedule.keys())
-        moments_to_return: list[Moment] = list()
-        for circuit_index in circuit_indices_organised_by_schedule[minimum_schedule]:
+        minimum_schedule = self._pending_schedules[0][0]
+        circuit_indices: list[int] = []
+        # The next moment of a circuit is always scheduled strictly after the
+        # current one, so popping a moment never pushes a moment at
+        # minimum_schedule.
+        while (
+            self._pending_schedules
+            and self._pending_schedules[0][0] == minimum_schedule
+        ):
+            circuit_indices.append(heapq.heappop(self._pending_schedules)[1])
+        moments_to_return: list[Moment] = []
+        for circuit_index in circuit_indices:
             _, moment = self._pop_scheduled_moment(circuit_index)
             moments_to_return.append(moment)
         return minimum_schedule, moments_to_return
@@ -193,7 +213,11 @@ def remove_duplicate_instructions(
     final_operations.extend(
         stim.CircuitInstruction(
             name,
-            sum(_sort_target_groups([list(t) for t in targets]), start=[]),
+            list(
+                itertools.chain.from_iterable(
+                    _sort_target_groups([list(t) for t in targets])
+                )
+            ),
             args,
         )
         for (name, args), targets in mergeable_operations.items()
@@ -250,15 +274,16 @@ def merge_scheduled_circuits(
     scheduled_circuits = _ScheduledCircuits(circuits, global_qubit_map)
 
     all_moments: list[Moment] = []
-    all_schedules = Schedule()
+    all_schedules: list[int] = []
     global_i2q = QubitMap({i: q for q, i in scheduled_circuits.q2i.items()})
 
     while scheduled_circuits.has_pending_moment():
         schedule, moments = scheduled_circuits.collect_moments_at_minimum_schedule()
-        # Flatten the moments into a list of operations to perform some modifications
-        instructions: list[stim.CircuitInstruction] = sum(
-            (list(moment.instructions) for moment in moments), start=[]
-        )
+        # Flatten the moments into a list of operations to perform some
+        # modifications. Instructions are accumulated in linear time.
+        instructions: list[stim.CircuitInstruction] = []
+        for moment in moments:
+            instructions.extend(moment.instructions)
         # Avoid duplicated operations. Any operation that have the Plaquette.get_mergeable_tag() tag
         # is considered mergeable, and can be removed if another operation in the list
         # is considered equal (and has the mergeable tag).
@@ -270,13 +295,19 @@ def merge_scheduled_circuits(
         for inst in deduplicated_instructions:
             circuit.append(
                 inst.name,
-                sum(_sort_target_groups(inst.target_groups()), start=[]),
+                list(
+                    itertools.chain.from_iterable(
+                        _sort_target_groups(inst.target_groups())
+                    )
+                ),
                 inst.gate_args_copy(),
             )
         all_moments.append(Moment(circuit))
         all_schedules.append(schedule)
 
-    return ScheduledCircuit(all_moments, all_schedules, global_i2q, _avoid_checks=True)
+    return ScheduledCircuit(
+        all_moments, Schedule(all_schedules), global_i2q, _avoid_checks=True
+    )
 
 
 def relabel_circuits_qubit_indices(
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Mapping
 
-from tqec.circuit.generation import generate_circuit
+from tqec.circuit.generation import generate_circuit_from_instantiation
 from tqec.circuit.schedule import ScheduledCircuit
 from tqec.exceptions import TQECException
 from tqec.plaquette.frozendefaultdict import FrozenDefaultDict
@@ -169,9 +169,11 @@ class BlockLayout:
         offset = Displacement(
             top_left_plaquette.x * increments.x, top_left_plaquette.y * increments.y
         )
+        # All the layers share the same template, so only instantiate it once.
+        instantiation = self._template.instantiate(k)
         return [
-            generate_circuit(self._template, k, layer).map_to_qubits(
-                lambda q: q + offset, inplace_qubit_map=True
-            )
+            generate_circuit_from_instantiation(
+                instantiation, layer, increments
+            ).map_to_qubits(lambda q: q + offset, inplace_qubit_map=True)
             for layer in self._layers
         ]
@@ -0,0 +1,212 @@
+"""Defines :class:`~.cache.CompilationCache`, an on-disk cache of the results
+of :func:`~tqec.compile.compile.compile_block_graph` and of
+:meth:`~tqec.computation.block_graph.BlockGraph.get_abstract_observables`.
+
+Both computations only depend on the content of the provided
+:class:`~tqec.computation.block_graph.BlockGraph` instance (and on the
+builders used for compilation), so their results can be stored on disk and
+re-used by later runs working on the same computation, for example when
+generating circuits or running simulations from an unchanged ``.dae`` file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Literal, TypeVar
+
+from tqec._version import __version__
+from tqec.compile.compile import CompiledGraph, compile_block_graph
+from tqec.compile.specs.base import BlockBuilder, SubstitutionBuilder
+from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_BUILDER
+from tqec.computation.abstract_observable import AbstractObservable
+from tqec.computation.block_graph import BlockGraph
+from tqec.computation.correlation import CorrelationSurface
+from tqec.computation.cube import Cube
+from tqec.computation.pipe import Pipe
+from tqec.exceptions import TQECException
+
+_T = TypeVar("_T")
+
+
+class CompilationCache:
+    """On-disk cache of the compilation results of block graphs.
+
+    Entries are keyed by
+    :meth:`~tqec.computation.block_graph.BlockGraph.reliable_hash`, which is
+    stable across executions, and by the version of ``tqec`` that computed
+    them. Because the compiled circuits depend on the absolute positions of the
+    cubes, the translation-dependent hash is used.
+
+    Entries are written atomically, so that several processes can share the
+    same cache directory. An entry that cannot be loaded, for example because
+    it is corrupted or has been written by an incompatible version of one of
+    the dependencies, is re-computed and overwritten.
+
+    Warning:
+        Builders are part of the key through their pickled representation,
+        which only records functions and classes by their qualified name. The
+        builders defined in :mod:`tqec.compile.specs.library` are covered by
+        the ``tqec`` version, but if a custom builder changes its behaviour
+        without changing its name or arguments, the cache directory has to be
+        cleared manually.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Create a cache storing its entries in ``directory``.
+
+        Args:
+            directory: directory where the cached entries are stored. It is
+                created on the first write if it does not exist.
+        """
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def get_abstract_observables(
+        self, block_graph: BlockGraph, *, basis_only: bool = False
+    ) -> tuple[list[AbstractObservable], list[CorrelationSurface]]:
+        """Cached version of
+        :meth:`~tqec.computation.block_graph.BlockGraph.get_abstract_observables`.
+
+        Args:
+            block_graph: graph to get the abstract observables from.
+            basis_only: forwarded to
+                :meth:`~tqec.computation.block_graph.BlockGraph.get_abstract_observables`.
+
+        Returns:
+            A tuple containing the list of abstract observables and the list of
+            correlation surfaces corresponding to the observables.
+        """
+        key = _md5_as_int(
+            [__version__, f"{block_graph.reliable_hash():032x}", f"{basis_only=}"]
+        )
+        filepath = self._directory / "observables" / f"{key:032x}.pkl"
+        cached = self._load(filepath, tuple)
+        if cached is not None:
+            return cached
+        result = block_graph.get_abstract_observables(basis_only=basis_only)
+        self._store(filepath, result)
+        return result
+
+    def compile_block_graph(
+        self,
+        block_graph: BlockGraph,
+        block_builder: BlockBuilder = CSS_BLOCK_BUILDER,
+        substitution_builder: SubstitutionBuilder = CSS_SUBSTITUTION_BUILDER,
+        observables: list[AbstractObservable] | Literal["auto"] | None = "auto",
+    ) -> CompiledGraph:
+        """Cached version of :func:`~tqec.compile.compile.compile_block_graph`.
+
+        Args:
+            block_graph: The block graph to compile.
+            block_builder: forwarded to
+                :func:`~tqec.compile.compile.compile_block_graph`. It should be
+                picklable, which is the case of the builders defined in
+                :mod:`tqec.compile.specs.library`. See the warning in
+                :class:`CompilationCache` about custom builders.
+            substitution_builder: forwarded to
+                :func:`~tqec.compile.compile.compile_block_graph`. It should be
+                picklable, which is the case of the builders defined in
+                :mod:`tqec.compile.specs.library`.
+            observables: forwarded to
+                :func:`~tqec.compile.compile.compile_block_graph`.
+
+        Raises:
+            TQECException: if one of the provided builders cannot be pickled.
+
+        Returns:
+            A :class:`~tqec.compile.compile.CompiledGraph` instance, loaded from
+            the cache if the same compilation has already been performed.
+        """
+        key = _md5_as_int(
+            [
+                __version__,
+                f"{block_graph.reliable_hash():032x}",
+                _builder_hash(block_builder),
+                _builder_hash(substitution_builder),
+                _observables_description(observables),
+            ]
+        )
+        filepath = self._directory / "compiled" / f"{key:032x}.pkl"
+        cached = self._load(filepath, CompiledGraph)
+        if cached is not None:
+            return cached
+        compiled_graph = compile_block_graph(
+            block_graph, block_builder, substitution_builder, observables
+        )
+        self._store(filepath, compiled_graph)
+        return compiled_graph
+
+    @staticmethod
+    def _load(filepath: Path, expected_type: type[_T]) -> _T | None:
+        if not filepath.exists():
+            return None
+        try:
+            with open(filepath, "rb") as f:
+                entry = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # The entry is unusable, let the caller re-compute and overwrite it.
+            return None
+        if not isinstance(entry, expected_type):
+            raise TQECException(
+                f"Found the Python type {type(entry).__name__} in the cache "
+                f"entry {filepath} but {expected_type.__name__} was expected."
+            )
+        return entry
+
+    @staticmethod
+    def _store(filepath: Path, entry: object) -> None:
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that a concurrent reader never
+        # sees a partially written entry.
+        temporary_filepath = filepath.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary_filepath, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(temporary_filepath, filepath)
+
+
+def _md5_as_int(parts: list[str]) -> int:
+    hasher = hashlib.md5()
+    for part in parts:
+        hasher.update(part.encode())
+        hasher.update(b"\n")
+    return int(hasher.hexdigest(), 16)
+
+
+def _builder_hash(builder: BlockBuilder | SubstitutionBuilder) -> str:
+    """Hash of the pickled representation of ``builder``.
+
+    Functions and classes are pickled by qualified name, so the returned hash
+    does not change if the code of the builder changes.
+    """
+    try:
+        return hashlib.md5(pickle.dumps(builder)).hexdigest()
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise TQECException(
+            f"Cannot use the builder {builder!r} as part of a cache key because "
+            "it cannot be pickled."
+        ) from e
+
+
+def _block_description(block: Cube | Pipe) -> str:
+    if isinstance(block, Cube):
+        return f"C {block.position.as_tuple()} {block.kind}"
+    return f"P {block.u.position.as_tuple()} {block.v.position.as_tuple()} {block.kind}"
+
+
+def _observables_description(
+    observables: list[AbstractObservable] | Literal["auto"] | None,
+) -> str:
+    if observables is None or observables == "auto":
+        return str(observables)
+    return "|".join(
+        " ".join(sorted(_block_description(b) for b in observable.top_lines))
+        + " / "
+        + " ".join(sorted(_block_description(b) for b in observable.bottom_regions))
+        for observable in observables
+    )
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from tqec.compile.cache import CompilationCache
+from tqec.compile.compile import compile_block_graph
+from tqec.exceptions import TQECWarning
+from tqec.gallery.logical_cnot import logical_cnot_block_graph
+from tqec.gallery.solo_node import solo_node_block_graph
+
+
+def test_cached_abstract_observables(tmp_path: Path) -> None:
+    g = logical_cnot_block_graph("X")
+    cache = CompilationCache(tmp_path)
+    observables, surfaces = cache.get_abstract_observables(g)
+    assert (observables, surfaces) == g.get_abstract_observables()
+    assert len(list((tmp_path / "observables").iterdir())) == 1
+
+    cached_observables, cached_surfaces = CompilationCache(
+        tmp_path
+    ).get_abstract_observables(logical_cnot_block_graph("X"))
+    assert cached_observables == observables
+    assert cached_surfaces == surfaces
+
+
+def test_cached_compile_block_graph(tmp_path: Path) -> None:
+    g = solo_node_block_graph("Z")
+    cache = CompilationCache(tmp_path)
+    compiled_graph = cache.compile_block_graph(g)
+    cached_compiled_graph = cache.compile_block_graph(g)
+    assert len(list((tmp_path / "compiled").iterdir())) == 1
+    assert cached_compiled_graph.generate_stim_circuit(1) == compile_block_graph(
+        g
+    ).generate_stim_circuit(1)
+    assert cached_compiled_graph.observables == compiled_graph.observables
+
+    with pytest.warns(TQECWarning, match="includes no observable"):
+        cache.compile_block_graph(g, observables=None)
+    cache.compile_block_graph(solo_node_block_graph("X"))
+    assert len(list((tmp_path / "compiled").iterdir())) == 3
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", b"\x80\x04\x95"])
+def test_cache_recomputes_corrupted_entries(tmp_path: Path, content: bytes) -> None:
+    g = logical_cnot_block_graph("X")
+    cache = CompilationCache(tmp_path)
+    expected = cache.get_abstract_observables(g)
+    (entry,) = (tmp_path / "observables").iterdir()
+    entry.write_bytes(content)
+
+    assert cache.get_abstract_observables(g) == expected
+    # The corrupted entry has been overwritten.
+    assert CompilationCache._load(entry, tuple) == expected
@@ -1,22 +1,33 @@
 """Defines :class:`~.compile.CompiledGraph` and
 :func:`~.compile.compile_block_graph`."""
 
+import contextlib
 import itertools
+import pathlib
 import warnings
-from dataclasses import dataclass
-from typing import Literal, Sequence, cast
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Literal, Sequence, TextIO, cast
 
 import stim
 
 from tqec.circuit.coordinates import StimCoordinates
-from tqec.circuit.measurement_map import MeasurementRecordsMap
+from tqec.circuit.instructions import circuit_to_exact_text
+from tqec.circuit.measurement_map import (
+    IncrementalMeasurementRecordsMap,
+    MeasurementRecordsMap,
+)
+from tqec.circuit.qubit import GridQubit
 from tqec.circuit.qubit_map import QubitMap
 from tqec.circuit.schedule import ScheduledCircuit
 from tqec.compile.block import BlockLayout, CompiledBlock
-from tqec.compile.detectors.compute import compute_detectors_for_fixed_radius
 from tqec.compile.detectors.database import DetectorDatabase
 from tqec.compile.detectors.detector import Detector
-from tqec.compile.observables import inplace_add_observables
+from tqec.compile.detectors.stencil import DetectorStencil
+from tqec.compile.observables import (
+    inplace_add_observables,
+    inplace_add_observables_to_time_slice,
+)
 from tqec.compile.specs.base import (
     BlockBuilder,
     CubeSpec,
@@ -27,11 +38,10 @@ from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_B
 from tqec.computation.abstract_observable import AbstractObservable
 from tqec.computation.block_graph import BlockGraph
 from tqec.exceptions import TQECException, TQECWarning
-from tqec.noise_model import NoiseModel
+from tqec.noise_model import NoiseModel, NoisyCircuitWriter
 from tqec.plaquette.plaquette import Plaquettes, RepeatedPlaquettes
 from tqec.position import Direction3D, Position3D
 from tqec.scale import round_or_fail
-from tqec.templates.base import Template
 from tqec.templates.layout import LayoutTemplate
 
 
@@ -57,6 +67,13 @@ class CompiledGraph:
     observables: list[AbstractObservable]
     """Observables to be included in the final ``stim.Circuit`` instance."""
 
+    _detector_stencils: dict[int, list[DetectorStencil]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    """Detector stencils of each layer, indexed by Manhattan radius. They are
+    independent of ``k`` and re-used across calls to
+    :meth:`generate_stim_circuit`."""
+
     def __post_init__(self) -> None:
         if len(self.layout_slices) == 0:
             raise TQECException(
@@ -75,9 +92,15 @@ class CompiledGraph:
         manhattan_radius: int = 2,
         detector_database: DetectorDatabase | None = None,
         only_use_database: bool = False,
+        num_workers: int = 1,
     ) -> stim.Circuit:
         """Generate the ``stim.Circuit`` from the compiled graph.
 
+        Detectors are computed using ``k``-independent stencils that are cached
+        on ``self``. Calling this method for several values of ``k`` only
+        analyses the situations that have not been encountered by a previous
+        call.
+
         Args:
             k: scale factor of the templates.
             noise_models: noise models to be applied to the circuit.
@@ -89,6 +112,236 @@ class CompiledGraph:
             only_use_database: if ``True``, only detectors from the database
                 will be used. An error will be raised if a situation that is not
                 registered in the database is encountered.
+            num_workers: number of processes used to compute detectors. If
+                larger than ``1``, the detectors of each time slice are computed
+                in parallel by a pool of ``num_workers`` processes. Defaults to
+                ``1``, meaning that detectors are computed sequentially in the
+                current process.
+
+        Returns:
+            A compiled stim circuit.
+        """
+        stencils = (
+            self._get_detector_stencils(manhattan_radius)
+            if manhattan_radius >= 0
+            else None
+        )
+        return self._generate_stim_circuit(
+            k,
+            self._flattened_plaquettes(),
+            stencils,
+            noise_model,
+            detector_database,
+            only_use_database,
+            num_workers,
+        )
+
+    def generate_stim_circuits(
+        self,
+        ks: Sequence[int],
+        noise_model: NoiseModel | None = None,
+        manhattan_radius: int = 2,
+        detector_database: DetectorDatabase | None = None,
+        only_use_database: bool = False,
+        num_workers: int = 1,
+    ) -> list[stim.Circuit]:
+        """Generate one ``stim.Circuit`` per provided scale factor.
+
+        This method returns the same circuits as calling
+        :meth:`generate_stim_circuit` once for each entry in ``ks``. Scale
+        factors are processed by increasing value and the work that does not
+        depend on ``k`` is only done once:
+
+        - the plaquettes of each layer and the detector stencils are collected
+          once, and the stencils let each scale factor re-use the detectors of
+          the situations found for the previous ones,
+        - if ``num_workers > 1``, a single pool of processes computes the
+          detectors of all the scale factors, and ``detector_database`` is only
+          sent once to each of them.
+
+        Templates are instantiated, circuits are built and noise is applied
+        for each scale factor, as these steps depend on ``k``.
+
+        Args:
+            ks: scale factors of the templates. Duplicated entries are only
+                generated once and the returned circuits are independent copies.
+            noise_model: noise model to be applied to the circuits.
+            manhattan_radius: radius considered to compute detectors.
+                Detectors are not computed and added to the circuits if this
+                argument is negative.
+            detector_database: an instance to retrieve from / store in detectors
+                that are computed as part of the circuit generation.
+            only_use_database: if ``True``, only detectors from the database
+                will be used. An error will be raised if a situation that is not
+                registered in the database is encountered.
+            num_workers: number of processes used to compute detectors. See
+                :meth:`generate_stim_circuit`.
+
+        Returns:
+            the compiled stim circuits, ``ret[i]`` being the circuit for
+            ``ks[i]``.
+        """
+        flattened_plaquettes = self._flattened_plaquettes()
+        stencils = (
+            self._get_detector_stencils(manhattan_radius)
+            if manhattan_radius >= 0
+            else None
+        )
+        circuits_by_k: dict[int, stim.Circuit] = {}
+        with contextlib.ExitStack() as stack:
+            executor = (
+                stack.enter_context(
+                    _detector_executor(
+                        num_workers, detector_database, only_use_database
+                    )
+                )
+                if stencils is not None and num_workers > 1
+                else None
+            )
+            for k in sorted(set(ks)):
+                circuits_by_k[k] = self._generate_stim_circuit(
+                    k,
+                    flattened_plaquettes,
+                    stencils,
+                    noise_model,
+                    detector_database,
+                    only_use_database,
+                    num_workers,
+                    executor,
+                )
+        returned_ks: set[int] = set()
+        circuits: list[stim.Circuit] = []
+        for k in ks:
+            circuits.append(
+                circuits_by_k[k].copy() if k in returned_ks else circuits_by_k[k]
+            )
+            returned_ks.add(k)
+        return circuits
+
+    def write_stim_circuit(
+        self,
+        path_or_stream: str | pathlib.Path | TextIO,
+        k: int,
+        noise_model: NoiseModel | None = None,
+        manhattan_radius: int = 2,
+        detector_database: DetectorDatabase | None = None,
+        only_use_database: bool = False,
+        num_workers: int = 1,
+    ) -> None:
+        """Generate the ``stim.Circuit`` from the compiled graph and write it,
+        in ``stim`` text format, to the provided file or stream.
+
+        This method writes the same circuit as the one returned by
+        :meth:`generate_stim_circuit`, but never holds the whole circuit in
+        memory: the circuit is generated, annotated with observables and
+        detectors, made noisy and written one time slice at a time. This is
+        useful for large values of ``k`` or for computations spanning a large
+        number of time slices.
+
+        Note:
+            The qubit indices are assigned from all the qubits used by the
+            circuit, so the circuits of each time slice are generated twice:
+            once to collect the qubits they use and once to be written.
+
+        Args:
+            path_or_stream: path of the file to write the circuit to, or text
+                stream supporting ``write``. A stream is not closed by this
+                method.
+            k: scale factor of the templates.
+            noise_model: noise model to be applied to the circuit.
+            manhattan_radius: radius considered to compute detectors.
+                Detectors are not computed and added to the circuit if this
+                argument is negative.
+            detector_database: an instance to retrieve from / store in detectors
+                that are computed as part of the circuit generation.
+            only_use_database: if ``True``, only detectors from the database
+                will be used. An error will be raised if a situation that is not
+                registered in the database is encountered.
+            num_workers: number of processes used to compute detectors. See
+                :meth:`generate_stim_circuit`.
+        """
+        if isinstance(path_or_stream, (str, pathlib.Path)):
+            with open(path_or_stream, "w") as stream:
+                self.write_stim_circuit(
+                    stream,
+                    k,
+                    noise_model,
+                    manhattan_radius,
+                    detector_database,
+                    only_use_database,
+                    num_workers,
+                )
+            return
+        stencils = (
+            self._get_detector_stencils(manhattan_radius)
+            if manhattan_radius >= 0
+            else None
+        )
+        self._write_stim_circuit(
+            path_or_stream,
+            k,
+            stencils,
+            noise_model,
+            detector_database,
+            only_use_database,
+            num_workers,
+        )
+
+    def populate_detector_database(
+        self,
+        ks: Sequence[int],
+        detector_database: DetectorDatabase,
+        manhattan_radius: int = 2,
+    ) -> None:
+        """Compute the detectors of all the situations that are encountered
+        when generating circuits for the provided scale factors and store them
+        in ``detector_database``.
+
+        No circuit is generated. This is useful to fill a database once before
+        sending it to several processes generating circuits, for example with
+        ``only_use_database=True``.
+
+        Args:
+            ks: scale factors of the templates.
+            detector_database: database that should contain all the situations
+                encountered for the provided scale factors when this method
+                returns.
+            manhattan_radius: radius considered to compute detectors.
+        """
+        stencils = self._get_detector_stencils(manhattan_radius)
+        for k in sorted(set(ks)):
+            for stencil in stencils:
+                stencil.populate_database(k, detector_database)
+
+    def _generate_stim_circuit(
+        self,
+        k: int,
+        flattened_plaquettes: Sequence[Plaquettes],
+        stencils: Sequence[DetectorStencil] | None,
+        noise_model: NoiseModel | None,
+        detector_database: DetectorDatabase | None,
+        only_use_database: bool,
+        num_workers: int,
+        executor: ProcessPoolExecutor | None = None,
+    ) -> stim.Circuit:
+        """Implementation of :meth:`generate_stim_circuit`.
+
+        Args:
+            k: scale factor of the templates.
+            flattened_plaquettes: plaquettes of each layer of ``self``, as
+                returned by :meth:`_flattened_plaquettes`.
+            stencils: detector stencils of each layer of ``self``, as returned
+                by :meth:`_get_detector_stencils`. Detectors are not computed
+                if ``None``.
+            noise_model: noise models to be applied to the circuit.
+            detector_database: an instance to retrieve from / store in detectors
+                that are computed as part of the circuit generation.
+            only_use_database: if ``True``, only detectors from the database
+                will be used.
+            num_workers: number of processes used to compute detectors.
+            executor: pool of processes used to compute detectors, as returned
+                by :func:`_detector_executor`. If ``None``, a pool is created
+                if ``num_workers > 1``.
 
         Returns:
             A compiled stim circuit.
@@ -116,26 +369,15 @@ class CompiledGraph:
         flattened_circuits: list[ScheduledCircuit] = sum(
             circuits, start=cast(list[ScheduledCircuit], [])
         )
-        flattened_templates: list[LayoutTemplate] = sum(
-            (
-                [layout.template for _ in range(layout.num_layers)]
-                for layout in self.layout_slices
-            ),
-            start=cast(list[LayoutTemplate], []),
-        )
-        flattened_plaquettes: list[Plaquettes] = sum(
-            (layout.layers for layout in self.layout_slices),
-            start=cast(list[Plaquettes], []),
-        )
-        if manhattan_radius >= 0:
+        if stencils is not None:
             self._inplace_add_detectors_to_circuits(
                 flattened_circuits,
-                flattened_templates,
-                flattened_plaquettes,
+                stencils,
                 k,
-                manhattan_radius,
                 detector_database=detector_database,
                 only_use_database=only_use_database,
+                num_workers=num_workers,
+                executor=executor,
             )
         # Assemble the circuits.
         circuit = global_qubit_map.to_circuit()
@@ -154,9 +396,149 @@ class CompiledGraph:
             circuit = noise_model.noisy_circuit(circuit)
         return circuit
 
+    def _write_stim_circuit(
+        self,
+        out: TextIO,
+        k: int,
+        stencils: Sequence[DetectorStencil] | None,
+        noise_model: NoiseModel | None,
+        detector_database: DetectorDatabase | None,
+        only_use_database: bool,
+        num_workers: int,
+    ) -> None:
+        """Implementation of :meth:`write_stim_circuit`.
+
+        Args:
+            out: text stream the circuit is written to.
+            k: scale factor of the templates.
+            stencils: detector stencils of each layer of ``self``, as returned
+                by :meth:`_get_detector_stencils`. Detectors are not computed
+                if ``None``.
+            noise_model: noise models to be applied to the circuit.
+            detector_database: an instance to retrieve from / store in detectors
+                that are computed as part of the circuit generation.
+            only_use_database: if ``True``, only detectors from the database
+                will be used.
+            num_workers: number of processes used to compute detectors.
+        """
+        # The global qubit map has to be known before writing the first
+        # instruction, so collect the qubits used by all the time slices first.
+        used_qubits: set[GridQubit] = set()
+        for layout in self.layout_slices:
+            for circuit in layout.get_shifted_circuits(k):
+                used_qubits.update(circuit.qubits)
+        global_qubit_map = QubitMap.from_qubits(sorted(used_qubits))
+
+        # Detectors only depend on the templates and plaquettes, not on the
+        # circuits, so they can be computed for all the layers up-front.
+        detectors_by_slice = (
+            self._compute_detectors_by_slice(
+                stencils, k, detector_database, only_use_database, num_workers
+            )
+            if stencils is not None
+            else None
+        )
+
+        noisy_writer = (
+            NoisyCircuitWriter(
+                noise_model, out, system_qubits=set(global_qubit_map.indices)
+            )
+            if noise_model is not None
+            else None
+        )
+
+        def write(circuit: stim.Circuit) -> None:
+            if noisy_writer is not None:
+                noisy_writer.append(circuit)
+            elif circuit:
+                out.write(f"{circuit_to_exact_text(circuit)}\n")
+
+        write(global_qubit_map.to_circuit())
+        mrecords_map = IncrementalMeasurementRecordsMap()
+        layer_index = 0
+        for z, layout in enumerate(self.layout_slices):
+            circuits = layout.get_shifted_circuits(k)
+            self._relabel_circuits_qubit_indices_inplace([circuits], global_qubit_map)
+            inplace_add_observables_to_time_slice(
+                circuits, layout.template, z, self.observables, k
+            )
+            for circuit, plaquettes in zip(circuits, layout.layers):
+                if detectors_by_slice is not None:
+                    mrecords_map.add_scheduled_circuit(circuit)
+                    CompiledGraph._inplace_add_detectors_to_circuit(
+                        circuit,
+                        mrecords_map,
+                        detectors_by_slice[layer_index],
+                        shift_coords_by=(
+                            StimCoordinates(0, 0, 1) if layer_index > 0 else None
+                        ),
+                    )
+                if layer_index > 0:
+                    write(stim.Circuit("TICK"))
+                if isinstance(plaquettes, RepeatedPlaquettes):
+                    write(
+                        circuit.get_repeated_circuit(
+                            round_or_fail(plaquettes.repetitions(k)),
+                            include_qubit_coords=False,
+                        )
+                    )
+                else:
+                    write(circuit.get_circuit(include_qubit_coords=False))
+                layer_index += 1
+        if noisy_writer is not None:
+            noisy_writer.close()
+
+    def _flattened_templates(self) -> list[LayoutTemplate]:
+        """Returns the template used by each layer of ``self``."""
+        return sum(
+            (
+                [layout.template for _ in range(layout.num_layers)]
+                for layout in self.layout_slices
+            ),
+            start=cast(list[LayoutTemplate], []),
+        )
+
+    def _flattened_plaquettes(self) -> list[Plaquettes]:
+        """Returns the plaquettes used by each layer of ``self``."""
+        return sum(
+            (layout.layers for layout in self.layout_slices),
+            start=cast(list[Plaquettes], []),
+        )
+
+    def _get_detector_stencils(self, manhattan_radius: int) -> list[DetectorStencil]:
+        """Returns one :class:`DetectorStencil` per layer of ``self``.
+
+        The first stencil only considers the first layer, and the stencil at
+        index ``i > 0`` considers the layers ``i - 1`` and ``i``. Stencils are
+        created once per ``manhattan_radius`` and then re-used for any ``k``.
+
+        Args:
+            manhattan_radius: radius considered to compute detectors.
+
+        Returns:
+            the detector stencils, one for each layer in ``self``.
+        """
+        if manhattan_radius not in self._detector_stencils:
+            templates = self._flattened_templates()
+            plaquettes = self._flattened_plaquettes()
+            stencils = [
+                DetectorStencil((templates[0],), (plaquettes[0],), manhattan_radius)
+            ]
+            for i in range(1, len(templates)):
+                stencils.append(
+                    DetectorStencil(
+                        (templates[i - 1], templates[i]),
+                        (plaquettes[i - 1], plaquettes[i]),
+                        manhattan_radius,
+                    )
+                )
+            self._detector_stencils[manhattan_radius] = stencils
+        return self._detector_stencils[manhattan_radius]
+
     @staticmethod
     def _relabel_circuits_qubit_indices_inplace(
         circuits: Sequence[Sequence[ScheduledCircuit]],
+        global_qubit_map: QubitMap | None = None,
     ) -> QubitMap:
         """Equivalent to :func:`relabel_circuits_qubit_indices` but applied to
         nested lists and performing the modifications in-place in the provided
@@ -165,18 +547,23 @@ class CompiledGraph:
         Args:
             circuits: circuit instances to remap. This parameter is mutated by
                 this function.
+            global_qubit_map: qubit map to use to remap the qubit indices. Should
+                contain all the qubits used by ``circuits``. Defaults to ``None``,
+                meaning that the qubit map is computed from the qubits used by
+                ``circuits``.
 
         Returns:
             qubit map used to remap the qubit indices that is valid for all the
             circuits provided as input after this method executed.
         """
-        used_qubits = frozenset(
-            # Using itertools to avoid the edge case where there is no circuit
-            itertools.chain.from_iterable(
-                [c.qubits for clayer in circuits for c in clayer]
+        if global_qubit_map is None:
+            used_qubits = frozenset(
+                # Using itertools to avoid the edge case where there is no circuit
+                itertools.chain.from_iterable(
+                    [c.qubits for clayer in circuits for c in clayer]
+                )
             )
-        )
-        global_qubit_map = QubitMap.from_qubits(sorted(used_qubits))
+            global_qubit_map = QubitMap.from_qubits(sorted(used_qubits))
         global_q2i = global_qubit_map.q2i
         for circuit in itertools.chain.from_iterable(circuits):
             local_indices_to_global_indices = {
@@ -189,27 +576,25 @@ class CompiledGraph:
     @staticmethod
     def _inplace_add_detectors_to_circuits(
         circuits: Sequence[ScheduledCircuit],
-        templates: Sequence[Template],
-        plaquettes: Sequence[Plaquettes],
+        stencils: Sequence[DetectorStencil],
         k: int,
-        manhattan_radius: int = 2,
         detector_database: DetectorDatabase | None = None,
         only_use_database: bool = False,
+        num_workers: int = 1,
+        executor: ProcessPoolExecutor | None = None,
     ) -> None:
         """Compute and add in-place to ``circuits`` valid detectors.
 
         Args:
             circuits: circuits to add detectors to. Should have the same number
-                of entries as ``templates`` and ``plaquettes``.
-            templates: templates used to generate the provided ``circuits``. Should
-                have the same number of entries as ``circuits`` and ``plaquettes``.
-            plaquettes: plaquettes used to generate the provided ``circuits``.
-                Should have the same number of entries as ``circuits`` and
-                ``templates``.
+                of entries as ``stencils``.
+            stencils: detector stencils of each of the provided ``circuits``. The
+                first stencil should only describe the first circuit and the
+                stencil at index ``i > 0`` should describe the pair of circuits
+                ``(i - 1, i)``. Stencils are updated in-place with the situations
+                encountered.
             k: scaling parameter that has been used to generate the provided
                 ``circuits``.
-            manhattan_radius: radius considered to compute detectors. Defaults
-                to 2.
             detector_database: a database associating "situations" (subtemplate
                 and plaquettes) to already computed detectors. Defaults to None,
                 meaning that no database is provided and all the detectors should
@@ -220,52 +605,93 @@ class CompiledGraph:
                 raised. Defaults to False, meaning that encountered "situations"
                 that are not present in the database will be analysed to find
                 detectors.
+            num_workers: number of processes used to compute the detectors of
+                each stencil. If larger than ``1``, each worker receives a copy
+                of the stencil, each worker receives a copy of the provided
+                ``detector_database`` once, and the situations found by the
+                workers are merged back into ``stencils`` and
+                ``detector_database``. Defaults to ``1``.
+            executor: pool of processes, as returned by
+                :func:`_detector_executor`, used to compute the detectors
+                instead of creating a new one. Defaults to ``None``.
         """
-        # Start with the first circuit, as this is a special case.
-        first_template = templates[0]
-        first_plaquettes = plaquettes[0]
-        first_slice_detectors = compute_detectors_for_fixed_radius(
-            (first_template,),
-            k,
-            (first_plaquettes,),
-            manhattan_radius,
-            detector_database,
-            only_use_database,
-        )
-        # Initialise the measurement records map with the first circuit.
-        mrecords_map = MeasurementRecordsMap.from_scheduled_circuit(circuits[0])
-        # Add the detectors to the first circuit
-        CompiledGraph._inplace_add_detectors_to_circuit(
-            circuits[0], mrecords_map, first_slice_detectors
+        detectors_by_slice = CompiledGraph._compute_detectors_by_slice(
+            stencils, k, detector_database, only_use_database, num_workers, executor
         )
 
-        # Now, iterate over all the pairs of circuits.
-        for i in range(1, len(circuits)):
-            current_circuit = circuits[i]
-            slice_detectors = compute_detectors_for_fixed_radius(
-                (templates[i - 1], templates[i]),
-                k,
-                (plaquettes[i - 1], plaquettes[i]),
-                manhattan_radius,
-                detector_database,
-                only_use_database,
-            )
-            mrecords_map = mrecords_map.with_added_measurements(
-                MeasurementRecordsMap.from_scheduled_circuit(current_circuit)
-            )
+        # Resolving measurement offsets is cheap and has to be done sequentially.
+        # The map is extended in-place with the measurements of each circuit, so
+        # that resolving the offsets stays linear in the number of measurements.
+        mrecords_map = IncrementalMeasurementRecordsMap()
+        for i, current_circuit in enumerate(circuits):
+            mrecords_map.add_scheduled_circuit(current_circuit)
             CompiledGraph._inplace_add_detectors_to_circuit(
                 current_circuit,
                 mrecords_map,
-                slice_detectors,
-                shift_coords_by=StimCoordinates(0, 0, 1),
+                detectors_by_slice[i],
+                # The first circuit is a special case: coordinates should not be
+                # shifted before its detectors.
+                shift_coords_by=StimCoordinates(0, 0, 1) if i > 0 else None,
             )
         # We are now over, all the detectors should be added inplace to the end
         # of the last circuit containing a measurement involved in the detector.
 
+    @staticmethod
+    def _compute_detectors_by_slice(
+        stencils: Sequence[DetectorStencil],
+        k: int,
+        detector_database: DetectorDatabase | None,
+        only_use_database: bool,
+        num_workers: int,
+        executor: ProcessPoolExecutor | None = None,
+    ) -> list[list[Detector]]:
+        """Compute the detectors of each of the provided ``stencils``.
+
+        See :meth:`_inplace_add_detectors_to_circuits` for a description of the
+        parameters.
+
+        Returns:
+            the detectors of each stencil, ``ret[i]`` being the detectors that
+            should be added at the end of the circuit described by
+            ``stencils[i]``.
+        """
+        if num_workers > 1 and executor is None:
+            with _detector_executor(
+                num_workers, detector_database, only_use_database
+            ) as executor:
+                return CompiledGraph._compute_detectors_by_slice(
+                    stencils,
+                    k,
+                    detector_database,
+                    only_use_database,
+                    num_workers,
+                    executor,
+                )
+        if executor is not None:
+            results = list(
+                executor.map(
+                    _compute_detectors_with_stencil, stencils, itertools.repeat(k)
+                )
+            )
+            detectors_by_slice: list[list[Detector]] = []
+            for stencil, (detectors, new_situations, new_database) in zip(
+                stencils, results
+            ):
+                detectors_by_slice.append(detectors)
+                stencil.detectors_by_situation.update(new_situations)
+                if detector_database is not None and len(new_database) > 0:
+                    detector_database.merge(new_database)
+        else:
+            detectors_by_slice = [
+                stencil.get_detectors(k, detector_database, only_use_database)
+                for stencil in stencils
+            ]
+        return detectors_by_slice
+
     @staticmethod
     def _inplace_add_detectors_to_circuit(
         circuit: ScheduledCircuit,
-        mrecords_map: MeasurementRecordsMap,
+        mrecords_map: MeasurementRecordsMap | IncrementalMeasurementRecordsMap,
         detectors: Sequence[Detector],
         shift_coords_by: StimCoordinates | None = None,
     ) -> None:
@@ -293,6 +719,73 @@ class CompiledGraph:
             circuit.append_annotation(d.to_instruction(mrecords_map))
 
 
+# State shared by all the tasks executed by a worker process computing
+# detectors. It is set once per worker by _initialize_detector_worker instead of
+# being sent with each task.
+_WORKER_DETECTOR_DATABASE: DetectorDatabase | None = None
+_WORKER_ONLY_USE_DATABASE: bool = False
+
+
+def _detector_executor(
+    num_workers: int,
+    detector_database: DetectorDatabase | None,
+    only_use_database: bool,
+) -> ProcessPoolExecutor:
+    """Returns a pool of ``num_workers`` processes computing detectors with
+    :func:`_compute_detectors_with_stencil`.
+
+    The database is sent once to each worker instead of with each stencil.
+    Each worker keeps the situations it computes in its copy of the database,
+    so that a pool can be re-used for several values of ``k``.
+    """
+    return ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_initialize_detector_worker,
+        initargs=(detector_database, only_use_database),
+    )
+
+
+def _initialize_detector_worker(
+    detector_database: DetectorDatabase | None, only_use_database: bool
+) -> None:
+    global _WORKER_DETECTOR_DATABASE, _WORKER_ONLY_USE_DATABASE
+    _WORKER_DETECTOR_DATABASE = detector_database
+    _WORKER_ONLY_USE_DATABASE = only_use_database
+
+
+def _compute_detectors_with_stencil(
+    stencil: DetectorStencil, k: int
+) -> tuple[list[Detector], dict[bytes, frozenset[Detector]], DetectorDatabase]:
+    """Compute the detectors of a stencil in a worker process.
+
+    Because ``stencil`` and the database of the worker are copies of the
+    instances owned by the parent process, the situations found here are
+    returned so that the parent process can merge them back.
+
+    Returns:
+        the detectors of ``stencil``, the situations that were not known by
+        ``stencil`` and a database containing the situations that were not in
+        ``detector_database``.
+    """
+    detector_database = _WORKER_DETECTOR_DATABASE
+    known_situations = set(stencil.detectors_by_situation.keys())
+    num_known_database_situations = (
+        len(detector_database) if detector_database is not None else 0
+    )
+    detectors = stencil.get_detectors(k, detector_database, _WORKER_ONLY_USE_DATABASE)
+    new_situations = {
+        key: value
+        for key, value in stencil.detectors_by_situation.items()
+        if key not in known_situations
+    }
+    new_database = (
+        detector_database.situations_added_after(num_known_database_situations)
+        if detector_database is not None
+        else DetectorDatabase()
+    )
+    return detectors, new_situations, new_database
+
+
 def compile_block_graph(
     block_graph: BlockGraph,
     block_builder: BlockBuilder = CSS_BLOCK_BUILDER,
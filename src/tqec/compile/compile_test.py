@@ -1,9 +1,16 @@
+import io
 import itertools
-from typing import Literal
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Literal
 
 import pytest
+import stim
 
+from tqec.compile import compile as compile_module
 from tqec.compile.compile import compile_block_graph
+from tqec.compile.detectors.database import DetectorDatabase
+from tqec.compile.detectors.sqlite_database import SQLiteDetectorDatabase
 from tqec.compile.specs.base import BlockBuilder, SubstitutionBuilder
 from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_BUILDER
 from tqec.compile.specs.library.zxxz import (
@@ -197,3 +204,136 @@ def test_compile_logical_cnot(
     dem = circuit.detector_error_model()
     assert dem.num_observables == 3
     assert len(dem.shortest_graphlike_error()) == d
+
+
+def test_compile_reuses_detector_stencils_across_k() -> None:
+    g = BlockGraph("Single Block Memory Experiment")
+    g.add_node(Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")))
+    compiled_graph = compile_block_graph(g)
+    compiled_graph.generate_stim_circuit(1)
+    circuit = compiled_graph.generate_stim_circuit(2)
+    assert circuit == compile_block_graph(g).generate_stim_circuit(2)
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_compile_generate_stim_circuits(
+    monkeypatch: pytest.MonkeyPatch, num_workers: int
+) -> None:
+    num_pools = 0
+
+    class CountingProcessPoolExecutor(ProcessPoolExecutor):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            nonlocal num_pools
+            num_pools += 1
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(
+        compile_module, "ProcessPoolExecutor", CountingProcessPoolExecutor
+    )
+    g = BlockGraph("Two Same Blocks in Time Experiment")
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+        PipeKind.from_str("ZXO"),
+    )
+    compiled_graph = compile_block_graph(g)
+    ks = [2, 1, 2]
+    noise_model = NoiseModel.uniform_depolarizing(0.001)
+    circuits = compiled_graph.generate_stim_circuits(
+        ks, noise_model=noise_model, num_workers=num_workers
+    )
+    assert len(circuits) == len(ks)
+    # The detectors of all the scale factors are computed by the same pool.
+    assert num_pools == (1 if num_workers > 1 else 0)
+    reference_graph = compile_block_graph(g)
+    for k, circuit in zip(ks, circuits):
+        assert circuit == reference_graph.generate_stim_circuit(
+            k, noise_model=noise_model
+        )
+    # Duplicated scale factors should not share the same circuit instance.
+    assert circuits[0] is not circuits[2]
+    circuits[0].append("TICK")
+    assert circuits[0] != circuits[2]
+
+
+def test_compile_parallel_detector_computation() -> None:
+    g = BlockGraph("Two Same Blocks in Time Experiment")
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+        PipeKind.from_str("ZXO"),
+    )
+    database = DetectorDatabase()
+    compiled_graph = compile_block_graph(g)
+    circuit = compiled_graph.generate_stim_circuit(
+        1, detector_database=database, num_workers=2
+    )
+    assert circuit == compile_block_graph(g).generate_stim_circuit(1)
+    assert len(database) > 0
+    # The situations found by the workers should have been merged back.
+    assert all(
+        stencil.num_situations > 0
+        for stencil in compiled_graph._get_detector_stencils(2)  # pyright: ignore[reportPrivateUsage]
+    )
+    frozen_database_circuit = compile_block_graph(g).generate_stim_circuit(
+        1, detector_database=database, only_use_database=True, num_workers=2
+    )
+    assert frozen_database_circuit == circuit
+
+
+def test_compile_parallel_detector_computation_sqlite_database(tmp_path: Path) -> None:
+    g = BlockGraph("Two Same Blocks in Time Experiment")
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+        PipeKind.from_str("ZXO"),
+    )
+    database = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    circuit = compile_block_graph(g).generate_stim_circuit(
+        1, detector_database=database, num_workers=2
+    )
+    # Workers write directly to the shared file.
+    assert len(database) > 0
+    database.freeze()
+    assert circuit == compile_block_graph(g).generate_stim_circuit(
+        1, detector_database=database, only_use_database=True
+    )
+
+
+@pytest.mark.parametrize(
+    ("noise_model", "manhattan_radius"),
+    [
+        (None, 2),
+        (None, -1),
+        (NoiseModel.uniform_depolarizing(0.001), 2),
+        (NoiseModel.uniform_depolarizing(0.01), -1),
+        # Probabilities that cannot be written with 6 significant digits.
+        (NoiseModel.uniform_depolarizing(1 / 3000), -1),
+    ],
+)
+def test_compile_write_stim_circuit(
+    noise_model: NoiseModel | None, manhattan_radius: int
+) -> None:
+    g = logical_cnot_block_graph("Z")
+    compiled_graph = compile_block_graph(g)
+    stream = io.StringIO()
+    compiled_graph.write_stim_circuit(
+        stream, 1, noise_model=noise_model, manhattan_radius=manhattan_radius
+    )
+    assert stim.Circuit(stream.getvalue()) == compiled_graph.generate_stim_circuit(
+        1, noise_model=noise_model, manhattan_radius=manhattan_radius
+    )
+
+
+def test_compile_write_stim_circuit_to_file(tmp_path: Path) -> None:
+    g = BlockGraph("Two Same Blocks in Time Experiment")
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+        PipeKind.from_str("ZXO"),
+    )
+    compiled_graph = compile_block_graph(g)
+    compiled_graph.write_stim_circuit(tmp_path / "circuit.stim", 2)
+    assert stim.Circuit.from_file(
+        tmp_path / "circuit.stim"
+    ) == compiled_graph.generate_stim_circuit(2)
@@ -23,6 +23,15 @@ as a database for detectors and that can be used to:
 - ensure that the detectors in the final circuit are detectors from the provided
   database only (helps with reproducibility).
 
+:class:`~.sqlite_database.SQLiteDetectorDatabase` implements the same
+interface on top of a SQLite file. Situations are written as soon as they are
+added and the file can be used concurrently by several processes.
+
+Finally, :class:`~.stencil.DetectorStencil` keeps the detectors of each
+situation encountered in a given time slice, allowing to compute the detectors
+of that time slice for any value of ``k`` without analysing again situations
+that have already been encountered.
+
 Implementation details can be found in the respective function/class
 documentation.
 """
@@ -32,3 +41,5 @@ from .compute import (
 )
 from .database import DetectorDatabase as DetectorDatabase
 from .detector import Detector as Detector
+from .sqlite_database import SQLiteDetectorDatabase as SQLiteDetectorDatabase
+from .stencil import DetectorStencil as DetectorStencil
@@ -1,5 +1,5 @@
 import json
-from typing import Sequence
+from typing import Mapping, Sequence
 
 import numpy
 import numpy.typing as npt
@@ -26,7 +26,9 @@ from tqec.templates.base import Template
 from tqec.templates.display import get_template_representation_from_instantiation
 from tqec.templates.subtemplates import (
     SubTemplateType,
+    Unique3DSubTemplates,
     get_spatially_distinct_3d_subtemplates,
+    stack_spatially_distinct_subtemplates,
 )
 
 
@@ -468,6 +470,106 @@ def _compute_superimposed_template_instantiations(
     return ret
 
 
+def _get_common_increments(templates: Sequence[Template]) -> Displacement:
+    """Returns the increments shared by all the provided ``templates``.
+
+    Raises:
+        TQECException: if the provided templates do not all have the same
+            increments.
+    """
+    all_increments = frozenset(t.get_increments() for t in templates)
+    if len(all_increments) != 1:
+        raise TQECException(
+            "Expected all the provided templates to have the same increments. "
+            f"Found the following different increments: {all_increments}."
+        )
+    return next(iter(all_increments))
+
+
+def _compute_unique_3d_subtemplates(
+    templates: Sequence[Template], k: int, manhattan_radius: int
+) -> Unique3DSubTemplates:
+    """Instantiate the provided ``templates`` and return the 3-dimensional
+    sub-templates found in the stacked instantiations.
+
+    Args:
+        templates: a sequence containing `t` :class:`Template` instance(s), each
+            representing one QEC round.
+        k: scaling factor to consider in order to instantiate the provided
+            templates.
+        manhattan_radius: Manhattan radius of the extracted sub-templates.
+
+    Note:
+        If all the provided ``templates`` have the same shape and origin, the
+        sub-templates of each of them are computed with
+        :meth:`~tqec.templates.base.Template.get_spatially_distinct_subtemplates`
+        that might be specialised to avoid instantiating large templates.
+
+    Returns:
+        all the 3-dimensional sub-templates found, avoiding sub-templates with a
+        zero plaquette at their center.
+    """
+    last_shape = templates[-1].shape(k)
+    last_origin = templates[-1].instantiation_origin(k)
+    if all(
+        t.shape(k) == last_shape and t.instantiation_origin(k) == last_origin
+        for t in templates
+    ):
+        return stack_spatially_distinct_subtemplates(
+            [
+                t.get_spatially_distinct_subtemplates(
+                    k, manhattan_radius, avoid_zero_plaquettes=True
+                )
+                for t in templates
+            ]
+        )
+    template_instantiations = _compute_superimposed_template_instantiations(
+        templates, k
+    )
+    return get_spatially_distinct_3d_subtemplates(
+        template_instantiations,
+        manhattan_radius=manhattan_radius,
+        avoid_zero_plaquettes=True,
+    )
+
+
+def _tile_detectors(
+    unique_3d_subtemplates: Unique3DSubTemplates,
+    detectors_by_subtemplate: Mapping[tuple[int, ...], frozenset[Detector]],
+    origin: Position2D,
+    increments: Displacement,
+) -> list[Detector]:
+    """Translate the detectors computed for each distinct sub-template over all
+    the positions where that sub-template appears.
+
+    Args:
+        unique_3d_subtemplates: the sub-templates, along with the position(s)
+            at which each of them appears.
+        detectors_by_subtemplate: detectors of each sub-template in
+            ``unique_3d_subtemplates.subtemplates``, using a coordinate system
+            centered on the central plaquette origin.
+        origin: instantiation origin of the last template.
+        increments: spatial increments between each `Plaquette` origin.
+
+    Returns:
+        all the detectors, using the global coordinate system.
+    """
+    indices = unique_3d_subtemplates.subtemplate_indices
+    # We know for sure that detectors in each subtemplate all involve a measurement
+    # on at least one syndrome qubit of the central plaquette. That means that
+    # detectors computed here are unique and we do not have to check for
+    # duplicates.
+    # Also, the last timestep template origin might not be (0, 0), so we have
+    # to shift detectors accordingly.
+    detectors: list[Detector] = []
+    for i, j in numpy.argwhere(numpy.any(indices != 0, axis=2)).tolist():
+        shift_x = (j + origin.x) * increments.x
+        shift_y = (i + origin.y) * increments.y
+        for d in detectors_by_subtemplate[tuple(indices[i, j].tolist())]:
+            detectors.append(d.offset_spatially_by(shift_x, shift_y))
+    return detectors
+
+
 def compute_detectors_for_fixed_radius(
     templates: Sequence[Template],
     k: int,
@@ -508,28 +610,15 @@ def compute_detectors_for_fixed_radius(
         a collection of detectors that should be added at the end of the circuit
         that would be obtained from the provided `templates` and `plaquettes`.
     """
-    all_increments = frozenset(t.get_increments() for t in templates)
-    if len(all_increments) != 1:
-        raise TQECException(
-            "Expected all the provided templates to have the same increments. "
-            f"Found the following different increments: {all_increments}."
-        )
-    increments = next(iter(all_increments))
-
+    increments = _get_common_increments(templates)
     if len(templates) != len(plaquettes):
         raise TQECException(
             "Expecting the same number of entries in templates and plaquettes."
         )
 
-    template_instantiations = _compute_superimposed_template_instantiations(
-        templates, k
+    unique_3d_subtemplates = _compute_unique_3d_subtemplates(
+        templates, k, fixed_subtemplate_radius
     )
-    unique_3d_subtemplates = get_spatially_distinct_3d_subtemplates(
-        template_instantiations,
-        manhattan_radius=fixed_subtemplate_radius,
-        avoid_zero_plaquettes=True,
-    )
-
     # Each detector in detectors_by_subtemplate is using a coordinate system
     # centered on the central plaquette origin.
     detectors_by_subtemplate: dict[tuple[int, ...], frozenset[Detector]] = {
@@ -542,24 +631,9 @@ def compute_detectors_for_fixed_radius(
         )
         for indices, s3d in unique_3d_subtemplates.subtemplates.items()
     }
-    # We know for sure that detectors in each subtemplate all involve a measurement
-    # on at least one syndrome qubit of the central plaquette. That means that
-    # detectors computed here are unique and we do not have to check for
-    # duplicates.
-    # Also, the last timestep template origin might not be (0, 0), so we have
-    # to shift detectors accordingly.
-    last_template_origin = templates[-1].instantiation_origin(k)
-    detectors: list[Detector] = []
-    for i, row in enumerate(unique_3d_subtemplates.subtemplate_indices):
-        for j, subtemplate_indices in enumerate(row):
-            if numpy.all(subtemplate_indices == 0):
-                continue
-            for d in detectors_by_subtemplate[tuple(subtemplate_indices)]:
-                detectors.append(
-                    d.offset_spatially_by(
-                        (j + last_template_origin.x) * increments.x,
-                        (i + last_template_origin.y) * increments.y,
-                    )
-                )
-
-    return detectors
+    return _tile_detectors(
+        unique_3d_subtemplates,
+        detectors_by_subtemplate,
+        templates[-1].instantiation_origin(k),
+        increments,
+    )
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import hashlib
+import itertools
 import pickle
 from dataclasses import dataclass, field
 from functools import cached_property
 from pathlib import Path
-from typing import Sequence
+from typing import Iterator, Sequence
 
 from tqec.circuit.generation import generate_circuit_from_instantiation
 from tqec.circuit.measurement_map import MeasurementRecordsMap
@@ -237,6 +238,50 @@ class DetectorDatabase:
         key = _DetectorDatabaseKey(subtemplates, plaquettes_by_timestep)
         return self.mapping.get(key)
 
+    def merge(self, other: DetectorDatabase) -> None:
+        """Add in-place all the situations stored in ``other`` to ``self``.
+
+        Situations that are stored in both databases are overwritten by the
+        detectors from ``other``.
+
+        Args:
+            other: database containing the situations to add to ``self``.
+
+        Raises:
+            TQECException: if this method is called and `self.frozen`.
+        """
+        if self.frozen:
+            raise TQECException("Cannot merge situations into a frozen database.")
+        self.mapping.update(other._iter_situations())
+
+    def _iter_situations(
+        self,
+    ) -> Iterator[tuple[_DetectorDatabaseKey, frozenset[Detector]]]:
+        """Iterate over all the situations stored in ``self`` and their
+        detectors."""
+        yield from self.mapping.items()
+
+    def situations_added_after(self, num_situations: int) -> DetectorDatabase:
+        """Returns a new database containing the situations that were added to
+        ``self`` after it contained ``num_situations`` situations.
+
+        This is used to send back to a parent process the situations that a
+        worker process added to its own copy of a database. Because it relies on
+        the insertion order of situations, the result is only meaningful if no
+        situation has been removed from ``self`` in the meantime.
+
+        Args:
+            num_situations: number of situations that ``self`` contained when
+                the worker received it.
+
+        Returns:
+            a new database with the situations added to ``self`` since it
+            contained ``num_situations`` situations.
+        """
+        return DetectorDatabase(
+            dict(itertools.islice(self.mapping.items(), num_situations, None))
+        )
+
     def freeze(self) -> None:
         self.frozen = True
 
@@ -259,7 +304,7 @@ class DetectorDatabase:
             `self`.
         """
         urls: list[str] = []
-        for key, detectors in self.mapping.items():
+        for key, detectors in self._iter_situations():
             circuit = key.circuit(plaquette_increments)
             rec_map = MeasurementRecordsMap.from_scheduled_circuit(circuit)
             for detector in detectors:
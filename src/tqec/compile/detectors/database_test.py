@@ -232,3 +232,36 @@ def test_detector_database_translation_invariance() -> None:
     detectors = db.get_detectors((translated_subtemplate,), (translated_plaquettes,))
     assert detectors is not None
     assert detectors == DETECTORS[0]
+
+
+def test_detector_database_merge() -> None:
+    db = DetectorDatabase()
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    other = DetectorDatabase()
+    other.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[1])
+    other.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[0])
+
+    db.merge(other)
+    assert len(db) == 2
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) == DETECTORS[1]
+    assert db.get_detectors(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2]) == DETECTORS[0]
+
+    db.freeze()
+    with pytest.raises(
+        TQECException, match="^Cannot merge situations into a frozen database.$"
+    ):
+        db.merge(other)
+
+
+def test_detector_database_situations_added_after() -> None:
+    db = DetectorDatabase()
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    num_situations = len(db)
+    db.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[1])
+    new_situations = db.situations_added_after(num_situations)
+    assert len(new_situations) == 1
+    assert (
+        new_situations.get_detectors(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2])
+        == DETECTORS[1]
+    )
+    assert len(db.situations_added_after(len(db))) == 0
@@ -8,7 +8,10 @@ import stim
 
 from tqec.circuit.coordinates import StimCoordinates
 from tqec.circuit.measurement import Measurement
-from tqec.circuit.measurement_map import MeasurementRecordsMap
+from tqec.circuit.measurement_map import (
+    IncrementalMeasurementRecordsMap,
+    MeasurementRecordsMap,
+)
 from tqec.exceptions import TQECException
 
 
@@ -39,7 +42,9 @@ class Detector:
         return f"D{self.coordinates}{measurements_str}"
 
     def to_instruction(
-        self, measurement_records_map: MeasurementRecordsMap
+        self,
+        measurement_records_map: MeasurementRecordsMap
+        | IncrementalMeasurementRecordsMap,
     ) -> stim.CircuitInstruction:
         """Return the `stim.CircuitInstruction` instance representing the
         detector stored in `self`.
@@ -0,0 +1,258 @@
+"""Defines :class:`~.sqlite_database.SQLiteDetectorDatabase`, a
+:class:`~.database.DetectorDatabase` stored in a SQLite file that can be shared
+between processes."""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from tqec.compile.detectors.database import DetectorDatabase, _DetectorDatabaseKey
+from tqec.compile.detectors.detector import Detector
+from tqec.exceptions import TQECException
+from tqec.plaquette.plaquette import Plaquettes
+from tqec.templates.subtemplates import SubTemplateType
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS situations (
+    hash TEXT NOT NULL,
+    names TEXT NOT NULL,
+    situation BLOB NOT NULL,
+    detectors BLOB NOT NULL,
+    PRIMARY KEY (hash, names)
+)
+"""
+
+
+class SQLiteDetectorDatabase(DetectorDatabase):
+    def __init__(
+        self, filepath: Path, frozen: bool = False, timeout: float = 60.0
+    ) -> None:
+        """A :class:`~.database.DetectorDatabase` stored in a SQLite file.
+
+        Each situation is written to the file as soon as it is added, so that
+        nothing is lost if the process crashes and several processes can use
+        the same file concurrently. Situations are indexed by the stable
+        :meth:`~.database._DetectorDatabaseKey.reliable_hash` of their key,
+        which means that looking up a situation only loads the detectors of
+        that situation.
+
+        Instances can be pickled, for example to be sent to worker processes:
+        only the path of the file is pickled and each process opens its own
+        connection to the file.
+
+        Note:
+            The attribute ``mapping`` inherited from
+            :class:`~.database.DetectorDatabase` is not used and is always
+            empty.
+
+        Args:
+            filepath: path of the SQLite file storing the database. It is
+                created if it does not exist yet.
+            frozen: if ``True``, situations cannot be added to or removed from
+                the database. Default to ``False``.
+            timeout: number of seconds a process waits for another process to
+                release a lock on the file before raising. Default to ``60``.
+        """
+        super().__init__(frozen=frozen)
+        self.filepath = Path(filepath)
+        self.timeout = timeout
+        self._connection_by_pid: tuple[int, sqlite3.Connection] | None = None
+        # Create the file and the table eagerly to raise early if the path is
+        # invalid.
+        self._get_connection()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Connection to the database file, opened by the current process.
+
+        SQLite connections should not be used across a ``fork``, so a new
+        connection is opened whenever the process changes.
+        """
+        pid = os.getpid()
+        if self._connection_by_pid is None or self._connection_by_pid[0] != pid:
+            # exist_ok=True: another process might create the directory
+            # concurrently.
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            # isolation_level=None: each statement is committed immediately.
+            connection = sqlite3.connect(
+                self.filepath, timeout=self.timeout, isolation_level=None
+            )
+            # Write-ahead logging allows readers to proceed concurrently with a
+            # writer.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._connection_by_pid = (pid, connection)
+        return self._connection_by_pid[1]
+
+    @staticmethod
+    def _key_columns(key: _DetectorDatabaseKey) -> tuple[str, str]:
+        return format(key.reliable_hash, "032x"), json.dumps(key.plaquette_names)
+
+    def add_situation(
+        self,
+        subtemplates: Sequence[SubTemplateType],
+        plaquettes_by_timestep: Sequence[Plaquettes],
+        detectors: frozenset[Detector] | Detector,
+    ) -> None:
+        if self.frozen:
+            raise TQECException("Cannot add a situation to a frozen database.")
+        key = _DetectorDatabaseKey(subtemplates, plaquettes_by_timestep)
+        self._insert(
+            key,
+            frozenset([detectors]) if isinstance(detectors, Detector) else detectors,
+        )
+
+    def _insert(
+        self, key: _DetectorDatabaseKey, detectors: frozenset[Detector]
+    ) -> None:
+        self._get_connection().execute(
+            "INSERT OR REPLACE INTO situations VALUES (?, ?, ?, ?)",
+            (*self._key_columns(key), pickle.dumps(key), pickle.dumps(detectors)),
+        )
+
+    def remove_situation(
+        self,
+        subtemplates: Sequence[SubTemplateType],
+        plaquettes_by_timestep: Sequence[Plaquettes],
+    ) -> None:
+        if self.frozen:
+            raise TQECException("Cannot remove a situation to a frozen database.")
+        key = _DetectorDatabaseKey(subtemplates, plaquettes_by_timestep)
+        cursor = self._get_connection().execute(
+            "DELETE FROM situations WHERE hash = ? AND names = ?",
+            self._key_columns(key),
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def get_detectors(
+        self,
+        subtemplates: Sequence[SubTemplateType],
+        plaquettes_by_timestep: Sequence[Plaquettes],
+    ) -> frozenset[Detector] | None:
+        key = _DetectorDatabaseKey(subtemplates, plaquettes_by_timestep)
+        row = (
+            self._get_connection()
+            .execute(
+                "SELECT detectors FROM situations WHERE hash = ? AND names = ?",
+                self._key_columns(key),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        detectors: frozenset[Detector] = pickle.loads(row[0])
+        return detectors
+
+    def merge(self, other: DetectorDatabase) -> None:
+        if self.frozen:
+            raise TQECException("Cannot merge situations into a frozen database.")
+        if isinstance(other, SQLiteDetectorDatabase) and os.path.samefile(
+            self.filepath, other.filepath
+        ):
+            return
+        # Insert everything in a single transaction. The write lock is taken
+        # immediately: upgrading a deferred transaction to a write transaction
+        # fails without waiting if another process is writing.
+        connection = self._get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for key, detectors in other._iter_situations():
+                self._insert(key, detectors)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _iter_situations(
+        self,
+    ) -> Iterator[tuple[_DetectorDatabaseKey, frozenset[Detector]]]:
+        for situation, detectors in self._get_connection().execute(
+            "SELECT situation, detectors FROM situations"
+        ):
+            yield pickle.loads(situation), pickle.loads(detectors)
+
+    def situations_added_after(self, num_situations: int) -> DetectorDatabase:
+        """Returns an empty database.
+
+        Situations are written to the file shared by all the processes as soon
+        as they are added, so there is nothing to send back to another process.
+        """
+        return DetectorDatabase()
+
+    def __len__(self) -> int:
+        (count,) = (
+            self._get_connection().execute("SELECT COUNT(*) FROM situations").fetchone()
+        )
+        return int(count)
+
+    def to_file(self, filepath: Path) -> None:
+        """Write a consistent copy of the database to a new SQLite file.
+
+        The written file can be opened with :meth:`from_file` or by
+        constructing a new :class:`SQLiteDetectorDatabase` instance with
+        ``filepath``.
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        destination = sqlite3.connect(filepath)
+        try:
+            self._get_connection().backup(destination)
+        finally:
+            destination.close()
+
+    @staticmethod
+    def from_file(filepath: Path) -> SQLiteDetectorDatabase:
+        """Open an existing database file, for example one written by
+        :meth:`to_file`.
+
+        Raises:
+            FileNotFoundError: if ``filepath`` does not exist.
+            TQECException: if ``filepath`` is not a SQLite database file.
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(filepath)
+        try:
+            return SQLiteDetectorDatabase(filepath)
+        except sqlite3.DatabaseError as e:
+            raise TQECException(
+                f"The file {filepath} is not a valid SQLite detector database."
+            ) from e
+
+    def close(self) -> None:
+        """Close the connection opened by the current process, if any.
+
+        A new connection is automatically opened if ``self`` is used again.
+        """
+        if self._connection_by_pid is not None:
+            pid, connection = self._connection_by_pid
+            if pid == os.getpid():
+                connection.close()
+            self._connection_by_pid = None
+
+    def __eq__(self, rhs: object) -> bool:
+        return (
+            isinstance(rhs, SQLiteDetectorDatabase)
+            and self.filepath.resolve() == rhs.filepath.resolve()
+            and self.frozen == rhs.frozen
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # Connections cannot be pickled and should not be shared between
+        # processes anyway.
+        state["_connection_by_pid"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(filepath={self.filepath!r}, frozen={self.frozen})"
+        )
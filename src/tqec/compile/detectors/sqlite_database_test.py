@@ -0,0 +1,180 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from tqec.compile.detectors.database import DetectorDatabase
+from tqec.compile.detectors.database_test import (
+    DETECTORS,
+    PLAQUETTE_COLLECTIONS,
+    SUBTEMPLATES,
+)
+from tqec.compile.detectors.sqlite_database import SQLiteDetectorDatabase
+from tqec.exceptions import TQECException
+
+
+def test_sqlite_detector_database_mutation(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    assert len(db) == 0
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    db.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[1])
+    assert len(db) == 2
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) == DETECTORS[0]
+    assert db.get_detectors(SUBTEMPLATES[:3], PLAQUETTE_COLLECTIONS[:3]) is None
+
+    # Override
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[1])
+    assert len(db) == 2
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) == DETECTORS[1]
+
+    # Removing
+    db.remove_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) is None
+    with pytest.raises(KeyError):
+        db.remove_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+
+
+def test_sqlite_detector_database_translation_invariance(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+
+    offset = 36
+    translated_subtemplate = SUBTEMPLATES[0] + offset
+    translated_plaquettes = PLAQUETTE_COLLECTIONS[0].map_indices(lambda i: i + offset)
+    detectors = db.get_detectors((translated_subtemplate,), (translated_plaquettes,))
+    assert detectors == DETECTORS[0]
+
+
+def test_sqlite_detector_database_freeze(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    db.freeze()
+    with pytest.raises(
+        TQECException, match="^Cannot add a situation to a frozen database.$"
+    ):
+        db.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[1])
+    with pytest.raises(
+        TQECException, match="^Cannot remove a situation to a frozen database.$"
+    ):
+        db.remove_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+    with pytest.raises(
+        TQECException, match="^Cannot merge situations into a frozen database.$"
+    ):
+        db.merge(DetectorDatabase())
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) == DETECTORS[0]
+
+
+def test_sqlite_detector_database_persistence(tmp_path: Path) -> None:
+    filepath = tmp_path / "db.sqlite"
+    db = SQLiteDetectorDatabase(filepath)
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    # Situations are written directly, without closing or saving the database.
+    reopened = SQLiteDetectorDatabase(filepath)
+    assert len(reopened) == 1
+    assert (
+        reopened.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+        == DETECTORS[0]
+    )
+
+    copy_filepath = tmp_path / "copy" / "db.sqlite"
+    db.to_file(copy_filepath)
+    db.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[1])
+    copy = SQLiteDetectorDatabase(copy_filepath)
+    assert len(copy) == 1
+    assert (
+        copy.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+        == (DETECTORS[0])
+    )
+    loaded = SQLiteDetectorDatabase.from_file(copy_filepath)
+    assert len(loaded) == 1
+    assert (
+        loaded.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+        == (DETECTORS[0])
+    )
+
+
+def test_sqlite_detector_database_from_invalid_file(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        SQLiteDetectorDatabase.from_file(tmp_path / "missing.sqlite")
+    pickle_filepath = tmp_path / "db.pkl"
+    DetectorDatabase().to_file(pickle_filepath)
+    with pytest.raises(TQECException, match="not a valid SQLite"):
+        SQLiteDetectorDatabase.from_file(pickle_filepath)
+
+
+def test_sqlite_detector_database_pickle(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    unpickled = pickle.loads(pickle.dumps(db))
+    assert unpickled == db
+    unpickled.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[1])
+    assert (
+        db.get_detectors(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2]) == (DETECTORS[1])
+    )
+
+
+def test_sqlite_detector_database_merge(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    db.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[0])
+    other = DetectorDatabase()
+    other.add_situation(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[1])
+    other.add_situation(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2], DETECTORS[0])
+
+    db.merge(other)
+    assert len(db) == 2
+    assert db.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1]) == DETECTORS[1]
+    assert db.get_detectors(SUBTEMPLATES[:2], PLAQUETTE_COLLECTIONS[:2]) == DETECTORS[0]
+
+    # The in-memory database can also merge the SQLite one.
+    in_memory = DetectorDatabase()
+    in_memory.merge(db)
+    assert len(in_memory) == 2
+    assert (
+        in_memory.get_detectors(SUBTEMPLATES[:1], PLAQUETTE_COLLECTIONS[:1])
+        == (DETECTORS[1])
+    )
+
+
+def _add_situation(database: SQLiteDetectorDatabase, i: int) -> None:
+    database.add_situation(
+        SUBTEMPLATES[i : i + 1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[i % 2]
+    )
+
+
+def test_sqlite_detector_database_concurrent_writers(tmp_path: Path) -> None:
+    db = SQLiteDetectorDatabase(tmp_path / "db.sqlite")
+    num_situations = 8
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_add_situation, [db] * num_situations, range(num_situations)))
+    assert len(db) == num_situations
+    for i in range(num_situations):
+        assert (
+            db.get_detectors(SUBTEMPLATES[i : i + 1], PLAQUETTE_COLLECTIONS[:1])
+            == (DETECTORS[i % 2])
+        )
+
+
+def _merge_situation(filepath: Path, i: int) -> None:
+    other = DetectorDatabase()
+    other.add_situation(
+        SUBTEMPLATES[i : i + 1], PLAQUETTE_COLLECTIONS[:1], DETECTORS[i % 2]
+    )
+    SQLiteDetectorDatabase(filepath).merge(other)
+
+
+def test_sqlite_detector_database_concurrent_merges(tmp_path: Path) -> None:
+    # The directory is created concurrently by the worker processes.
+    filepath = tmp_path / "nested" / "directory" / "db.sqlite"
+    num_situations = 8
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                _merge_situation, [filepath] * num_situations, range(num_situations)
+            )
+        )
+    db = SQLiteDetectorDatabase(filepath)
+    assert len(db) == num_situations
+    copy_filepath = tmp_path / "other" / "nested" / "db.sqlite"
+    db.to_file(copy_filepath)
+    assert len(SQLiteDetectorDatabase(copy_filepath)) == num_situations
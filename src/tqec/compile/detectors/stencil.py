@@ -0,0 +1,214 @@
+"""Defines :class:`~.stencil.DetectorStencil`, a ``k``-independent cache of the
+detectors found in a given time slice."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import numpy
+import numpy.typing as npt
+
+from tqec.compile.detectors.compute import (
+    _compute_unique_3d_subtemplates,
+    _get_common_increments,
+    _tile_detectors,
+    compute_detectors_at_end_of_situation,
+)
+from tqec.compile.detectors.database import DetectorDatabase
+from tqec.compile.detectors.detector import Detector
+from tqec.exceptions import TQECException
+from tqec.plaquette.plaquette import Plaquettes
+from tqec.templates.base import Template
+from tqec.templates.subtemplates import Unique3DSubTemplates
+
+
+@dataclass
+class DetectorStencil:
+    """Stores the detectors of each "situation" encountered in a time slice.
+
+    A time slice is described by a sequence of :class:`Template` and a
+    sequence of :class:`Plaquettes` instances, one per QEC round. For a fixed
+    Manhattan radius, the detectors of a given "situation" (i.e., 3-dimensional
+    sub-template) do not depend on the scaling parameter ``k``. Moreover, the
+    number of distinct situations stops growing once ``k`` is large enough.
+
+    This class exploits that fact by keeping the detectors of each situation
+    that has already been encountered, expressed relatively to the origin of
+    the central plaquette of the situation. Computing the detectors for a new
+    value of ``k`` then only requires to find the situations in the scaled
+    templates and to translate the stored detectors over the tiling. Only the
+    situations that have never been encountered before are analysed.
+
+    The situations found for each value of ``k`` are also kept, so that
+    requesting the detectors again for an already seen ``k`` only translates
+    the stored detectors, with a cost linear in the number of detectors. For
+    a new value of ``k``, the situations still have to be extracted from the
+    scaled templates.
+
+    Attributes:
+        templates: a sequence containing `t` :class:`Template` instance(s), each
+            representing one QEC round.
+        plaquettes: a sequence containing `t` collection(s) of plaquettes each
+            representing one QEC round.
+        manhattan_radius: Manhattan radius used to split the templates into
+            sub-templates. See
+            :func:`~tqec.compile.detectors.compute.compute_detectors_for_fixed_radius`.
+        detectors_by_situation: detectors of each situation encountered so far,
+            using a coordinate system centered on the central plaquette origin.
+            Situations are indexed by the raw bytes of their 3-dimensional
+            sub-template, which is valid because ``templates`` and ``plaquettes``
+            are fixed for a given instance.
+    """
+
+    templates: Sequence[Template]
+    plaquettes: Sequence[Plaquettes]
+    manhattan_radius: int = 2
+    detectors_by_situation: dict[bytes, frozenset[Detector]] = field(
+        default_factory=dict, repr=False
+    )
+    _situations_by_k: dict[int, Unique3DSubTemplates] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if len(self.templates) != len(self.plaquettes):
+            raise TQECException(
+                "Expecting the same number of entries in templates and plaquettes."
+            )
+        # Raises if the templates do not share the same increments.
+        _get_common_increments(self.templates)
+
+    def __getstate__(self) -> dict[str, object]:
+        # The situations found for each k are only useful to the process that
+        # extracted them and can be large, so they are not sent to workers.
+        state = self.__dict__.copy()
+        state["_situations_by_k"] = {}
+        return state
+
+    @property
+    def num_situations(self) -> int:
+        """Number of situations for which detectors are already known."""
+        return len(self.detectors_by_situation)
+
+    def get_detectors(
+        self,
+        k: int,
+        database: DetectorDatabase | None = None,
+        only_use_database: bool = False,
+    ) -> list[Detector]:
+        """Returns detectors that should be added at the end of the circuit
+        that would be obtained from ``self.templates`` and ``self.plaquettes``
+        scaled with the provided ``k``.
+
+        This method returns the same detectors as
+        :func:`~tqec.compile.detectors.compute.compute_detectors_for_fixed_radius`
+        but only analyses situations that have never been encountered by
+        ``self``. The detectors of newly encountered situations are stored in
+        ``self``. If a ``database`` is provided, it contains all the situations
+        found when this method returns, including the ones already known by
+        ``self``.
+
+        Args:
+            k: scaling factor to consider in order to instantiate the templates.
+            database: existing database of detectors that is used to avoid
+                computing detectors of situations that are unknown to ``self``.
+                See
+                :func:`~tqec.compile.detectors.compute.compute_detectors_at_end_of_situation`.
+            only_use_database: if True, only detectors from the database will be
+                used and situations are always looked up in the provided
+                ``database``, even if ``self`` already knows them. An error will
+                be raised if a situation that is not registered in the database
+                is encountered. Default to False.
+
+        Returns:
+            a collection of detectors that should be added at the end of the
+            circuit obtained from ``self.templates`` and ``self.plaquettes``.
+        """
+        unique_3d_subtemplates, detectors_by_subtemplate = self._get_situations(
+            k, database, only_use_database, always_use_database=only_use_database
+        )
+        return _tile_detectors(
+            unique_3d_subtemplates,
+            detectors_by_subtemplate,
+            self.templates[-1].instantiation_origin(k),
+            _get_common_increments(self.templates),
+        )
+
+    def populate_database(self, k: int, database: DetectorDatabase) -> None:
+        """Makes sure that ``database`` contains all the situations found in
+        the templates scaled with the provided ``k``.
+
+        Situations that are not in ``database`` are computed and added to it
+        (as well as to ``self``), even if ``self`` already knows them.
+
+        Args:
+            k: scaling factor to consider in order to instantiate the templates.
+            database: database that should contain all the situations when this
+                method returns.
+        """
+        self._get_situations(k, database, False, always_use_database=True)
+
+    def _get_situations(
+        self,
+        k: int,
+        database: DetectorDatabase | None,
+        only_use_database: bool,
+        always_use_database: bool,
+    ) -> tuple[Unique3DSubTemplates, dict[tuple[int, ...], frozenset[Detector]]]:
+        """Returns the situations found in the templates scaled with the
+        provided ``k`` and their detectors.
+
+        If ``always_use_database``, situations are looked up in (and added to)
+        ``database`` even if ``self`` already knows them.
+        """
+        increments = _get_common_increments(self.templates)
+        unique_3d_subtemplates = self._situations_by_k.get(k)
+        if unique_3d_subtemplates is None:
+            unique_3d_subtemplates = _compute_unique_3d_subtemplates(
+                self.templates, k, self.manhattan_radius
+            )
+            self._situations_by_k[k] = unique_3d_subtemplates
+        detectors_by_subtemplate: dict[tuple[int, ...], frozenset[Detector]] = {}
+        for indices, s3d in unique_3d_subtemplates.subtemplates.items():
+            key = s3d.tobytes()
+            detectors = (
+                None if always_use_database else self.detectors_by_situation.get(key)
+            )
+            if detectors is None:
+                detectors = compute_detectors_at_end_of_situation(
+                    [s3d[:, :, i] for i in range(s3d.shape[2])],
+                    self.plaquettes,
+                    increments,
+                    database,
+                    only_use_database,
+                )
+                self.detectors_by_situation[key] = detectors
+            elif database is not None:
+                self._add_to_database(s3d, detectors, database)
+            detectors_by_subtemplate[indices] = detectors
+        return unique_3d_subtemplates, detectors_by_subtemplate
+
+    def _add_to_database(
+        self,
+        s3d: npt.NDArray[numpy.int_],
+        detectors: frozenset[Detector],
+        database: DetectorDatabase,
+    ) -> None:
+        """Add the situation ``s3d`` to ``database`` if it is missing.
+
+        ``detectors`` use a coordinate system centered on the central
+        plaquette origin whereas ``database`` stores detectors using the
+        top-left corner of the sub-template as origin.
+        """
+        subtemplates = [s3d[:, :, i] for i in range(s3d.shape[2])]
+        if database.get_detectors(subtemplates, self.plaquettes) is not None:
+            return
+        increments = _get_common_increments(self.templates)
+        radius = s3d.shape[0] // 2
+        shift_x, shift_y = radius * increments.x, radius * increments.y
+        database.add_situation(
+            subtemplates,
+            self.plaquettes,
+            frozenset(d.offset_spatially_by(shift_x, shift_y) for d in detectors),
+        )
@@ -0,0 +1,137 @@
+import pytest
+
+from tqec.compile.detectors.compute import compute_detectors_for_fixed_radius
+from tqec.compile.detectors.database import DetectorDatabase
+from tqec.compile.detectors import stencil as stencil_module
+from tqec.compile.detectors.stencil import DetectorStencil
+from tqec.exceptions import TQECException
+from tqec.plaquette.enums import ResetBasis
+from tqec.plaquette.frozendefaultdict import FrozenDefaultDict
+from tqec.plaquette.library.css import make_css_surface_code_plaquette
+from tqec.plaquette.library.empty import empty_square_plaquette
+from tqec.plaquette.plaquette import Plaquettes
+from tqec.templates.qubit import QubitTemplate
+
+
+@pytest.fixture(name="init_plaquettes")
+def init_plaquettes_fixture() -> Plaquettes:
+    return Plaquettes(
+        FrozenDefaultDict(
+            {
+                9: make_css_surface_code_plaquette(
+                    "Z", data_initialization=ResetBasis.Z
+                ),
+                10: make_css_surface_code_plaquette(
+                    "X", data_initialization=ResetBasis.Z
+                ),
+            },
+            default_factory=lambda: empty_square_plaquette(),
+        )
+    )
+
+
+@pytest.fixture(name="memory_plaquettes")
+def memory_plaquettes_fixture() -> Plaquettes:
+    return Plaquettes(
+        FrozenDefaultDict(
+            {
+                9: make_css_surface_code_plaquette("Z"),
+                10: make_css_surface_code_plaquette("X"),
+            },
+            default_factory=lambda: empty_square_plaquette(),
+        )
+    )
+
+
+def test_detector_stencil_mismatched_lengths(init_plaquettes: Plaquettes) -> None:
+    with pytest.raises(TQECException):
+        DetectorStencil((QubitTemplate(), QubitTemplate()), (init_plaquettes,))
+
+
+def test_detector_stencil_matches_direct_computation(
+    init_plaquettes: Plaquettes, memory_plaquettes: Plaquettes
+) -> None:
+    template = QubitTemplate()
+    stencil = DetectorStencil(
+        (template, template), (init_plaquettes, memory_plaquettes)
+    )
+    for k in (1, 2, 4):
+        assert frozenset(stencil.get_detectors(k)) == frozenset(
+            compute_detectors_for_fixed_radius(
+                (template, template), k, (init_plaquettes, memory_plaquettes)
+            )
+        )
+
+
+def test_detector_stencil_does_not_grow_for_large_k(
+    init_plaquettes: Plaquettes, memory_plaquettes: Plaquettes
+) -> None:
+    template = QubitTemplate()
+    stencil = DetectorStencil(
+        (template, template), (init_plaquettes, memory_plaquettes)
+    )
+    stencil.get_detectors(4)
+    num_situations = stencil.num_situations
+    database = DetectorDatabase()
+    # No new situation should be encountered, so nothing should be computed,
+    # but the database should still be filled with the known situations.
+    detectors = stencil.get_detectors(6, database)
+    assert stencil.num_situations == num_situations
+    expected_database = DetectorDatabase()
+    compute_detectors_for_fixed_radius(
+        (template, template),
+        6,
+        (init_plaquettes, memory_plaquettes),
+        database=expected_database,
+    )
+    assert database.mapping == expected_database.mapping
+    # Only the (2k)**2 bulk plaquettes are non-empty.
+    assert len(detectors) == (2 * 6) ** 2
+
+
+def test_detector_stencil_only_use_database(
+    init_plaquettes: Plaquettes, memory_plaquettes: Plaquettes
+) -> None:
+    template = QubitTemplate()
+    stencil = DetectorStencil(
+        (template, template), (init_plaquettes, memory_plaquettes)
+    )
+    stencil.get_detectors(2)
+    # Situations known by the stencil but not by the database should be refused.
+    with pytest.raises(TQECException):
+        stencil.get_detectors(2, DetectorDatabase(), only_use_database=True)
+
+
+def test_detector_stencil_populate_database(
+    init_plaquettes: Plaquettes, memory_plaquettes: Plaquettes
+) -> None:
+    template = QubitTemplate()
+    stencil = DetectorStencil(
+        (template, template), (init_plaquettes, memory_plaquettes)
+    )
+    expected_detectors = stencil.get_detectors(2)
+    database = DetectorDatabase()
+    # Situations already known by the stencil should still be added.
+    stencil.populate_database(2, database)
+    assert len(database) == stencil.num_situations
+    assert frozenset(
+        stencil.get_detectors(2, database, only_use_database=True)
+    ) == frozenset(expected_detectors)
+
+
+def test_detector_stencil_reuses_situations_of_known_k(
+    init_plaquettes: Plaquettes,
+    memory_plaquettes: Plaquettes,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    template = QubitTemplate()
+    stencil = DetectorStencil(
+        (template, template), (init_plaquettes, memory_plaquettes)
+    )
+    detectors = stencil.get_detectors(3)
+
+    def _fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("The situations of k=3 should not be extracted again.")
+
+    monkeypatch.setattr(stencil_module, "_compute_unique_3d_subtemplates", _fail)
+    assert stencil.get_detectors(3) == detectors
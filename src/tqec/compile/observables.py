@@ -140,18 +140,47 @@ def inplace_add_observables(
     The circuits are grouped by time slices and layers. The outer list
     represents the time slices and the inner list represents the layers.
     """
+    for z, (time_slice_circuits, template) in enumerate(zip(circuits, template_slices)):
+        inplace_add_observables_to_time_slice(
+            time_slice_circuits, template, z, abstract_observables, k
+        )
+
+
+def inplace_add_observables_to_time_slice(
+    circuits: list[ScheduledCircuit],
+    template: LayoutTemplate,
+    z: int,
+    abstract_observables: list[AbstractObservable],
+    k: int,
+) -> None:
+    """Inplace add the observable components located at the time slice ``z``
+    to the circuits of that time slice.
+
+    Only the components of ``abstract_observables`` at the time slice ``z``
+    are added, which allows to process time slices one at a time. Calling this
+    function on each time slice is equivalent to calling
+    :func:`inplace_add_observables` on all of them.
+
+    Args:
+        circuits: the circuits of each layer of the time slice ``z``.
+        template: the template used by the time slice ``z``.
+        z: index of the time slice.
+        abstract_observables: all the observables to add. The index of an
+            observable in this list is used as its index in the circuits.
+        k: scale factor used to generate ``circuits``.
+    """
     for i, observable in enumerate(abstract_observables):
         # Add the stabilizer region measurements to the end of the first layer of circuits at z.
         for pipe in observable.bottom_regions:
-            z = pipe.u.position.z
-            template = template_slices[z]
+            if pipe.u.position.z != z:
+                continue
             stabilizer_qubits = get_stabilizer_region_qubits_for_pipe(
                 pipe, template.element_shape(k), template.get_increments()
             )
             measurement_records = MeasurementRecordsMap.from_scheduled_circuit(
-                circuits[z][0]
+                circuits[0]
             )
-            circuits[z][0].append_observable(
+            circuits[0].append_observable(
                 i,
                 [
                     stim.target_rec(measurement_records[q][-1])
@@ -162,14 +191,14 @@ def inplace_add_observables(
         # Add the line measurements to the end of the last layer of circuits at z.
         for cube_or_pipe in observable.top_lines:
             if isinstance(cube_or_pipe, Cube):
-                z = cube_or_pipe.position.z
-                template = template_slices[z]
+                if cube_or_pipe.position.z != z:
+                    continue
                 qubits = get_midline_qubits_for_cube(
                     cube_or_pipe, template.element_shape(k), template.get_increments()
                 )
             else:
-                z = cube_or_pipe.u.position.z
-                template = template_slices[z]
+                if cube_or_pipe.u.position.z != z:
+                    continue
                 qubits = [
                     get_center_qubit_at_horizontal_pipe(
                         cube_or_pipe,
@@ -178,9 +207,9 @@ def inplace_add_observables(
                     )
                 ]
             measurement_records = MeasurementRecordsMap.from_scheduled_circuit(
-                circuits[z][-1]
+                circuits[-1]
             )
-            circuits[z][-1].append_observable(
+            circuits[-1].append_observable(
                 i,
                 [stim.target_rec(measurement_records[q][-1]) for q in qubits],
             )
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
-from typing import Generic, Protocol, TypeVar, cast
-
-import networkx as nx
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Protocol,
+    TypeVar,
+    cast,
+)
 
 from tqec.exceptions import TQECException
 from tqec.position import Position3D
 
+if TYPE_CHECKING:
+    import networkx as nx
+
 
 class ComputationNode(Protocol):
     @property
@@ -25,19 +35,40 @@ class ComputationNode(Protocol):
 
 _NODE = TypeVar("_NODE", bound=ComputationNode)
 _EDGE = TypeVar("_EDGE")
+_T = TypeVar("_T")
 
 
 class ComputationGraph(Generic[_NODE, _EDGE]):
     """Base class for graph data structures representing a logical
-    computation."""
+    computation.
+
+    Nodes are stored in insertion order and identified internally by their
+    index in that order. The adjacency of each node is a mapping from the
+    index of each neighbour to the edge connecting them, and the indices of
+    the leaf nodes are kept up to date when edges are added or removed, so
+    that the structural queries do not need to iterate over the whole graph.
+    The graph can be exported to ``networkx`` with :meth:`to_networkx`.
+
+    Each modification of the graph increments :attr:`version` and discards the
+    results memoized by subclasses for the previous content of the graph, so
+    that expensive queries such as validation or the search of correlation
+    surfaces are only computed once for a given content.
+    """
 
     _NODE_DATA_KEY: str = "tqec_node_data"
     _EDGE_DATA_KEY: str = "tqec_edge_data"
 
     def __init__(self, name: str = "") -> None:
         self._name = name
-        self._graph: nx.Graph[Position3D] = nx.Graph()
+        self._node_ids: dict[Position3D, int] = {}
+        self._nodes: list[_NODE] = []
+        self._adjacency: list[dict[int, _EDGE]] = []
+        self._leaf_ids: set[int] = set()
+        self._num_edges: int = 0
+        self._edges_cache: list[_EDGE] | None = None
         self._ports: dict[str, Position3D] = {}
+        self._version: int = 0
+        self._memo: dict[Hashable, Any] = {}
 
     @property
     def name(self) -> str:
@@ -48,15 +79,43 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
     def name(self, name: str) -> None:
         self._name = name
 
+    @property
+    def version(self) -> int:
+        """Number of modifications of the graph since its construction.
+
+        Only changes to the nodes and edges count as modifications, renaming
+        the graph does not. It can be compared with a previously recorded value to check whether
+        the graph has been modified in between.
+        """
+        return self._version
+
+    def _mark_modified(self) -> None:
+        """Record a modification of the graph and discard the results
+        memoized for its previous content."""
+        self._version += 1
+        self._edges_cache = None
+        self._memo.clear()
+
+    def _memoized(self, key: Hashable, compute: Callable[[], _T]) -> _T:
+        """Return the result of ``compute()``, only calling it if no result
+        has been memoized with ``key`` since the last modification of the
+        graph.
+
+        If ``compute`` raises, nothing is memoized.
+        """
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return cast(_T, self._memo[key])
+
     @property
     def num_nodes(self) -> int:
         """Number of nodes in the graph."""
-        return self._graph.number_of_nodes()
+        return len(self._nodes)
 
     @property
     def num_edges(self) -> int:
         """Number of edges in the graph."""
-        return self._graph.number_of_edges()
+        return self._num_edges
 
     @property
     def num_ports(self) -> int:
@@ -66,14 +125,20 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
     @property
     def nodes(self) -> list[_NODE]:
         """The list of nodes in the graph."""
-        return [data[self._NODE_DATA_KEY] for _, data in self._graph.nodes(data=True)]
+        return list(self._nodes)
 
     @property
     def edges(self) -> list[_EDGE]:
         """The list of edges in the graph."""
-        return [
-            data[self._EDGE_DATA_KEY] for _, _, data in self._graph.edges(data=True)
-        ]
+        if self._edges_cache is None:
+            # Each edge is listed once, from its endpoint inserted first.
+            self._edges_cache = [
+                edge
+                for node_id, neighbours in enumerate(self._adjacency)
+                for neighbour_id, edge in neighbours.items()
+                if neighbour_id > node_id
+            ]
+        return list(self._edges_cache)
 
     @property
     def ports(self) -> dict[str, Position3D]:
@@ -87,12 +152,12 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
     def get_degree(self, position: Position3D) -> int:
         """Get the degree of a node in the graph, i.e. the number of edges
         incident to it."""
-        return self._graph.degree(position)  # type: ignore
+        return len(self._adjacency[self._node_ids[position]])
 
     @property
     def leaf_nodes(self) -> list[_NODE]:
         """Get the leaf nodes of the graph, i.e. the nodes with degree 1."""
-        return [node for node in self.nodes if self.get_degree(node.position) == 1]
+        return [self._nodes[node_id] for node_id in sorted(self._leaf_ids)]
 
     def _check_node_conflict(self, node: _NODE) -> None:
         """Check whether a new node can be added to the graph without conflict.
@@ -136,9 +201,16 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
         """
         if check_conflict:
             self._check_node_conflict(node)
-        self._graph.add_node(node.position, **{self._NODE_DATA_KEY: node})
+        node_id = self._node_ids.get(node.position)
+        if node_id is None:
+            self._node_ids[node.position] = len(self._nodes)
+            self._nodes.append(node)
+            self._adjacency.append({})
+        else:
+            self._nodes[node_id] = node
         if node.is_port:
             self._ports[node.label] = node.position
+        self._mark_modified()
 
     def _add_edge_and_nodes_with_checks(self, u: _NODE, v: _NODE, edge: _EDGE) -> None:
         """Add an edge to the graph with nodes and edge all specified."""
@@ -147,7 +219,35 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
         self._check_node_conflict(v)
         self.add_node(u, check_conflict=False)
         self.add_node(v, check_conflict=False)
-        self._graph.add_edge(u.position, v.position, **{self._EDGE_DATA_KEY: edge})
+        self._add_edge(u.position, v.position, edge)
+
+    def _add_edge(self, pos1: Position3D, pos2: Position3D, edge: _EDGE) -> None:
+        """Add an edge between two existing nodes, replacing the edge already
+        connecting them if any."""
+        id1, id2 = self._node_ids[pos1], self._node_ids[pos2]
+        if id2 not in self._adjacency[id1]:
+            self._num_edges += 1
+        self._adjacency[id1][id2] = edge
+        self._adjacency[id2][id1] = edge
+        self._update_leaf(id1)
+        self._update_leaf(id2)
+        self._mark_modified()
+
+    def _remove_edge(self, pos1: Position3D, pos2: Position3D) -> None:
+        """Remove the edge between two positions."""
+        id1, id2 = self._node_ids[pos1], self._node_ids[pos2]
+        del self._adjacency[id1][id2]
+        del self._adjacency[id2][id1]
+        self._num_edges -= 1
+        self._update_leaf(id1)
+        self._update_leaf(id2)
+        self._mark_modified()
+
+    def _update_leaf(self, node_id: int) -> None:
+        if len(self._adjacency[node_id]) == 1:
+            self._leaf_ids.add(node_id)
+        else:
+            self._leaf_ids.discard(node_id)
 
     def has_edge_between(self, pos1: Position3D, pos2: Position3D) -> bool:
         """Check if there is an edge between two positions.
@@ -159,7 +259,8 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
         Returns:
             True if there is an edge between the two positions, False otherwise.
         """
-        return self._graph.has_edge(pos1, pos2)
+        id1, id2 = self._node_ids.get(pos1), self._node_ids.get(pos2)
+        return id1 is not None and id2 is not None and id2 in self._adjacency[id1]
 
     def get_edge(self, pos1: Position3D, pos2: Position3D) -> _EDGE:
         """Get the edge by its endpoint positions. If there is no edge between
@@ -177,27 +278,72 @@ class ComputationGraph(Generic[_NODE, _EDGE]):
         """
         if not self.has_edge_between(pos1, pos2):
             raise TQECException("No edge between the given positions in the graph.")
-        return cast(_EDGE, self._graph.edges[pos1, pos2][self._EDGE_DATA_KEY])
+        return self._adjacency[self._node_ids[pos1]][self._node_ids[pos2]]
 
     def edges_at(self, position: Position3D) -> list[_EDGE]:
         """Get the edges incident to a position."""
-        if position not in self:
+        node_id = self._node_ids.get(position)
+        if node_id is None:
             return []
-        return [
-            cast(_EDGE, data[self._EDGE_DATA_KEY])
-            for _, _, data in self._graph.edges(position, data=True)
-        ]
+        return list(self._adjacency[node_id].values())
+
+    def num_connected_components(self) -> int:
+        """Get the number of connected components of the graph."""
+        visited: set[int] = set()
+        num_components = 0
+        for start in range(len(self._nodes)):
+            if start in visited:
+                continue
+            num_components += 1
+            visited.add(start)
+            stack = [start]
+            while stack:
+                for neighbour_id in self._adjacency[stack.pop()]:
+                    if neighbour_id not in visited:
+                        visited.add(neighbour_id)
+                        stack.append(neighbour_id)
+        return num_components
+
+    def to_networkx(self) -> nx.Graph[Position3D]:
+        """Export the graph to ``networkx``.
+
+        Returns:
+            A ``networkx.Graph`` whose nodes are the positions of the nodes of
+            this graph. The node and edge instances are stored in the node and
+            edge attributes ``"tqec_node_data"`` and ``"tqec_edge_data"``.
+        """
+        import networkx as nx
+
+        graph: nx.Graph[Position3D] = nx.Graph()
+        for node in self._nodes:
+            graph.add_node(node.position, **{self._NODE_DATA_KEY: node})
+        for node, neighbours in zip(self._nodes, self._adjacency):
+            for neighbour_id, edge in neighbours.items():
+                graph.add_edge(
+                    node.position,
+                    self._nodes[neighbour_id].position,
+                    **{self._EDGE_DATA_KEY: edge},
+                )
+        return graph
 
     def __contains__(self, position: Position3D) -> bool:
-        return position in self._graph
+        return position in self._node_ids
 
     def __getitem__(self, position: Position3D) -> _NODE:
-        return cast(_NODE, self._graph.nodes[position][self._NODE_DATA_KEY])
+        return self._nodes[self._node_ids[position]]
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
-        return (
-            nx.utils.graphs_equal(self._graph, other._graph)  # type: ignore
-            and self._ports == other._ports
+        if self._ports != other._ports or self._num_edges != other._num_edges:
+            return False
+        if {n.position: n for n in self._nodes} != {
+            n.position: n for n in other._nodes
+        }:
+            return False
+        return all(
+            other.has_edge_between(self._nodes[i].position, self._nodes[j].position)
+            and other.get_edge(self._nodes[i].position, self._nodes[j].position) == edge
+            for i, neighbours in enumerate(self._adjacency)
+            for j, edge in neighbours.items()
         )
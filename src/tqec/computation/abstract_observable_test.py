@@ -5,6 +5,7 @@ from tqec.computation.block_graph import BlockGraph
 from tqec.computation.cube import Cube, Port, YCube, ZXCube
 from tqec.computation.pipe import PipeKind
 from tqec.exceptions import TQECException
+from tqec.gallery.logical_cnot import logical_cnot_block_graph
 from tqec.gallery.solo_node import solo_node_block_graph
 from tqec.position import Position3D
 
@@ -89,3 +90,11 @@ def test_abstract_observable_for_y_cubes() -> None:
         top_lines=frozenset({Cube(Position3D(0, 0, 1), YCube())}),
         bottom_regions=frozenset(),
     )
+
+
+def test_abstract_observables_basis_only() -> None:
+    g = logical_cnot_block_graph("X")
+    observables, correlation_surfaces = g.get_abstract_observables(basis_only=True)
+    assert len(observables) == len(correlation_surfaces) == 2
+    all_observables, _ = g.get_abstract_observables()
+    assert set(observables) <= set(all_observables)
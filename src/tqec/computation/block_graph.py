@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import pathlib
 from typing import TYPE_CHECKING
 from copy import deepcopy
@@ -9,11 +10,14 @@ from io import BytesIO
 
 from tqec.computation._base_graph import ComputationGraph
 from tqec.exceptions import TQECException
-from tqec.position import Direction3D, SignedDirection3D
+from tqec.position import Direction3D, Position3D, SignedDirection3D
 from tqec.computation.cube import Cube, CubeKind
 from tqec.computation.pipe import Pipe, PipeKind
 from tqec.computation.zx_graph import ZXGraph
-from tqec.computation.correlation import CorrelationSurface
+from tqec.computation.correlation import (
+    CorrelationSurface,
+    find_correlation_surface_basis,
+)
 
 if TYPE_CHECKING:
     from tqec.interop.collada.html_viewer import _ColladaHTMLViewer
@@ -82,9 +86,14 @@ class BlockGraph(ComputationGraph[Cube, Pipe]):
         - **Match color at turn:** two pipes in a "turn" should have the matching colors on
           faces that are touching.
 
+        The result is memoized until the graph is modified.
+
         Raises:
             TQECException: If the above conditions are not satisfied.
         """
+        self._memoized("validate", self._validate_all_cubes)
+
+    def _validate_all_cubes(self) -> None:
         for cube in self.nodes:
             self._validate_locally_at_cube(cube)
 
@@ -223,6 +232,8 @@ class BlockGraph(ComputationGraph[Cube, Pipe]):
     def get_abstract_observables(
         self,
         correlation_surfaces: list[CorrelationSurface] | None = None,
+        *,
+        basis_only: bool = False,
     ) -> tuple[list[AbstractObservable], list[CorrelationSurface]]:
         """Get the
         :py:class:`~tqec.computation.abstract_observable.AbstractObservable` in
@@ -233,6 +244,14 @@ class BlockGraph(ComputationGraph[Cube, Pipe]):
                 provided, all the possible correlation surfaces will be constructed from the corresponding ZX graph
                 of the block graph. Abstract observables will be created for each correlation surface.
                 Default is None.
+            basis_only: If ``True`` and ``correlation_surfaces`` is not provided, only a basis of the
+                correlation surfaces is constructed with
+                :py:func:`~tqec.computation.correlation.find_correlation_surface_basis`. This scales to
+                large graphs, whereas enumerating all the correlation surfaces takes exponential time in the
+                worst case. Default is False.
+
+        The correlation surfaces constructed when ``correlation_surfaces`` is not
+        provided are memoized until the graph is modified.
 
         Returns:
             A tuple containing the list of abstract observables and the list of correlation surfaces corresponding
@@ -245,7 +264,12 @@ class BlockGraph(ComputationGraph[Cube, Pipe]):
         self.validate()
 
         if correlation_surfaces is None:
-            correlation_surfaces = self.to_zx_graph().find_correration_surfaces()
+            correlation_surfaces = list(
+                self._memoized(
+                    ("correlation_surfaces", basis_only),
+                    lambda: self._find_correlation_surfaces(basis_only),
+                )
+            )
         abstract_observables: list[AbstractObservable] = [
             correlation_surface_to_abstract_observable(self, surface)
             for surface in correlation_surfaces
@@ -253,6 +277,60 @@ class BlockGraph(ComputationGraph[Cube, Pipe]):
 
         return abstract_observables, correlation_surfaces
 
+    def _find_correlation_surfaces(self, basis_only: bool) -> list[CorrelationSurface]:
+        zx_graph = self.to_zx_graph()
+        if basis_only:
+            return find_correlation_surface_basis(zx_graph)
+        return zx_graph.find_correration_surfaces()
+
+    def reliable_hash(self, translation_invariant: bool = False) -> int:
+        """Returns a hash of the content of ``self`` that is guaranteed to be
+        constant across Python versions, OSes and executions.
+
+        The hash is computed from the sorted cubes, pipes, their kinds and the
+        port labels. It does not depend on the name of the graph nor on the
+        order in which the cubes and pipes have been added, so that it can be
+        used to identify a computation across runs, e.g. to cache the results
+        of its compilation.
+
+        Args:
+            translation_invariant: if ``True``, the positions are taken relative
+                to the minimum corner of the bounding box of the graph, so that
+                the hash does not change when the whole graph is translated.
+                Default to ``False``.
+
+        Returns:
+            an integer hash of the content of ``self``.
+        """
+        origin = Position3D(0, 0, 0)
+        if translation_invariant and self.num_nodes > 0:
+            positions = [cube.position for cube in self.nodes]
+            origin = Position3D(
+                min(p.x for p in positions),
+                min(p.y for p in positions),
+                min(p.z for p in positions),
+            )
+
+        def encode(position: Position3D) -> str:
+            return ",".join(
+                str(coord - offset)
+                for coord, offset in zip(position.as_tuple(), origin.as_tuple())
+            )
+
+        cubes = sorted(self.nodes, key=lambda cube: cube.position)
+        pipes = sorted(self.edges, key=lambda pipe: (pipe.u.position, pipe.v.position))
+        hasher = hashlib.md5()
+        for cube in cubes:
+            hasher.update(
+                f"C {encode(cube.position)} {cube.kind} {cube.label}\n".encode()
+            )
+        for pipe in pipes:
+            hasher.update(
+                f"P {encode(pipe.u.position)} {encode(pipe.v.position)} "
+                f"{pipe.kind}\n".encode()
+            )
+        return int(hasher.hexdigest(), 16)
+
     def shift_min_z_to_zero(self) -> BlockGraph:
         """Shift the whole graph in the z direction to make the minimum z equal
         zero.
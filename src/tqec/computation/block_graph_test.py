@@ -3,6 +3,7 @@ import pytest
 from tqec.computation.block_graph import BlockGraph
 from tqec.computation.cube import Cube, Port, YCube, ZXCube
 from tqec.computation.pipe import PipeKind
+from tqec.computation.zx_graph import ZXGraph, ZXKind
 from tqec.exceptions import TQECException
 from tqec.position import Position3D
 
@@ -159,3 +160,102 @@ def test_shift_min_z_to_zero() -> None:
         Position3D(1, 0, 0),
         Position3D(0, 0, 1),
     }
+
+
+def test_reliable_hash() -> None:
+    def build(name: str, dz: int, reverse: bool) -> BlockGraph:
+        g = BlockGraph(name)
+        edges = [
+            (Position3D(0, 0, dz), Position3D(1, 0, dz), "OXZ"),
+            (Position3D(0, 0, dz), Position3D(0, 0, dz + 1), "ZXO"),
+        ]
+        for u, v, kind in reversed(edges) if reverse else edges:
+            g.add_edge(
+                Cube(u, ZXCube.from_str("ZXZ")),
+                Cube(v, ZXCube.from_str("ZXZ")),
+                PipeKind.from_str(kind),
+            )
+        return g
+
+    g = build("first", 0, False)
+    assert g.reliable_hash() == build("second", 0, True).reliable_hash()
+
+    shifted = build("first", 3, False)
+    assert g.reliable_hash() != shifted.reliable_hash()
+    assert g.reliable_hash(translation_invariant=True) == shifted.reliable_hash(
+        translation_invariant=True
+    )
+
+    g.add_edge(
+        Cube(Position3D(1, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(1, 0, 1), Port(), label="out"),
+    )
+    hash_with_port = g.reliable_hash()
+    assert hash_with_port != build("first", 0, False).reliable_hash()
+    g = build("first", 0, False)
+    g.add_edge(
+        Cube(Position3D(1, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(1, 0, 1), Port(), label="other"),
+    )
+    assert g.reliable_hash() != hash_with_port
+
+
+def test_block_graph_to_zx_graph_returns_independent_graphs() -> None:
+    g = BlockGraph()
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), Port(), label="out"),
+    )
+    a = g.to_zx_graph()
+    b = g.to_zx_graph()
+    a.fill_ports(ZXKind.X)
+    assert a.num_ports == 0
+    assert b.num_ports == 1
+
+
+def test_block_graph_memoizes_correlation_surfaces(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from tqec.computation import correlation
+
+    num_searches = 0
+    find_correlation_surfaces = correlation.find_correlation_surfaces
+
+    def counting_search(zx_graph: ZXGraph) -> list[correlation.CorrelationSurface]:
+        nonlocal num_searches
+        num_searches += 1
+        return find_correlation_surfaces(zx_graph)
+
+    monkeypatch.setattr(correlation, "find_correlation_surfaces", counting_search)
+    g = BlockGraph("memo")
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+    )
+    observables, surfaces = g.get_abstract_observables()
+    # Renaming the graph does not change its correlation surfaces.
+    g.name = "renamed"
+    assert g.get_abstract_observables() == (observables, surfaces)
+    assert num_searches == 1
+
+    g.add_edge(
+        Cube(Position3D(0, 0, 1), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 2), ZXCube.from_str("ZXZ")),
+    )
+    g.get_abstract_observables()
+    assert num_searches == 2
+
+
+def test_block_graph_validate_after_modification() -> None:
+    g = BlockGraph()
+    g.add_edge(
+        Cube(Position3D(0, 0, 0), ZXCube.from_str("ZXZ")),
+        Cube(Position3D(0, 0, 1), Port(), label="out"),
+    )
+    g.validate()
+    g.add_edge(
+        Cube(Position3D(0, 0, 1), Port(), label="out"),
+        Cube(Position3D(0, 0, 2), ZXCube.from_str("ZXZ")),
+    )
+    with pytest.raises(TQECException, match="Port at"):
+        g.validate()
@@ -4,8 +4,10 @@ the functions to find the correlation surfaces in the ZX graph."""
 from __future__ import annotations
 
 import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Iterable
+from typing import Iterable, Iterator, Sequence
 
 from tqec.computation.zx_graph import ZXEdge, ZXGraph, ZXKind, ZXNode
 from tqec.exceptions import TQECException
@@ -126,6 +128,7 @@ class CorrelationSurface:
 
 def find_correlation_surfaces(
     zx_graph: ZXGraph,
+    num_workers: int = 1,
 ) -> list[CorrelationSurface]:
     """Find all the
     :py:class:`~tqec.computation.correlation.CorrelationSurface` in a ZX graph.
@@ -156,8 +159,14 @@ def find_correlation_surfaces(
     recursively explores the next frontier until the search is completed. Finally, the branches
     at different nodes are produced to form the correlation surface.
 
+    The spans found from a given search state (frontier and current span) only depend on that
+    state, so they are memoized and shared by all the branches, and all the leaves searched in
+    the same process, reaching the same state.
+
     Args:
         zx_graph: The ZX graph to find the correlation surfaces.
+        num_workers: Number of processes used to search from the different leaves. Default
+            to 1, meaning that all the leaves are searched in the current process.
 
     Returns:
         A list of `CorrelationSurface` in the graph.
@@ -172,48 +181,52 @@ def find_correlation_surfaces(
             CorrelationSurface(nodes=frozenset({zx_graph.nodes[0].with_zx_flipped()}))
         ]
     # Find correlation surfaces starting from each leaf node
-    leaves = set(zx_graph.leaf_nodes)
+    leaves = sorted(set(zx_graph.leaf_nodes))
     if not leaves:
         raise TQECException(
             "The graph must contain at least one leaf node to find correlation surfaces."
         )
-    correlation_surfaces: set[CorrelationSurface] = set()
-    for leaf in leaves:
-        correlation_surfaces.update(
-            _find_correlation_surfaces_from_leaf(zx_graph, leaf)
-        )
+    # The same span is usually found from several leaves, so spans are
+    # deduplicated before building the correlation surfaces.
+    spans: dict[frozenset[ZXEdge], None] = {}
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            for leaf_spans in executor.map(
+                _find_spans_from_leaf, itertools.repeat(zx_graph), leaves
+            ):
+                spans.update(dict.fromkeys(leaf_spans))
+    else:
+        search = _CorrelationSpanSearch(zx_graph)
+        for leaf in leaves:
+            spans.update(dict.fromkeys(_find_spans_from_leaf(zx_graph, leaf, search)))
+    correlation_surfaces = _construct_compatible_correlation_surfaces(zx_graph, spans)
     # sort the correlation surfaces to make the result deterministic
     return sorted(correlation_surfaces, key=lambda x: sorted(x.span))
 
 
-def _find_correlation_surfaces_from_leaf(
+def _find_spans_from_leaf(
     zx_graph: ZXGraph,
     leaf: ZXNode,
-) -> list[CorrelationSurface]:
-    """Find the correlation surfaces starting from a leaf node in the ZX
-    graph."""
+    search: _CorrelationSpanSearch | None = None,
+) -> list[frozenset[ZXEdge]]:
+    """Find the correlation spans starting from a leaf node in the ZX graph.
+
+    ``search`` can be provided to share the memoized search states with the
+    searches from other leaves of the same graph.
+    """
+    if search is None:
+        search = _CorrelationSpanSearch(zx_graph)
     # Z/X type node can only support the correlation surface with the opposite type.
     if leaf.is_zx_node:
-        spans = (
-            _find_spans_with_flood_fill(zx_graph, {leaf.with_zx_flipped()}, set()) or []
-        )
-        return _construct_compatible_correlation_surfaces(zx_graph, spans)
-    x_spans = (
-        _find_spans_with_flood_fill(zx_graph, {ZXNode(leaf.position, ZXKind.X)}, set())
-        or []
-    )
-    z_spans = (
-        _find_spans_with_flood_fill(zx_graph, {ZXNode(leaf.position, ZXKind.Z)}, set())
-        or []
-    )
+        return search.find_spans(frozenset({leaf.with_zx_flipped()})) or []
+    x_spans = search.find_spans(frozenset({ZXNode(leaf.position, ZXKind.X)})) or []
+    z_spans = search.find_spans(frozenset({ZXNode(leaf.position, ZXKind.Z)})) or []
     # For the port node, try to construct both the x and z type correlation surfaces.
     if leaf.is_port:
-        return _construct_compatible_correlation_surfaces(zx_graph, x_spans + z_spans)
+        return x_spans + z_spans
     # For the Y type node, the correlation surface must be the product of the x and z type.
     assert leaf.is_y_node
-    return _construct_compatible_correlation_surfaces(
-        zx_graph, [sx | sz for sx, sz in itertools.product(x_spans, z_spans)]
-    )
+    return [sx | sz for sx, sz in itertools.product(x_spans, z_spans)]
 
 
 def _construct_compatible_correlation_surfaces(
@@ -231,12 +244,13 @@ def _construct_compatible_correlation_surfaces(
     - The port node can support any type of logical observable.
     """
     correlation_surfaces: list[CorrelationSurface] = []
+    leaves = zx_graph.leaf_nodes
 
     def _is_compatible(
         supported_observables: dict[Position3D, ZXKind],
     ) -> bool:
         # Check the leaf nodes compatibility.
-        for leaf in zx_graph.leaf_nodes:
+        for leaf in leaves:
             # Port is compatible with any correlation type.
             if leaf.is_port:
                 continue
@@ -261,80 +275,139 @@ def _construct_compatible_correlation_surfaces(
     return correlation_surfaces
 
 
-def _find_spans_with_flood_fill(
-    zx_graph: ZXGraph,
-    frontier: set[ZXNode],
-    current_span: set[ZXEdge],
-) -> list[frozenset[ZXEdge]] | None:
-    """Find the correlation spans in the ZX graph using the flood fill like
-    algorithm."""
-    # The ZX node kind mismatches the logical observable basis, then we can flood
-    # through(broadcast) all the edges connected to the current node.
-    # Greedily flood through the edges until encountering the passthrough node.
-    broadcast_nodes = {n for n in frontier if not _match_at(zx_graph, n)}
-    while broadcast_nodes:
-        correlation_node = broadcast_nodes.pop()
-        frontier.remove(correlation_node)
-        for correlation_edge in _get_correlation_edges_at(zx_graph, correlation_node):
-            if correlation_edge in current_span:
-                continue
-            u, v = correlation_edge
-            next_correlation_node = u if v == correlation_node else v
-            frontier.add(next_correlation_node)
-            current_span.add(correlation_edge)
-            if not _match_at(zx_graph, next_correlation_node):
-                broadcast_nodes.add(next_correlation_node)
-
-    if not frontier:
-        return [frozenset(current_span)]
-
-    # The node kind matches the observable basis, enforce the parity to be even.
-    # There are different choices of the edges to be included in the span.
-
-    # Each list entry represents the possible branches at a node.
-    # Each tuple in the list entry represents a branch, where the first element is the
-    # nodes to be included in the branch's frontier, and the second element is the edges
-    # to be included in the branch's span.
-    branches_at_different_nodes: list[list[tuple[set[ZXNode], set[ZXEdge]]]] = []
-    for correlation_node in set(frontier):
-        assert _match_at(zx_graph, correlation_node)
-        frontier.remove(correlation_node)
-
-        correlation_edges = _get_correlation_edges_at(zx_graph, correlation_node)
-        edges_in_span = correlation_edges & current_span
-        edges_left = correlation_edges - current_span
-        parity = len(edges_in_span) % 2
-        # Cannot fulfill the parity requirement, prune the search
-        if parity == 1 and not edges_left:
-            return None
-        # starts from a node that only has a single edge
-        if parity == 0 and not edges_in_span and len(edges_left) <= 1:
-            return None
-        branches_at_node: list[tuple[set[ZXNode], set[ZXEdge]]] = []
-        for n in range(parity, len(edges_left) + 1, 2):
-            for branch_edges in itertools.combinations(edges_left, n):
-                branches_at_node.append(
-                    (
-                        {e.u if e.u != correlation_node else e.v for e in branch_edges},
-                        set(branch_edges),
-                    )
+_SearchState = tuple[frozenset[ZXNode], frozenset[ZXEdge]]
+"""A state of the flood fill search, as a pair ``(frontier, current_span)``."""
+
+
+class _CorrelationSpanSearch:
+    def __init__(self, zx_graph: ZXGraph) -> None:
+        """Flood fill like search of the correlation spans in a ZX graph.
+
+        The correlation edges at each node are pre-computed and the spans found
+        from each explored search state are memoized, so that a state reached
+        through different branches, or from different leaves, is only
+        explored once.
+
+        Args:
+            zx_graph: The ZX graph to find the correlation spans in.
+        """
+        self._node_kinds: dict[Position3D, ZXKind] = {
+            node.position: node.kind for node in zx_graph.nodes
+        }
+        self._correlation_edges: dict[ZXNode, frozenset[ZXEdge]] = {}
+        for node in zx_graph.nodes:
+            for kind in (ZXKind.X, ZXKind.Z):
+                correlation_node = ZXNode(node.position, kind)
+                self._correlation_edges[correlation_node] = frozenset(
+                    _get_correlation_edges_at(zx_graph, correlation_node)
                 )
-        branches_at_different_nodes.append(branches_at_node)
+        self._explored: dict[_SearchState, list[frozenset[ZXEdge]] | None] = {}
 
-    assert branches_at_different_nodes, "Should not be empty."
+    def _match_at(self, correlation_node: ZXNode) -> bool:
+        return self._node_kinds[correlation_node.position] == correlation_node.kind
 
-    final_spans: list[frozenset[ZXEdge]] = []
-    # Product of the branches at different nodes together
-    for product in itertools.product(*branches_at_different_nodes):
-        product_frontier = set(frontier)
-        product_span = set(current_span)
-        for nodes, edges in product:
-            product_frontier.update(nodes)
-            product_span.update(edges)
-        spans = _find_spans_with_flood_fill(zx_graph, product_frontier, product_span)
-        if spans is not None:
-            final_spans.extend(spans)
-    return final_spans or None
+    def find_spans(
+        self,
+        frontier: frozenset[ZXNode],
+        current_span: frozenset[ZXEdge] = frozenset(),
+    ) -> list[frozenset[ZXEdge]] | None:
+        """Find the correlation spans reachable from the provided search state.
+
+        Returns:
+            the distinct spans that can be reached, or ``None`` if the parity
+            constraints cannot be fulfilled from the provided state.
+        """
+        state = (frontier, current_span)
+        if state not in self._explored:
+            self._explored[state] = self._find_spans_with_flood_fill(
+                set(frontier), set(current_span)
+            )
+        return self._explored[state]
+
+    def _find_spans_with_flood_fill(
+        self,
+        frontier: set[ZXNode],
+        current_span: set[ZXEdge],
+    ) -> list[frozenset[ZXEdge]] | None:
+        """Find the correlation spans in the ZX graph using the flood fill like
+        algorithm."""
+        # The ZX node kind mismatches the logical observable basis, then we can flood
+        # through(broadcast) all the edges connected to the current node.
+        # Greedily flood through the edges until encountering the passthrough node.
+        broadcast_nodes = {n for n in frontier if not self._match_at(n)}
+        while broadcast_nodes:
+            correlation_node = broadcast_nodes.pop()
+            frontier.remove(correlation_node)
+            for correlation_edge in self._correlation_edges[correlation_node]:
+                if correlation_edge in current_span:
+                    continue
+                u, v = correlation_edge
+                next_correlation_node = u if v == correlation_node else v
+                frontier.add(next_correlation_node)
+                current_span.add(correlation_edge)
+                if not self._match_at(next_correlation_node):
+                    broadcast_nodes.add(next_correlation_node)
+
+        if not frontier:
+            return [frozenset(current_span)]
+
+        # Different states might flood to the same passthrough frontier.
+        state = (frozenset(frontier), frozenset(current_span))
+        if state in self._explored:
+            return self._explored[state]
+
+        # The node kind matches the observable basis, enforce the parity to be even.
+        # There are different choices of the edges to be included in the span.
+
+        # Each list entry represents the possible branches at a node.
+        # Each tuple in the list entry represents a branch, where the first element is the
+        # nodes to be included in the branch's frontier, and the second element is the edges
+        # to be included in the branch's span.
+        branches_at_different_nodes: list[
+            list[tuple[frozenset[ZXNode], frozenset[ZXEdge]]]
+        ] = []
+        for correlation_node in frontier:
+            correlation_edges = self._correlation_edges[correlation_node]
+            edges_in_span = correlation_edges & current_span
+            edges_left = correlation_edges - current_span
+            parity = len(edges_in_span) % 2
+            # Cannot fulfill the parity requirement, prune the search
+            if parity == 1 and not edges_left:
+                self._explored[state] = None
+                return None
+            # starts from a node that only has a single edge
+            if parity == 0 and not edges_in_span and len(edges_left) <= 1:
+                self._explored[state] = None
+                return None
+            branches_at_node: list[tuple[frozenset[ZXNode], frozenset[ZXEdge]]] = []
+            for n in range(parity, len(edges_left) + 1, 2):
+                for branch_edges in itertools.combinations(edges_left, n):
+                    branches_at_node.append(
+                        (
+                            frozenset(
+                                e.u if e.u != correlation_node else e.v
+                                for e in branch_edges
+                            ),
+                            frozenset(branch_edges),
+                        )
+                    )
+            branches_at_different_nodes.append(branches_at_node)
+
+        assert branches_at_different_nodes, "Should not be empty."
+
+        # Using a dict rather than a set to keep a deterministic order.
+        final_spans: dict[frozenset[ZXEdge], None] = {}
+        # Product of the branches at different nodes together
+        for product in itertools.product(*branches_at_different_nodes):
+            spans = self.find_spans(
+                frozenset().union(*(nodes for nodes, _ in product)),
+                state[1].union(*(edges for _, edges in product)),
+            )
+            if spans is not None:
+                final_spans.update(dict.fromkeys(spans))
+        result = list(final_spans) or None
+        self._explored[state] = result
+        return result
 
 
 def _get_correlation_edges_at(
@@ -357,6 +430,205 @@ def _get_correlation_edges_at(
     return correlation_edges
 
 
-def _match_at(zx_graph: ZXGraph, correlation_node: ZXNode) -> bool:
-    zx_node = zx_graph[correlation_node.position]
-    return zx_node.kind == correlation_node.kind
+def find_correlation_surface_basis(zx_graph: ZXGraph) -> list[CorrelationSurface]:
+    """Find a basis of the
+    :py:class:`~tqec.computation.correlation.CorrelationSurface` in a ZX graph.
+
+    Each edge of the ZX graph can support a logical X observable, a logical Z
+    observable, both or none, which defines two binary variables per edge. The
+    spiders pose parity constraints on these variables:
+
+    - *broadcast:* the observables with basis opposite to the node kind are
+      either supported on all or on none of the incident edges.
+    - *passthrough:* the observables with the same basis as the node kind are
+      supported on an even number of the incident edges.
+    - a Y node supports both the X and Z observables, or none of them.
+    - a port does not pose any constraint.
+
+    The correlation surfaces are exactly the non-empty solutions of this
+    sparse linear system over GF(2), so the function performs a Gaussian
+    elimination to compute a basis of its null space. This takes polynomial
+    time in the size of the graph, whereas
+    :py:func:`~tqec.computation.correlation.find_correlation_surfaces`
+    enumerates the surfaces and takes exponential time in the worst case.
+    Every surface found by
+    :py:func:`~tqec.computation.correlation.find_correlation_surfaces` is a
+    combination of the returned surfaces. The combinations can be enumerated
+    with :py:func:`~tqec.computation.correlation.iter_correlation_surfaces_from_basis`
+    or sampled with
+    :py:func:`~tqec.computation.correlation.sample_correlation_surfaces_from_basis`.
+
+    Args:
+        zx_graph: The ZX graph to find the correlation surfaces.
+
+    Returns:
+        A list of independent `CorrelationSurface` in the graph.
+    """
+    zx_graph.check_invariants()
+    # Edge case: single node graph
+    if zx_graph.num_nodes == 1:
+        return [
+            CorrelationSurface(nodes=frozenset({zx_graph.nodes[0].with_zx_flipped()}))
+        ]
+    edges = sorted(zx_graph.edges)
+    # Variable 2 * i (resp. 2 * i + 1) is set if the X (resp. Z) observable is
+    # supported on the end ``u`` of the i-th edge.
+    correlation_edges: list[ZXEdge] = []
+    for edge in edges:
+        for kind in (ZXKind.X, ZXKind.Z):
+            v_kind = kind.with_zx_flipped() if edge.has_hadamard else kind
+            correlation_edges.append(
+                ZXEdge(
+                    ZXNode(edge.u.position, kind),
+                    ZXNode(edge.v.position, v_kind),
+                    edge.has_hadamard,
+                )
+            )
+    edge_indices = {edge: i for i, edge in enumerate(edges)}
+
+    def variable(edge: ZXEdge, kind: ZXKind, position: Position3D) -> int:
+        if position != edge.u.position and edge.has_hadamard:
+            kind = kind.with_zx_flipped()
+        return 2 * edge_indices[edge] + (kind == ZXKind.Z)
+
+    constraints: list[int] = []
+    for node in zx_graph.nodes:
+        if node.is_port:
+            continue
+        incident_edges = zx_graph.edges_at(node.position)
+        if node.is_y_node:
+            (edge,) = incident_edges
+            constraints.append(0b11 << 2 * edge_indices[edge])
+            continue
+        passthrough = 0
+        for edge in incident_edges:
+            passthrough |= 1 << variable(edge, node.kind, node.position)
+        constraints.append(passthrough)
+        broadcast = [
+            variable(edge, node.kind.with_zx_flipped(), node.position)
+            for edge in incident_edges
+        ]
+        constraints.extend((1 << broadcast[0]) | (1 << b) for b in broadcast[1:])
+
+    correlation_surfaces = [
+        CorrelationSurface.from_span(
+            zx_graph, (correlation_edges[i] for i in _iter_set_bits(solution))
+        )
+        for solution in _gf2_null_space(constraints, len(correlation_edges))
+    ]
+    # sort the correlation surfaces to make the result deterministic
+    return sorted(correlation_surfaces, key=lambda x: sorted(x.span))
+
+
+def iter_correlation_surfaces_from_basis(
+    zx_graph: ZXGraph,
+    basis: Sequence[CorrelationSurface],
+) -> Iterator[CorrelationSurface]:
+    """Iterate over all the non-empty combinations of a basis of correlation
+    surfaces.
+
+    The combinations are generated in Gray code order, so that each generated
+    surface only differs from the previous one by a single basis element.
+
+    Args:
+        zx_graph: The ZX graph the correlation surfaces are defined on.
+        basis: Independent correlation surfaces, typically obtained with
+            :py:func:`~tqec.computation.correlation.find_correlation_surface_basis`.
+
+    Yields:
+        The ``2 ** len(basis) - 1`` correlation surfaces spanned by ``basis``.
+    """
+    if any(surface.has_single_node for surface in basis):
+        yield from basis
+        return
+    span: frozenset[ZXEdge] = frozenset()
+    for i in range(1, 2 ** len(basis)):
+        span ^= basis[(i & -i).bit_length() - 1].span
+        yield CorrelationSurface.from_span(zx_graph, span)
+
+
+def sample_correlation_surfaces_from_basis(
+    zx_graph: ZXGraph,
+    basis: Sequence[CorrelationSurface],
+    num_samples: int,
+    seed: int | None = None,
+) -> list[CorrelationSurface]:
+    """Sample uniformly random non-empty combinations of a basis of
+    correlation surfaces.
+
+    Args:
+        zx_graph: The ZX graph the correlation surfaces are defined on.
+        basis: Independent correlation surfaces, typically obtained with
+            :py:func:`~tqec.computation.correlation.find_correlation_surface_basis`.
+        num_samples: The number of correlation surfaces to sample.
+        seed: Seed of the random number generator. Default to ``None``, meaning
+            that the samples are not reproducible.
+
+    Returns:
+        A list of ``num_samples`` correlation surfaces spanned by ``basis``,
+        possibly containing duplicates.
+
+    Raises:
+        TQECException: If ``basis`` is empty.
+    """
+    if not basis:
+        raise TQECException("Cannot sample correlation surfaces from an empty basis.")
+    if any(surface.has_single_node for surface in basis):
+        return [basis[0]] * num_samples
+    rng = random.Random(seed)
+    samples: list[CorrelationSurface] = []
+    for _ in range(num_samples):
+        combination = 0
+        while combination == 0:
+            combination = rng.getrandbits(len(basis))
+        span: frozenset[ZXEdge] = frozenset()
+        for i in _iter_set_bits(combination):
+            span ^= basis[i].span
+        samples.append(CorrelationSurface.from_span(zx_graph, span))
+    return samples
+
+
+def _gf2_null_space(constraints: Iterable[int], num_variables: int) -> list[int]:
+    """Compute a basis of the null space of a linear system over GF(2).
+
+    Args:
+        constraints: The rows of the system, each encoded as an integer whose
+            ``i``-th bit is the coefficient of the ``i``-th variable.
+        num_variables: The number of variables of the system.
+
+    Returns:
+        The solutions forming a basis of the null space, encoded as integers
+        whose ``i``-th bit is the value of the ``i``-th variable. There is one
+        solution per free variable, where this variable is the only free
+        variable set.
+    """
+    # Row echelon form where the pivot of each row is its lowest set bit.
+    pivots: dict[int, int] = {}
+    for row in constraints:
+        while row:
+            column = (row & -row).bit_length() - 1
+            if column not in pivots:
+                pivots[column] = row
+                break
+            row ^= pivots[column]
+    # Rows only involve variables greater than their pivot, so the pivot
+    # variables can be solved for by decreasing index.
+    solve_order = sorted(pivots, reverse=True)
+    solutions: list[int] = []
+    for free_variable in range(num_variables):
+        if free_variable in pivots:
+            continue
+        solution = 1 << free_variable
+        for column in solve_order:
+            if (pivots[column] & solution).bit_count() % 2:
+                solution |= 1 << column
+        solutions.append(solution)
+    return solutions
+
+
+def _iter_set_bits(value: int) -> Iterator[int]:
+    """Iterate over the indices of the bits set in ``value``."""
+    while value:
+        lowest = value & -value
+        yield lowest.bit_length() - 1
+        value ^= lowest
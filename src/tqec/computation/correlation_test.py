@@ -1,6 +1,17 @@
-from tqec.computation.correlation import CorrelationSurface
+import pytest
+
+from tqec.computation.correlation import (
+    CorrelationSurface,
+    find_correlation_surface_basis,
+    find_correlation_surfaces,
+    iter_correlation_surfaces_from_basis,
+    sample_correlation_surfaces_from_basis,
+)
 from tqec.computation.zx_graph import ZXKind, ZXEdge, ZXGraph, ZXNode
+from tqec.exceptions import TQECException
+from tqec.gallery.logical_cnot import logical_cnot_zx_graph
 from tqec.gallery.solo_node import solo_node_zx_graph
+from tqec.gallery.three_cnots import three_cnots_zx_graph
 from tqec.position import Position3D
 
 
@@ -211,3 +222,67 @@ def test_correlation_four_node_circle() -> None:
     assert correlation_surfaces[0].external_stabilizer == {"p1": "X", "p2": "X"}
     assert correlation_surfaces[1].external_stabilizer == {"p1": "Z", "p2": "Z"}
     assert correlation_surfaces[2].external_stabilizer == {"p1": "Z", "p2": "Z"}
+
+
+@pytest.mark.parametrize(
+    "zx_graph",
+    [
+        solo_node_zx_graph("X"),
+        logical_cnot_zx_graph("X"),
+        logical_cnot_zx_graph("Z"),
+        logical_cnot_zx_graph("OPEN"),
+        three_cnots_zx_graph("Z"),
+        three_cnots_zx_graph("OPEN"),
+    ],
+)
+def test_correlation_surface_basis_spans_all_surfaces(zx_graph: ZXGraph) -> None:
+    basis = find_correlation_surface_basis(zx_graph)
+    spanned_surfaces = list(iter_correlation_surfaces_from_basis(zx_graph, basis))
+    assert len(spanned_surfaces) == 2 ** len(basis) - 1
+    assert len(set(spanned_surfaces)) == len(spanned_surfaces)
+    assert set(find_correlation_surfaces(zx_graph)) <= set(spanned_surfaces)
+    if zx_graph.num_ports == 0:
+        # Without ports, every spanned surface is found by enumeration.
+        assert set(find_correlation_surfaces(zx_graph)) == set(spanned_surfaces)
+
+
+def test_correlation_surface_basis_closed_loop() -> None:
+    g = ZXGraph()
+    positions = [
+        Position3D(0, 0, 0),
+        Position3D(1, 0, 0),
+        Position3D(1, 1, 0),
+        Position3D(0, 1, 0),
+    ]
+    for u, v in zip(positions, positions[1:] + positions[:1]):
+        g.add_edge(ZXNode(u, ZXKind.Z), ZXNode(v, ZXKind.Z))
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 0), ZXKind.Z),
+        ZXNode(Position3D(-1, 0, 0), ZXKind.P, "p1"),
+    )
+    basis = find_correlation_surface_basis(g)
+    assert len(basis) == 2
+    # The Z observable flowing around the loop does not reach any leaf.
+    loop = next(cs for cs in basis if cs.external_stabilizer == {"p1": "I"})
+    assert loop.nodes == frozenset(ZXNode(p, ZXKind.Z) for p in positions)
+
+
+def test_sample_correlation_surfaces_from_basis() -> None:
+    g = three_cnots_zx_graph("OPEN")
+    basis = find_correlation_surface_basis(g)
+    samples = sample_correlation_surfaces_from_basis(g, basis, 20, seed=0)
+    assert len(samples) == 20
+    assert samples == sample_correlation_surfaces_from_basis(g, basis, 20, seed=0)
+    assert set(samples) <= set(iter_correlation_surfaces_from_basis(g, basis))
+
+    with pytest.raises(TQECException, match="empty basis"):
+        sample_correlation_surfaces_from_basis(g, [], 1)
+
+
+def test_find_correlation_surfaces_num_workers() -> None:
+    g = three_cnots_zx_graph("OPEN")
+    correlation_surfaces = find_correlation_surfaces(g)
+    assert find_correlation_surfaces(g, num_workers=2) == correlation_surfaces
+    assert [cs.external_stabilizer for cs in correlation_surfaces] == [
+        cs.external_stabilizer for cs in find_correlation_surfaces(g, num_workers=2)
+    ]
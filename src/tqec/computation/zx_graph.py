@@ -5,17 +5,17 @@ from __future__ import annotations
 from collections.abc import Mapping
 from dataclasses import dataclass
 from enum import Enum
+from functools import partial
 from typing import TYPE_CHECKING, Generator
 
-import networkx as nx
-from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d.axes3d import Axes3D
-
 from tqec.computation._base_graph import ComputationGraph
 from tqec.exceptions import TQECException
 from tqec.position import Direction3D, Position3D
 
 if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from mpl_toolkits.mplot3d.axes3d import Axes3D
+
     from tqec.computation.block_graph import BlockGraph
     from tqec.computation.correlation import CorrelationSurface
 
@@ -212,16 +212,12 @@ class ZXGraph(ComputationGraph[ZXNode, ZXEdge]):
             pos = self._ports[label]
             fill_node = ZXNode(pos, kind)
             # Overwrite the node at the port position
-            self._graph.add_node(pos, **{self._NODE_DATA_KEY: fill_node})
+            self.add_node(fill_node, check_conflict=False)
             for edge in self.edges_at(pos):
-                self._graph.remove_edge(edge.u.position, edge.v.position)
+                self._remove_edge(edge.u.position, edge.v.position)
                 other = edge.u if edge.v.position == pos else edge.v
-                self._graph.add_edge(
-                    other.position,
-                    pos,
-                    **{
-                        self._EDGE_DATA_KEY: ZXEdge(other, fill_node, edge.has_hadamard)
-                    },
+                self._add_edge(
+                    other.position, pos, ZXEdge(other, fill_node, edge.has_hadamard)
                 )
             # Delete the port label
             self._ports.pop(label)
@@ -304,6 +300,8 @@ class ZXGraph(ComputationGraph[ZXNode, ZXEdge]):
         recursively explores the next frontier until the search is completed. Finally, the branches
         at different nodes are produced to form the correlation surface.
 
+        The correlation surfaces are memoized until the graph is modified.
+
         Returns:
             A list of `CorrelationSurface` in the graph.
 
@@ -312,7 +310,11 @@ class ZXGraph(ComputationGraph[ZXNode, ZXEdge]):
         """
         from tqec.computation.correlation import find_correlation_surfaces
 
-        return find_correlation_surfaces(self)
+        return list(
+            self._memoized(
+                "correlation_surfaces", partial(find_correlation_surfaces, self)
+            )
+        )
 
     def draw(
         self,
@@ -362,10 +364,15 @@ class ZXGraph(ComputationGraph[ZXNode, ZXEdge]):
         - The graph is a single connected component.
         - The ports and Y nodes are leaf nodes.
 
+        The result is memoized until the graph is modified.
+
         Raises:
             TQECException: If the invariants are not satisfied.
         """
-        if nx.number_connected_components(self._graph) != 1:
+        self._memoized("check_invariants", self._check_invariants)
+
+    def _check_invariants(self) -> None:
+        if self.num_connected_components() != 1:
             raise TQECException("The ZX graph must be a single connected component.")
         for node in self.nodes:
             if not node.is_zx_node and self.get_degree(node.position) != 1:
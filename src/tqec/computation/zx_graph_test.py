@@ -193,3 +193,111 @@ def test_zx_graph_check_invariants() -> None:
     )
     with pytest.raises(TQECException, match="The port/Y node must be a leaf node."):
         g.check_invariants()
+
+
+def test_zx_graph_leaf_nodes() -> None:
+    g = ZXGraph()
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 0), ZXKind.P, "in"),
+        ZXNode(Position3D(0, 0, 1), ZXKind.Z),
+    )
+    assert g.leaf_nodes == [
+        ZXNode(Position3D(0, 0, 0), ZXKind.P, "in"),
+        ZXNode(Position3D(0, 0, 1), ZXKind.Z),
+    ]
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 1), ZXKind.Z),
+        ZXNode(Position3D(0, 0, 2), ZXKind.P, "out"),
+    )
+    assert g.get_degree(Position3D(0, 0, 1)) == 2
+    assert g.leaf_nodes == [
+        ZXNode(Position3D(0, 0, 0), ZXKind.P, "in"),
+        ZXNode(Position3D(0, 0, 2), ZXKind.P, "out"),
+    ]
+    g.fill_ports(ZXKind.X)
+    assert g.leaf_nodes == [
+        ZXNode(Position3D(0, 0, 0), ZXKind.X),
+        ZXNode(Position3D(0, 0, 2), ZXKind.X),
+    ]
+    assert g.num_edges == 2
+    assert g.num_connected_components() == 1
+    g.add_node(ZXNode(Position3D(5, 5, 5), ZXKind.Z))
+    assert g.num_connected_components() == 2
+    assert g.get_degree(Position3D(5, 5, 5)) == 0
+
+
+def test_zx_graph_equality() -> None:
+    u = ZXNode(Position3D(0, 0, 0), ZXKind.Z)
+    v = ZXNode(Position3D(1, 0, 0), ZXKind.X)
+    w = ZXNode(Position3D(1, 1, 0), ZXKind.X)
+    g1, g2 = ZXGraph(), ZXGraph()
+    g1.add_edge(u, v)
+    g1.add_edge(v, w)
+    # Insertion order does not matter.
+    g2.add_edge(w, v)
+    g2.add_edge(v, u)
+    assert g1 == g2
+    g3 = ZXGraph()
+    g3.add_edge(u, v, has_hadamard=True)
+    g3.add_edge(v, w)
+    assert g1 != g3
+
+
+def test_zx_graph_to_networkx() -> None:
+    g = ZXGraph()
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 0), ZXKind.Z),
+        ZXNode(Position3D(1, 0, 0), ZXKind.X),
+        has_hadamard=True,
+    )
+    graph = g.to_networkx()
+    assert set(graph.nodes) == {Position3D(0, 0, 0), Position3D(1, 0, 0)}
+    assert graph.nodes[Position3D(0, 0, 0)]["tqec_node_data"] == ZXNode(
+        Position3D(0, 0, 0), ZXKind.Z
+    )
+    edge_data = graph.edges[Position3D(0, 0, 0), Position3D(1, 0, 0)]
+    assert edge_data["tqec_edge_data"] == g.edges[0]
+
+
+def test_zx_graph_memoizes_correlation_surfaces(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from tqec.computation import correlation
+
+    num_searches = 0
+    find_correlation_surfaces = correlation.find_correlation_surfaces
+
+    def counting_search(zx_graph: ZXGraph) -> list[correlation.CorrelationSurface]:
+        nonlocal num_searches
+        num_searches += 1
+        return find_correlation_surfaces(zx_graph)
+
+    monkeypatch.setattr(correlation, "find_correlation_surfaces", counting_search)
+    g = ZXGraph()
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 0), ZXKind.X), ZXNode(Position3D(0, 0, 1), ZXKind.Z)
+    )
+    surfaces = g.find_correration_surfaces()
+    assert g.find_correration_surfaces() == surfaces
+    assert num_searches == 1
+
+    version = g.version
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 1), ZXKind.Z), ZXNode(Position3D(0, 0, 2), ZXKind.X)
+    )
+    assert g.version > version
+    assert g.find_correration_surfaces() != surfaces
+    assert num_searches == 2
+
+
+def test_zx_graph_memoizes_check_invariants() -> None:
+    g = ZXGraph()
+    g.add_edge(
+        ZXNode(Position3D(0, 0, 0), ZXKind.X), ZXNode(Position3D(0, 0, 1), ZXKind.Z)
+    )
+    g.check_invariants()
+    g.add_node(ZXNode(Position3D(5, 0, 0), ZXKind.Z))
+    with pytest.raises(TQECException, match="single connected component"):
+        g.check_invariants()
+    with pytest.raises(TQECException, match="single connected component"):
+        g.check_invariants()
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import pytest
+
+import tqec
+
+
+def test_cli_import_does_not_load_heavy_dependencies() -> None:
+    heavy_modules = ["matplotlib", "sinter", "tqecd", "collada", "networkx", "stim"]
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, tqec._cli.tqec; "
+            f"print([m for m in {heavy_modules!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_exports() -> None:
+    from tqec.computation.block_graph import BlockGraph
+    from tqec.noise_model import NoiseModel
+
+    assert tqec.BlockGraph is BlockGraph
+    assert tqec.NoiseModel is NoiseModel
+    assert tqec.circuit is sys.modules["tqec.circuit"]
+    assert "BlockGraph" in dir(tqec)
+    with pytest.raises(AttributeError):
+        tqec.this_does_not_exist  # type: ignore[attr-defined]
@@ -21,13 +21,32 @@ Modifications to the original code:
    immediately followed by resets. As a result, the depolarizing error has no
    effect.
 4. Remove the ``depolarizing_two_body_measurement_noise`` noise model.
+5. Add ``ParametricNoisyCircuit`` to build the noisy versions of a circuit for
+   many noise strengths without walking the circuit for each of them.
+6. Add ``NoisyCircuitWriter`` to apply a noise model to a circuit provided in
+   several pieces and write the result incrementally.
+7. Cache the noisy version of each distinct moment in a bounded LRU cache, so
+   that moments appearing several times in a circuit are only processed once.
+8. Track idle qubits with NumPy boolean masks instead of Python sets.
+9. Add ``write_noisy_stim_file`` to apply a noise model to a ``.stim`` file
+   without loading it in memory.
 """
 
-from collections import Counter, defaultdict
-from typing import AbstractSet, Iterator
+import itertools
+import pathlib
+from collections import Counter, OrderedDict, defaultdict
+from typing import AbstractSet, Callable, Iterator, TextIO
 
+import numpy
+import numpy.typing as npt
 import stim
 
+from tqec.circuit.instructions import (
+    circuit_to_exact_text,
+    instruction_to_exact_text,
+)
+from tqec.exceptions import TQECException
+
 CLIFFORD_1Q = "C1"
 CLIFFORD_2Q = "C2"
 ANNOTATION = "info"
@@ -121,6 +140,7 @@ COLLAPSING_OPS = {
     for op, t in OP_TYPES.items()
     if t == JUST_RESET_1Q or t == JUST_MEASURE_1Q or t == MPP or t == MEASURE_RESET_1Q
 }
+_OP_TYPES_WITH_PROBABILITIES = {NOISE, MPP, JUST_MEASURE_1Q, MEASURE_RESET_1Q}
 
 
 class NoiseRule:
@@ -280,8 +300,7 @@ class NoiseModel:
         *,
         moment_split_ops: list[stim.CircuitInstruction],
         out: stim.Circuit,
-        system_qubits: AbstractSet[int],
-        immune_qubits: AbstractSet[int],
+        idle_candidates: npt.NDArray[numpy.bool_],
     ) -> None:
         collapse_qubits: list[int] = []
         clifford_qubits: list[int] = []
@@ -292,40 +311,50 @@ class NoiseModel:
                 qubits_out = collapse_qubits
             else:
                 qubits_out = clifford_qubits
-            for target in split_op.targets_copy():
-                if not target.is_combiner:
-                    qubits_out.append(target.value)
+            qubits_out.extend(
+                target.value
+                for target in split_op.targets_copy()
+                if not target.is_combiner
+            )
+        collapse = numpy.array(collapse_qubits, dtype=numpy.int64)
+        clifford = numpy.array(clifford_qubits, dtype=numpy.int64)
 
         # Safety check for operation collisions.
-        usage_counts = Counter(collapse_qubits + clifford_qubits)
-        qubits_used_multiple_times = {q for q, c in usage_counts.items() if c != 1}
-        if qubits_used_multiple_times:
-            moment = stim.Circuit()
-            for op in moment_split_ops:
-                moment.append(op)
-            raise ValueError(
-                f"Qubits were operated on multiple times without a TICK in between:\n"
-                f"multiple uses: {sorted(qubits_used_multiple_times)}\n"
-                f"moment:\n"
-                f"{moment}"
-            )
+        used = numpy.concatenate((collapse, clifford))
+        if used.size > 0:
+            qubits_used_multiple_times = numpy.flatnonzero(numpy.bincount(used) > 1)
+            if qubits_used_multiple_times.size > 0:
+                moment = stim.Circuit()
+                for op in moment_split_ops:
+                    moment.append(op)
+                raise ValueError(
+                    f"Qubits were operated on multiple times without a TICK in between:\n"
+                    f"multiple uses: {qubits_used_multiple_times.tolist()}\n"
+                    f"moment:\n"
+                    f"{moment}"
+                )
 
-        collapse_qubits_set = set(collapse_qubits)
-        clifford_qubits_set = set(clifford_qubits)
-        idle = sorted(
-            system_qubits - collapse_qubits_set - clifford_qubits_set - immune_qubits
-        )
+        # Qubits outside of the masks are not system qubits and can be ignored.
+        collapse = collapse[collapse < idle_candidates.size]
+        clifford = clifford[clifford < idle_candidates.size]
+        waiting_for_mr = idle_candidates.copy()
+        waiting_for_mr[collapse] = False
+        idle_mask = waiting_for_mr.copy()
+        idle_mask[clifford] = False
+        # Building the instruction from text is much faster than appending a
+        # large list of targets with stim.Circuit.append.
+        idle = " ".join(map(str, numpy.flatnonzero(idle_mask).tolist()))
         if idle and self.idle_depolarization:
-            out.append("DEPOLARIZE1", idle, self.idle_depolarization)
+            out += stim.Circuit(f"DEPOLARIZE1({self.idle_depolarization!r}) {idle}")
 
-        waiting_for_mr = sorted(system_qubits - collapse_qubits_set - immune_qubits)
         if (
-            collapse_qubits_set
-            and waiting_for_mr
+            collapse_qubits
+            and waiting_for_mr.any()
             and self.additional_depolarization_waiting_for_m_or_r
         ):
-            out.append(
-                "DEPOLARIZE1", idle, self.additional_depolarization_waiting_for_m_or_r
+            out += stim.Circuit(
+                f"DEPOLARIZE1({self.additional_depolarization_waiting_for_m_or_r!r}) "
+                f"{idle}"
             )
 
     def _append_noisy_moment(
@@ -333,8 +362,8 @@ class NoiseModel:
         *,
         moment_split_ops: list[stim.CircuitInstruction],
         out: stim.Circuit,
-        system_qubits: AbstractSet[int],
         immune_qubits: AbstractSet[int],
+        idle_candidates: npt.NDArray[numpy.bool_],
     ) -> None:
         after: defaultdict[tuple[str, float], stim.Circuit] = defaultdict(stim.Circuit)
         for split_op in moment_split_ops:
@@ -354,8 +383,7 @@ class NoiseModel:
         self._append_idle_error(
             moment_split_ops=moment_split_ops,
             out=out,
-            system_qubits=system_qubits,
-            immune_qubits=immune_qubits,
+            idle_candidates=idle_candidates,
         )
 
     def noisy_circuit(
@@ -380,42 +408,541 @@ class NoiseModel:
             system_qubits = set(range(circuit.num_qubits))
         if immune_qubits is None:
             immune_qubits = set()
+        return self._noisy_circuit(
+            circuit, _NoisyMomentCache(self, system_qubits, immune_qubits)
+        )
 
+    def _noisy_circuit(
+        self, circuit: stim.Circuit, moment_cache: "_NoisyMomentCache"
+    ) -> stim.Circuit:
         result = stim.Circuit()
 
         first = True
-        for moment_split_ops in _iter_split_op_moments(
-            circuit, immune_qubits=immune_qubits
-        ):
+        for moment in _iter_moments(circuit):
             if first:
                 first = False
             elif result and isinstance(result[-1], stim.CircuitRepeatBlock):
                 pass
             else:
                 result.append("TICK")
-            if isinstance(moment_split_ops, stim.CircuitRepeatBlock):
-                noisy_body = self.noisy_circuit(
-                    moment_split_ops.body_copy(),
-                    system_qubits=system_qubits,
-                    immune_qubits=immune_qubits,
-                )
+            if isinstance(moment, stim.CircuitRepeatBlock):
+                noisy_body = self._noisy_circuit(moment.body_copy(), moment_cache)
                 noisy_body.append("TICK")
                 result.append(
                     stim.CircuitRepeatBlock(
-                        repeat_count=moment_split_ops.repeat_count, body=noisy_body
+                        repeat_count=moment.repeat_count, body=noisy_body
                     )
                 )
             else:
-                self._append_noisy_moment(
-                    moment_split_ops=moment_split_ops,
-                    out=result,
-                    system_qubits=system_qubits,
-                    immune_qubits=immune_qubits,
-                )
+                result += moment_cache.get_noisy_moment(moment)
 
         return result
 
 
+class _NoisyMomentCache:
+    """Bounded LRU cache of the noisy version of moments.
+
+    Surface code circuits repeat a small number of distinct moments a large
+    number of times. The noisy version of a moment only depends on its
+    instructions, on the noise model and on the system and immune qubits, so
+    it can be computed once and re-used for each occurrence of that moment.
+    The noise model and the qubit sets are fixed for a given cache, and the
+    instructions of the moment are used as the cache key.
+    """
+
+    def __init__(
+        self,
+        noise_model: NoiseModel,
+        system_qubits: AbstractSet[int],
+        immune_qubits: AbstractSet[int],
+        maxsize: int = 128,
+    ):
+        self._noise_model = noise_model
+        self._immune_qubits = immune_qubits
+        self._idle_candidates = _idle_candidates_mask(system_qubits, immune_qubits)
+        self._maxsize = maxsize
+        self._cache: OrderedDict[
+            tuple[tuple[str, tuple[stim.GateTarget, ...], tuple[float, ...]], ...],
+            stim.Circuit,
+        ] = OrderedDict()
+
+    def get_noisy_moment(self, moment: list[stim.CircuitInstruction]) -> stim.Circuit:
+        """Returns the noisy version of the provided moment.
+
+        The returned circuit is shared with the cache and should not be
+        modified.
+        """
+        # The text representation of an instruction rounds its arguments, so
+        # the exact targets and arguments are used instead.
+        key = tuple(
+            (op.name, tuple(op.targets_copy()), tuple(op.gate_args_copy()))
+            for op in moment
+        )
+        noisy_moment = self._cache.get(key)
+        if noisy_moment is not None:
+            self._cache.move_to_end(key)
+            return noisy_moment
+        noisy_moment = stim.Circuit()
+        self._noise_model._append_noisy_moment(
+            moment_split_ops=[
+                split_op
+                for op in moment
+                for split_op in _split_targets_if_needed(
+                    op, immune_qubits=self._immune_qubits
+                )
+            ],
+            out=noisy_moment,
+            immune_qubits=self._immune_qubits,
+            idle_candidates=self._idle_candidates,
+        )
+        self._cache[key] = noisy_moment
+        if len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+        return noisy_moment
+
+
+def _idle_candidates_mask(
+    system_qubits: AbstractSet[int], immune_qubits: AbstractSet[int]
+) -> npt.NDArray[numpy.bool_]:
+    """Returns a boolean mask, indexed by qubit, of the qubits eligible for
+    idling noise, i.e., the system qubits that are not immune."""
+    mask = numpy.zeros(max(system_qubits, default=-1) + 1, dtype=numpy.bool_)
+    mask[list(system_qubits)] = True
+    mask[[q for q in immune_qubits if 0 <= q < mask.size]] = False
+    return mask
+
+
+class NoisyCircuitWriter:
+    """Apply a noise model to a circuit provided in several pieces, writing
+    the noisy circuit as ``stim`` text as soon as each moment is complete.
+
+    Pieces can be cut anywhere between two instructions, and reading back the
+    text written to ``out`` gives exactly the circuit that
+    :meth:`NoiseModel.noisy_circuit` returns for the concatenation of the pieces.
+    Only the moment currently being read is kept in memory. The body of a
+    ``REPEAT`` block can also be provided in several pieces by enclosing them
+    in calls to :meth:`begin_repeat_block` and :meth:`end_repeat_block`.
+
+    Example:
+        >>> import io
+        >>> import stim
+        >>> noise_model = NoiseModel.uniform_depolarizing(0.001)
+        >>> circuit = stim.Circuit("R 0 1\\nTICK\\nCX 0 1\\nTICK\\nM 0 1")
+        >>> out = io.StringIO()
+        >>> writer = NoisyCircuitWriter(noise_model, out, system_qubits={0, 1})
+        >>> writer.append(circuit[:3])
+        >>> writer.append(circuit[3:])
+        >>> writer.close()
+        >>> stim.Circuit(out.getvalue()) == noise_model.noisy_circuit(circuit)
+        True
+    """
+
+    def __init__(
+        self,
+        noise_model: NoiseModel,
+        out: TextIO,
+        *,
+        system_qubits: AbstractSet[int],
+        immune_qubits: AbstractSet[int] | None = None,
+    ):
+        """
+        Args:
+            noise_model: The noise model to apply.
+            out: The text stream the noisy circuit is written to.
+            system_qubits: All qubits used by the circuit. These are the qubits
+                eligible for idling noise. Contrary to
+                :meth:`NoiseModel.noisy_circuit`, they cannot be inferred from
+                the circuit as it is not known in advance.
+            immune_qubits: Qubits to not apply noise to, even if they are
+                operated on.
+        """
+        self._noise_model = noise_model
+        self._out = out
+        self._moment_cache = _NoisyMomentCache(
+            noise_model,
+            set(system_qubits),
+            set(immune_qubits) if immune_qubits is not None else set(),
+        )
+        self._current_moment: list[stim.CircuitInstruction] = []
+        self._first = True
+        self._last_written_is_repeat_block = False
+        self._repeat_block_depth = 0
+
+    def append(self, circuit: stim.Circuit) -> None:
+        """Append the given piece of circuit, writing the noisy version of all
+        the moments it completes."""
+        for op in circuit:
+            if isinstance(op, stim.CircuitRepeatBlock):
+                if self._current_moment:
+                    self._write_moment(self._current_moment)
+                    self._current_moment = []
+                self._write_moment(op)
+            elif op.name == "TICK":
+                self._write_moment(self._current_moment)
+                self._current_moment = []
+            else:
+                self._current_moment.append(op)
+
+    def begin_repeat_block(self, repeat_count: int) -> None:
+        """Start a ``REPEAT`` block, whose body is provided by the following
+        calls to :meth:`append` until the matching call to
+        :meth:`end_repeat_block`.
+
+        Args:
+            repeat_count: number of repetitions of the ``REPEAT`` block.
+        """
+        if self._current_moment:
+            self._write_moment(self._current_moment)
+            self._current_moment = []
+        if self._needs_tick():
+            self._out.write("TICK\n")
+        self._out.write(f"REPEAT {repeat_count} {{\n")
+        self._repeat_block_depth += 1
+        self._first = True
+        self._last_written_is_repeat_block = False
+
+    def end_repeat_block(self) -> None:
+        """End the ``REPEAT`` block started by the last unmatched call to
+        :meth:`begin_repeat_block`.
+
+        Raises:
+            TQECException: if there is no ``REPEAT`` block to end.
+        """
+        if self._repeat_block_depth == 0:
+            raise TQECException("Trying to end a REPEAT block that was not started.")
+        if self._current_moment:
+            self._write_moment(self._current_moment)
+            self._current_moment = []
+        # NoiseModel.noisy_circuit appends a TICK at the end of REPEAT bodies.
+        self._out.write("TICK\n}\n")
+        self._repeat_block_depth -= 1
+        self._first = False
+        self._last_written_is_repeat_block = True
+
+    def close(self) -> None:
+        """Write the noisy version of the last moment, if any.
+
+        ``out`` is not closed by this method.
+
+        Raises:
+            TQECException: if a ``REPEAT`` block has not been ended.
+        """
+        if self._repeat_block_depth != 0:
+            raise TQECException(
+                f"{self._repeat_block_depth} REPEAT block(s) have not been ended."
+            )
+        if self._current_moment:
+            self._write_moment(self._current_moment)
+            self._current_moment = []
+
+    def _needs_tick(self) -> bool:
+        """Returns ``True`` if a ``TICK`` should separate the previous moment
+        from the one about to be written, and marks the current block as
+        started."""
+        if self._first:
+            self._first = False
+            return False
+        return not self._last_written_is_repeat_block
+
+    def _write_moment(
+        self, moment: stim.CircuitRepeatBlock | list[stim.CircuitInstruction]
+    ) -> None:
+        # Mirrors the loop body of NoiseModel._noisy_circuit.
+        result = stim.Circuit()
+        if self._needs_tick():
+            result.append("TICK")
+        if isinstance(moment, stim.CircuitRepeatBlock):
+            noisy_body = self._noise_model._noisy_circuit(
+                moment.body_copy(), self._moment_cache
+            )
+            noisy_body.append("TICK")
+            result.append(
+                stim.CircuitRepeatBlock(
+                    repeat_count=moment.repeat_count, body=noisy_body
+                )
+            )
+        else:
+            result += self._moment_cache.get_noisy_moment(moment)
+        if result:
+            self._last_written_is_repeat_block = isinstance(
+                result[-1], stim.CircuitRepeatBlock
+            )
+            self._out.write(f"{circuit_to_exact_text(result)}\n")
+
+
+def write_noisy_stim_file(
+    input_path: str | pathlib.Path,
+    output_path: str | pathlib.Path,
+    noise_model: NoiseModel,
+    *,
+    system_qubits: AbstractSet[int] | None = None,
+    immune_qubits: AbstractSet[int] | None = None,
+    lines_per_chunk: int = 1024,
+) -> None:
+    """Apply a noise model to the circuit stored in a ``.stim`` file and write
+    the noisy circuit to another file.
+
+    The input file is read ``lines_per_chunk`` lines at a time and ``REPEAT``
+    blocks are entered instead of being loaded at once, so the memory used
+    does not depend on the size of the circuit. The written circuit is exactly
+    the one returned by :meth:`NoiseModel.noisy_circuit` for the circuit stored
+    in ``input_path``.
+
+    Note:
+        ``REPEAT`` blocks should be written in the format used by ``stim``, i.e.,
+        with the opening ``{`` at the end of the ``REPEAT`` line and the closing
+        ``}`` on its own line.
+
+    Args:
+        input_path: path of the ``.stim`` file to read.
+        output_path: path of the ``.stim`` file to write. Should be different
+            from ``input_path``.
+        noise_model: The noise model to apply.
+        system_qubits: All qubits used by the circuit. These are the qubits
+            eligible for idling noise. If ``None``, the input file is read a
+            first time to compute the number of qubits of the circuit, and
+            default to all the qubits, as in :meth:`NoiseModel.noisy_circuit`.
+        immune_qubits: Qubits to not apply noise to, even if they are operated
+            on.
+        lines_per_chunk: maximum number of lines of the input file given to
+            ``stim`` at once.
+    """
+    if system_qubits is None:
+        num_qubits = 0
+        for chunk in _iter_stim_file_chunks(input_path, lines_per_chunk):
+            if isinstance(chunk, stim.Circuit):
+                num_qubits = max(num_qubits, chunk.num_qubits)
+        system_qubits = set(range(num_qubits))
+
+    with open(output_path, "w") as out:
+        writer = NoisyCircuitWriter(
+            noise_model, out, system_qubits=system_qubits, immune_qubits=immune_qubits
+        )
+        for chunk in _iter_stim_file_chunks(input_path, lines_per_chunk):
+            if isinstance(chunk, stim.Circuit):
+                writer.append(chunk)
+            elif chunk is None:
+                writer.end_repeat_block()
+            else:
+                writer.begin_repeat_block(chunk)
+        writer.close()
+
+
+def _iter_stim_file_chunks(
+    path: str | pathlib.Path, lines_per_chunk: int
+) -> Iterator[stim.Circuit | int | None]:
+    """Reads a ``.stim`` file without entering ``REPEAT`` blocks in ``stim``.
+
+    Yields:
+        circuits containing at most ``lines_per_chunk`` consecutive lines
+        of instructions, the number of repetitions of a ``REPEAT`` block when
+        entering it, or ``None`` when leaving it.
+    """
+    lines: list[str] = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", maxsplit=1)[0].strip()
+            if not line:
+                continue
+            if line.endswith("{") or line == "}":
+                if lines:
+                    yield stim.Circuit("\n".join(lines))
+                    lines = []
+                if line == "}":
+                    yield None
+                    continue
+                header = line[:-1].split()
+                if not header or not header[0].startswith("REPEAT"):
+                    raise TQECException(f"Could not parse the block header {line!r}.")
+                yield int(header[-1])
+            else:
+                lines.append(line)
+                if len(lines) >= lines_per_chunk:
+                    yield stim.Circuit("\n".join(lines))
+                    lines = []
+    if lines:
+        yield stim.Circuit("\n".join(lines))
+
+
+def _noise_model_parameters(noise_model: NoiseModel) -> list[tuple[str, float]]:
+    """Lists the probabilities used by a noise model, in a deterministic order.
+
+    Each probability is labelled by its location in the noise model, so that
+    the lists obtained from two noise models can be matched entry by entry.
+    """
+    parameters = [
+        ("idle_depolarization", noise_model.idle_depolarization),
+        (
+            "additional_depolarization_waiting_for_m_or_r",
+            noise_model.additional_depolarization_waiting_for_m_or_r,
+        ),
+    ]
+    rules: list[tuple[str, NoiseRule | None]] = [
+        ("any_clifford_1q_rule", noise_model.any_clifford_1q_rule),
+        ("any_clifford_2q_rule", noise_model.any_clifford_2q_rule),
+    ]
+    for prefix, rules_by_name in [
+        ("gate_rules", noise_model.gate_rules),
+        ("measure_rules", noise_model.measure_rules),
+    ]:
+        if rules_by_name is not None:
+            rules.extend(
+                (f"{prefix}.{name}", rules_by_name[name])
+                for name in sorted(rules_by_name)
+            )
+    for label, rule in rules:
+        if rule is None:
+            continue
+        parameters.extend(
+            (f"{label}.after.{name}", rule.after[name]) for name in sorted(rule.after)
+        )
+        parameters.append((f"{label}.flip_result", rule.flip_result))
+    return parameters
+
+
+class ParametricNoisyCircuit:
+    """Noisy version of a circuit that can be materialized for any noise
+    strength ``p``.
+
+    :meth:`NoiseModel.noisy_circuit` walks the whole circuit to decide where
+    each noise channel should be inserted. For the noise models built by
+    :meth:`NoiseModel.uniform_depolarizing` or :meth:`NoiseModel.si1000`, the
+    channels that are inserted and their location do not depend on ``p``: only
+    their probabilities do. This class walks the circuit once with the noise
+    model obtained for ``reference_p`` and records, for each probability in the
+    resulting circuit, which parameter of the noise model it comes from.
+    Materializing the noisy circuit for another value of ``p`` then only
+    requires to substitute the probabilities of the noise model built for that
+    ``p``.
+
+    The circuits returned by :meth:`materialize` are exactly equal to the ones
+    returned by ``noise_model_factory(p).noisy_circuit(circuit)``.
+
+    Example:
+        >>> import stim
+        >>> circuit = stim.Circuit("R 0\\nTICK\\nH 0 1\\nTICK\\nM 0 1")
+        >>> parametric = ParametricNoisyCircuit(circuit, NoiseModel.si1000)
+        >>> noisy_circuit = NoiseModel.si1000(0.002).noisy_circuit(circuit)
+        >>> parametric.materialize(0.002) == noisy_circuit
+        True
+    """
+
+    def __init__(
+        self,
+        circuit: stim.Circuit,
+        noise_model_factory: Callable[[float], NoiseModel],
+        *,
+        system_qubits: set[int] | None = None,
+        immune_qubits: set[int] | None = None,
+        reference_p: float = 1e-3,
+    ):
+        """
+        Args:
+            circuit: The circuit to layer noise over.
+            noise_model_factory: A callable that builds a noise model from an
+                input strength ``p``.
+            system_qubits: All qubits used by the circuit. These are the qubits
+                eligible for idling noise.
+            immune_qubits: Qubits to not apply noise to, even if they are
+                operated on.
+            reference_p: Noise strength used to walk the circuit. The
+                probabilities of ``noise_model_factory(reference_p)`` should be
+                different from any argument already present on the noise
+                channels and measurements of ``circuit``.
+        """
+        self._noise_model_factory = noise_model_factory
+        reference_noise_model = noise_model_factory(reference_p)
+        self._reference_parameters = _noise_model_parameters(reference_noise_model)
+        # Each distinct non-zero probability gets a slot, in increasing order.
+        self._slot_values = sorted({v for _, v in self._reference_parameters if v})
+        slot_by_value = {v: i for i, v in enumerate(self._slot_values)}
+        noisy_circuit = reference_noise_model.noisy_circuit(
+            circuit, system_qubits=system_qubits, immune_qubits=immune_qubits
+        )
+        self._template = "\n".join(_template_lines(noisy_circuit, slot_by_value))
+
+    def materialize(self, p: float) -> stim.Circuit:
+        """Returns the noisy circuit for the noise strength ``p``.
+
+        Raises:
+            TQECException: if the noise model built for ``p`` would insert
+                different noise channels than the one built for the reference
+                noise strength, for example because a probability is zero for
+                one of them only, or because the ordering of the probabilities
+                changed.
+        """
+        slot_values = self._get_slot_values(p)
+        return stim.Circuit(self._template.format(*map(repr, slot_values)))
+
+    def can_materialize(self, p: float) -> bool:
+        """Returns ``True`` if :meth:`materialize` can be called with ``p``,
+        without building the noisy circuit."""
+        try:
+            self._get_slot_values(p)
+        except TQECException:
+            return False
+        return True
+
+    def _get_slot_values(self, p: float) -> list[float]:
+        """Returns the probabilities to substitute in the template for the noise
+        strength ``p``, raising if they cannot be substituted."""
+        parameters = _noise_model_parameters(self._noise_model_factory(p))
+        if [label for label, _ in parameters] != [
+            label for label, _ in self._reference_parameters
+        ]:
+            raise TQECException(
+                f"The noise model built for p={p} does not define the same noise "
+                "rules as the one built for the reference noise strength."
+            )
+        values: dict[float, float] = {}
+        for (label, reference), (_, value) in zip(
+            self._reference_parameters, parameters
+        ):
+            if values.setdefault(reference, value) != value or (reference == 0) != (
+                value == 0
+            ):
+                raise TQECException(
+                    f"The probability {label}={value} obtained for p={p} cannot be "
+                    "substituted in the noisy circuit built for the reference "
+                    "noise strength."
+                )
+        slot_values = [values[v] for v in self._slot_values]
+        # Noise channels are sorted by probability within a moment.
+        if any(a >= b for a, b in itertools.pairwise(slot_values)):
+            raise TQECException(
+                f"The probabilities obtained for p={p} are not ordered as the "
+                "ones obtained for the reference noise strength."
+            )
+        return slot_values
+
+
+def _template_lines(
+    circuit: stim.Circuit, slot_by_value: dict[float, int]
+) -> Iterator[str]:
+    """Yields the lines of ``circuit`` as format strings in which the noise
+    probabilities found in ``slot_by_value`` are replaced by their slot."""
+    for op in circuit:
+        if isinstance(op, stim.CircuitRepeatBlock):
+            yield f"REPEAT {op.repeat_count} {{{{"
+            yield from _template_lines(op.body_copy(), slot_by_value)
+            yield "}}"
+            continue
+        args = op.gate_args_copy()
+        if not args or OP_TYPES[op.name] not in _OP_TYPES_WITH_PROBABILITIES:
+            # Escape the braces that might be part of the instruction tag.
+            text = instruction_to_exact_text(op)
+            yield text.replace("{", "{{").replace("}", "}}")
+            continue
+        formatted_args = ",".join(
+            f"{{{slot_by_value[arg]}}}" if arg in slot_by_value else repr(arg)
+            for arg in args
+        )
+        text = str(op).replace("{", "{{").replace("}", "}}")
+        closing = text.rindex(")")
+        opening = text.rindex("(", 0, closing)
+        yield f"{text[:opening]}({formatted_args}){text[closing + 1 :]}"
+
+
 def occurs_in_classical_control_system(op: stim.CircuitInstruction) -> bool:
     """Determines if an operation is an annotation or a classical control
     system update."""
@@ -496,18 +1023,14 @@ def _split_targets_if_needed_m_basis(
     assert k == len(targets)
 
 
-def _iter_split_op_moments(
-    circuit: stim.Circuit, *, immune_qubits: AbstractSet[int]
+def _iter_moments(
+    circuit: stim.Circuit,
 ) -> Iterator[stim.CircuitRepeatBlock | list[stim.CircuitInstruction]]:
-    """Splits a circuit into moments and some operations into pieces.
-
-    Classical control system operations like CX rec[-1] 0 are split from quantum operations like CX 1 0.
-
-    MPP operations are split into one operation per Pauli product.
+    """Splits a circuit into moments.
 
     Yields:
-        Lists of operations corresponding to one moment in the circuit, with any problematic operations
-        like MPPs split into pieces.
+        Lists of operations corresponding to one moment in the circuit, or
+        ``REPEAT`` blocks.
 
         (A moment is the time between two TICKs.)
     """
@@ -524,13 +1047,39 @@ def _iter_split_op_moments(
                 yield cur_moment
                 cur_moment = []
             else:
-                cur_moment.extend(
-                    _split_targets_if_needed(op, immune_qubits=immune_qubits)
-                )
+                cur_moment.append(op)
     if cur_moment:
         yield cur_moment
 
 
+def _iter_split_op_moments(
+    circuit: stim.Circuit, *, immune_qubits: AbstractSet[int]
+) -> Iterator[stim.CircuitRepeatBlock | list[stim.CircuitInstruction]]:
+    """Splits a circuit into moments and some operations into pieces.
+
+    Classical control system operations like CX rec[-1] 0 are split from quantum operations like CX 1 0.
+
+    MPP operations are split into one operation per Pauli product.
+
+    Yields:
+        Lists of operations corresponding to one moment in the circuit, with any problematic operations
+        like MPPs split into pieces.
+
+        (A moment is the time between two TICKs.)
+    """
+    for moment in _iter_moments(circuit):
+        if isinstance(moment, stim.CircuitRepeatBlock):
+            yield moment
+        else:
+            yield [
+                split_op
+                for op in moment
+                for split_op in _split_targets_if_needed(
+                    op, immune_qubits=immune_qubits
+                )
+            ]
+
+
 def _measure_basis(*, split_op: stim.CircuitInstruction) -> str | None:
     """Converts an operation into a string describing the Pauli product basis
     it measures.
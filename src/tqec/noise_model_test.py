@@ -16,15 +16,31 @@ Modifications to the original code:
 3. Removing the line "DEPOLARIZE1(0.001) 0 1 2 3" from test_si_1000 and
    test_si_1000_repeat_block due to the removal of that noise from the main
    noise_model.py file.
+4. Adding tests for ``ParametricNoisyCircuit``.
+5. Adding tests for ``NoisyCircuitWriter``.
+6. Adding tests for ``_NoisyMomentCache``.
+7. Adding tests for idle noise and operation collisions.
+8. Adding tests for ``write_noisy_stim_file``.
 """
 
+import io
+from pathlib import Path
+from typing import Callable
+
+import pytest
 import stim
 
+from tqec.exceptions import TQECException
 from tqec.noise_model import (
     NoiseModel,
+    NoiseRule,
+    NoisyCircuitWriter,
+    ParametricNoisyCircuit,
+    _NoisyMomentCache,  # pyright: ignore[reportPrivateUsage]
     _iter_split_op_moments,
     _measure_basis,
     occurs_in_classical_control_system,
+    write_noisy_stim_file,
 )
 
 
@@ -223,3 +239,219 @@ def test_si_1000_repeat_block() -> None:
             TICK
         }
     """)
+
+
+# Coordinates are not all written exactly by str(stim.Circuit).
+_PARAMETRIC_CIRCUIT = stim.Circuit("""
+    R 0 1 2 3
+    TICK
+    REPEAT 10 {
+        ISWAP 0 1 2 3 4 5
+        TICK
+        H 4 5 6 7
+        TICK
+        M 0 1 2 3
+        DETECTOR(1, 2, 0.1234567891) rec[-1]
+        SHIFT_COORDS(0, 0, 0.3333333333333333)
+    }
+""")
+
+
+@pytest.mark.parametrize(
+    "noise_model_factory", [NoiseModel.si1000, NoiseModel.uniform_depolarizing]
+)
+def test_parametric_noisy_circuit(
+    noise_model_factory: Callable[[float], NoiseModel],
+) -> None:
+    parametric = ParametricNoisyCircuit(_PARAMETRIC_CIRCUIT, noise_model_factory)
+    for p in (1e-4, 0.001, 0.0123456789, 0.1):
+        assert parametric.materialize(p) == noise_model_factory(p).noisy_circuit(
+            _PARAMETRIC_CIRCUIT
+        )
+
+
+def test_parametric_noisy_circuit_qubit_sets() -> None:
+    parametric = ParametricNoisyCircuit(
+        _PARAMETRIC_CIRCUIT,
+        NoiseModel.si1000,
+        system_qubits={0, 1, 2, 3, 4, 5, 6, 7, 8},
+        immune_qubits={3},
+    )
+    assert parametric.materialize(0.002) == NoiseModel.si1000(0.002).noisy_circuit(
+        _PARAMETRIC_CIRCUIT,
+        system_qubits={0, 1, 2, 3, 4, 5, 6, 7, 8},
+        immune_qubits={3},
+    )
+
+
+def test_parametric_noisy_circuit_structure_change() -> None:
+    def quadratic(p: float) -> NoiseModel:
+        return NoiseModel(
+            idle_depolarization=p,
+            any_clifford_1q_rule=NoiseRule(after={"DEPOLARIZE1": p * p * 1000}),
+            any_clifford_2q_rule=NoiseRule(after={"DEPOLARIZE2": p}),
+            measure_rules={"Z": NoiseRule(after={}, flip_result=p)},
+            gate_rules={"R": NoiseRule(after={"X_ERROR": p})},
+        )
+
+    parametric = ParametricNoisyCircuit(_PARAMETRIC_CIRCUIT, quadratic)
+    # p * p * 1000 and p are equal for the reference p, but not for other values.
+    with pytest.raises(TQECException):
+        parametric.materialize(0.002)
+
+    def with_zero(p: float) -> NoiseModel:
+        return NoiseModel.uniform_depolarizing(p if p < 0.01 else 0)
+
+    parametric = ParametricNoisyCircuit(_PARAMETRIC_CIRCUIT, with_zero)
+    with pytest.raises(TQECException):
+        parametric.materialize(0.1)
+    assert not parametric.can_materialize(0.1)
+    assert parametric.can_materialize(0.002)
+
+
+@pytest.mark.parametrize(
+    "circuit",
+    [
+        _PARAMETRIC_CIRCUIT,
+        _PARAMETRIC_CIRCUIT + stim.Circuit("TICK\nM 0 1 2 3\nTICK"),
+        stim.Circuit("TICK\nTICK\nH 0\nTICK\nTICK\nMPP X0*X1 Z2\nCX rec[-1] 3"),
+    ],
+)
+@pytest.mark.parametrize("p", [1e-3, 1 / 3000])
+def test_noisy_circuit_writer(circuit: stim.Circuit, p: float) -> None:
+    model = NoiseModel.uniform_depolarizing(p)
+    system_qubits = set(range(8))
+    expected = model.noisy_circuit(circuit, system_qubits=system_qubits)
+    for pieces in [
+        [circuit],
+        [circuit[i : i + 1] for i in range(len(circuit))],
+        *([circuit[:i], circuit[i:]] for i in range(1, len(circuit))),
+    ]:
+        out = io.StringIO()
+        writer = NoisyCircuitWriter(model, out, system_qubits=system_qubits)
+        for piece in pieces:
+            writer.append(piece)
+        writer.close()
+        assert stim.Circuit(out.getvalue()) == expected
+
+
+def test_noisy_moment_cache() -> None:
+    model = NoiseModel.si1000(1e-3)
+    cache = _NoisyMomentCache(model, {0, 1, 2}, set(), maxsize=2)
+    moment = list(stim.Circuit("H 0\nCX 1 2"))
+    noisy_moment = cache.get_noisy_moment(moment)
+    assert noisy_moment == model.noisy_circuit(
+        stim.Circuit("H 0\nCX 1 2"), system_qubits={0, 1, 2}
+    )
+    # Same content, different instances: the cached circuit is returned.
+    assert cache.get_noisy_moment(list(stim.Circuit("H 0\nCX 1 2"))) is noisy_moment
+    cache.get_noisy_moment(list(stim.Circuit("H 1")))
+    cache.get_noisy_moment(list(stim.Circuit("H 2")))
+    # The least recently used entry has been evicted.
+    assert cache.get_noisy_moment(moment) is not noisy_moment
+    assert cache.get_noisy_moment(moment) == noisy_moment
+
+
+def test_noisy_moment_cache_exact_arguments() -> None:
+    model = NoiseModel.si1000(1e-3)
+    cache = _NoisyMomentCache(model, {0}, set())
+    # Both moments have the same text representation, as stim only writes 6
+    # significant digits.
+    for moment in [
+        stim.Circuit("M 0\nDETECTOR(0.1234567891) rec[-1]"),
+        stim.Circuit("M 0\nDETECTOR(0.1234567892) rec[-1]"),
+        stim.Circuit("QUBIT_COORDS(0.1234567891, 0) 0\nH 0"),
+        stim.Circuit("QUBIT_COORDS(0.1234567892, 0) 0\nH 0"),
+    ]:
+        assert cache.get_noisy_moment(list(moment)) == model.noisy_circuit(
+            moment, system_qubits={0}
+        )
+
+
+def test_idle_noise_qubit_sets() -> None:
+    model = NoiseModel.si1000(1e-3)
+    # Qubit 7 is operated on but is not a system qubit, qubit 1 is immune.
+    assert model.noisy_circuit(
+        stim.Circuit("H 0 7\nTICK\nM 2"),
+        system_qubits={0, 1, 2, 3},
+        immune_qubits={1},
+    ) == stim.Circuit("""
+        H 0 7
+        DEPOLARIZE1(0.0001) 0 7
+        DEPOLARIZE1(0.0001) 2 3
+        TICK
+        M(0.005) 2
+        DEPOLARIZE1(0.0001) 0 3
+        DEPOLARIZE1(0.002) 0 3
+    """)
+
+
+def test_operation_collisions() -> None:
+    model = NoiseModel.uniform_depolarizing(1e-3)
+    with pytest.raises(ValueError, match=r"multiple uses: \[1, 3\]"):
+        model.noisy_circuit(stim.Circuit("H 0 1 3\nCX 1 2\nM 3"))
+
+
+def test_noisy_circuit_writer_repeat_blocks() -> None:
+    model = NoiseModel.uniform_depolarizing(1e-3)
+    out = io.StringIO()
+    writer = NoisyCircuitWriter(model, out, system_qubits=set(range(8)))
+    writer.append(_PARAMETRIC_CIRCUIT[:2])
+    writer.begin_repeat_block(10)
+    writer.append(_PARAMETRIC_CIRCUIT[2].body_copy())
+    with pytest.raises(TQECException):
+        writer.close()
+    writer.end_repeat_block()
+    with pytest.raises(TQECException):
+        writer.end_repeat_block()
+    writer.close()
+    assert stim.Circuit(out.getvalue()) == model.noisy_circuit(
+        _PARAMETRIC_CIRCUIT, system_qubits=set(range(8))
+    )
+
+
+@pytest.mark.parametrize("lines_per_chunk", [1, 3, 1024])
+# 1 / 3000 cannot be written with the 6 significant digits used by stim.
+@pytest.mark.parametrize("p", [1e-3, 1 / 3000])
+def test_write_noisy_stim_file(tmp_path: Path, lines_per_chunk: int, p: float) -> None:
+    circuit_text = """
+        QUBIT_COORDS(0.1234567891, 0) 0
+        R 0 1 2 3
+        TICK
+        REPEAT 3 {
+            H 0
+            TICK
+            REPEAT 2 {
+                CX 0 1 2 3
+                TICK
+            }
+            M 0 1
+            DETECTOR rec[-1] rec[-2]
+        }
+        TICK
+        M 2 3
+        OBSERVABLE_INCLUDE(0) rec[-1]
+    """
+    circuit = stim.Circuit(circuit_text)
+    (tmp_path / "circuit.stim").write_text(circuit_text)
+    model = NoiseModel.uniform_depolarizing(p)
+    write_noisy_stim_file(
+        tmp_path / "circuit.stim",
+        tmp_path / "noisy.stim",
+        model,
+        lines_per_chunk=lines_per_chunk,
+    )
+    assert stim.Circuit.from_file(tmp_path / "noisy.stim") == model.noisy_circuit(
+        circuit
+    )
+    write_noisy_stim_file(
+        tmp_path / "circuit.stim",
+        tmp_path / "noisy.stim",
+        model,
+        system_qubits={0, 1, 2, 3, 4},
+        immune_qubits={1},
+        lines_per_chunk=lines_per_chunk,
+    )
+    assert stim.Circuit.from_file(tmp_path / "noisy.stim") == model.noisy_circuit(
+        circuit, system_qubits={0, 1, 2, 3, 4}, immune_qubits={1}
+    )
@@ -1,31 +1,147 @@
-import functools
 import itertools
 from concurrent.futures import ProcessPoolExecutor
-from typing import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, TypeVar
 
 import sinter
 import stim
 
 from tqec.compile.compile import CompiledGraph
-from tqec.noise_model import NoiseModel
+from tqec.compile.detectors.database import DetectorDatabase
+from tqec.exceptions import TQECException
+from tqec.noise_model import NoiseModel, ParametricNoisyCircuit
 
+# State shared by all the tasks executed by a worker process. It is set once per
+# worker by _initialize_worker instead of being sent with each task.
+_WORKER_COMPILED_GRAPH: CompiledGraph | None = None
+_WORKER_NOISE_MODEL_FACTORY: Callable[[float], NoiseModel] | None = None
+_WORKER_MANHATTAN_RADIUS: int = 2
+_WORKER_DETECTOR_DATABASE: DetectorDatabase | None = None
 
-def _parallel_func(
-    kp: tuple[int, float],
-    *,
+_R = TypeVar("_R")
+
+
+def _initialize_worker(
     compiled_graph: CompiledGraph,
     noise_model_factory: Callable[[float], NoiseModel],
     manhattan_radius: int,
-) -> tuple[stim.Circuit, int, float]:
-    k, p = kp
-    noise_model = noise_model_factory(p)
-    return (
-        compiled_graph.generate_stim_circuit(
-            k, noise_model, manhattan_radius=manhattan_radius
-        ),
+    detector_database: DetectorDatabase | None,
+) -> None:
+    global _WORKER_COMPILED_GRAPH, _WORKER_NOISE_MODEL_FACTORY
+    global _WORKER_MANHATTAN_RADIUS, _WORKER_DETECTOR_DATABASE
+    _WORKER_COMPILED_GRAPH = compiled_graph
+    _WORKER_NOISE_MODEL_FACTORY = noise_model_factory
+    _WORKER_MANHATTAN_RADIUS = manhattan_radius
+    _WORKER_DETECTOR_DATABASE = detector_database
+
+
+@dataclass(frozen=True)
+class _NoisyCircuitsOfK:
+    """Noisy circuits of a single value of ``k`` for several values of ``p``.
+
+    Attributes:
+        k: scale factor of the circuits.
+        parametric_circuit: noisy circuit the probabilities of each ``p`` are
+            substituted in.
+        fallback_circuits: noisy circuits of the values of ``p`` that cannot be
+            substituted in ``parametric_circuit``.
+    """
+
+    k: int
+    parametric_circuit: ParametricNoisyCircuit
+    fallback_circuits: dict[float, stim.Circuit]
+
+    def materialize(self, p: float) -> stim.Circuit:
+        circuit = self.fallback_circuits.get(p)
+        if circuit is not None:
+            return circuit.copy()
+        return self.parametric_circuit.materialize(p)
+
+
+def _parallel_parametric_func(
+    k: int,
+    ps: list[float],
+) -> tuple[_NoisyCircuitsOfK, DetectorDatabase | None]:
+    assert _WORKER_COMPILED_GRAPH is not None
+    assert _WORKER_NOISE_MODEL_FACTORY is not None
+    database = _WORKER_DETECTOR_DATABASE
+    num_known_situations = len(database) if database is not None else 0
+    # Only the noise model depends on p, so the noiseless circuit is generated
+    # once and each noisy circuit is derived from it.
+    noiseless_circuit = _WORKER_COMPILED_GRAPH.generate_stim_circuit(
         k,
-        p,
+        manhattan_radius=_WORKER_MANHATTAN_RADIUS,
+        detector_database=database,
+    )
+    # Noise is layered over the circuit once, and the probabilities are then
+    # substituted for each p.
+    parametric_circuit = ParametricNoisyCircuit(
+        noiseless_circuit, _WORKER_NOISE_MODEL_FACTORY
     )
+    # The noise model built for some values of p might not insert the same
+    # channels as the reference one, e.g. because p == 0 or because the
+    # factory is not linear in p, so noise has to be layered over the circuit
+    # again for them.
+    fallback_circuits = {
+        p: _WORKER_NOISE_MODEL_FACTORY(p).noisy_circuit(noiseless_circuit)
+        for p in ps
+        if not parametric_circuit.can_materialize(p)
+    }
+    new_situations = (
+        database.situations_added_after(num_known_situations)
+        if database is not None
+        else None
+    )
+    return _NoisyCircuitsOfK(k, parametric_circuit, fallback_circuits), new_situations
+
+
+def _parallel_func(
+    k: int,
+    ps: list[float],
+) -> tuple[list[tuple[stim.Circuit, int, float]], DetectorDatabase | None]:
+    noisy_circuits, new_situations = _parallel_parametric_func(k, ps)
+    return [(noisy_circuits.materialize(p), k, p) for p in ps], new_situations
+
+
+def _generate_in_parallel(
+    func: Callable[[int, list[float]], tuple[_R, DetectorDatabase | None]],
+    compiled_graph: CompiledGraph,
+    ks: list[int],
+    ps: list[float],
+    noise_model_factory: Callable[[float], NoiseModel],
+    manhattan_radius: int,
+    max_workers: int | None,
+    detector_database: DetectorDatabase | None,
+) -> Iterator[_R]:
+    """Yields ``func(k, ps)`` for each ``k`` in ``ks``, computed by worker
+    processes, and merges the situations found by the workers back into
+    ``detector_database``."""
+    if (
+        detector_database is not None
+        and not detector_database.frozen
+        and manhattan_radius >= 0
+    ):
+        compiled_graph.populate_detector_database(
+            ks, detector_database, manhattan_radius
+        )
+    with ProcessPoolExecutor(
+        max_workers,
+        initializer=_initialize_worker,
+        initargs=(
+            compiled_graph,
+            noise_model_factory,
+            manhattan_radius,
+            detector_database,
+        ),
+    ) as executor:
+        for result, new_situations in executor.map(func, ks, itertools.repeat(ps)):
+            if (
+                detector_database is not None
+                and new_situations is not None
+                and len(new_situations) > 0
+            ):
+                detector_database.merge(new_situations)
+            yield result
 
 
 def generate_stim_circuits_with_detectors(
@@ -35,6 +151,7 @@ def generate_stim_circuits_with_detectors(
     noise_model_factory: Callable[[float], NoiseModel],
     manhattan_radius: int,
     max_workers: int | None = None,
+    detector_database: DetectorDatabase | None = None,
 ) -> Iterator[tuple[stim.Circuit, int, float]]:
     """Generate stim circuits in parallel.
 
@@ -54,6 +171,11 @@ def generate_stim_circuits_with_detectors(
 
     except that the order in which the results are returned is not guaranteed.
 
+    Because only the noise model depends on `p`, each task executed by a worker
+    process generates the noiseless circuit (with its observables and
+    detectors) of one value of `k` and derives the noisy circuits for all the
+    values of `p` from it.
+
     Args:
         compiled_graph: computation to export to `stim.Circuit` instances.
         ks: values of `k` to consider.
@@ -73,22 +195,31 @@ def generate_stim_circuits_with_detectors(
         max_workers: The maximum number of processes that can be used to
             execute the given calls. If None or not given then as many
             worker processes will be created as the machine has processors.
+        detector_database: an instance to retrieve from / store in detectors
+            that are computed as part of the circuit generation. It is filled
+            once with the situations needed for all the values in ``ks`` by
+            the calling process and then sent to each worker process, that only
+            computes situations that are still missing. Situations found by
+            the workers are merged back into ``detector_database``. Default to
+            ``None``, meaning that each worker computes all the detectors it
+            needs.
 
     Yields:
         a tuple containing the resulting circuit, the value of `k` that
         corresponds to the returned circuit and the value of `p` that corresponds
         to the returned circuit.
     """
-    with ProcessPoolExecutor(max_workers) as executor:
-        yield from executor.map(
-            functools.partial(
-                _parallel_func,
-                compiled_graph=compiled_graph,
-                noise_model_factory=noise_model_factory,
-                manhattan_radius=manhattan_radius,
-            ),
-            itertools.product(ks, ps),
-        )
+    for circuits in _generate_in_parallel(
+        _parallel_func,
+        compiled_graph,
+        list(ks),
+        list(ps),
+        noise_model_factory,
+        manhattan_radius,
+        max_workers,
+        detector_database,
+    ):
+        yield from circuits
 
 
 def generate_sinter_tasks(
@@ -98,6 +229,7 @@ def generate_sinter_tasks(
     noise_model_factory: Callable[[float], NoiseModel],
     manhattan_radius: int,
     max_workers: int | None = None,
+    detector_database: DetectorDatabase | None = None,
 ) -> Iterator[sinter.Task]:
     """Generate `sinter.Task` instances from the provided parameters.
 
@@ -124,16 +256,157 @@ def generate_sinter_tasks(
         max_workers: The maximum number of processes that can be used to
             execute the given calls. If None or not given then as many
             worker processes will be created as the machine has processors.
+        detector_database: an instance to retrieve from / store in detectors
+            that are computed as part of the circuit generation. It is filled
+            once with the situations needed for all the values in ``ks`` by
+            the calling process and then sent to each worker process, that only
+            computes situations that are still missing. Situations found by
+            the workers are merged back into ``detector_database``. Default to
+            ``None``, meaning that each worker computes all the detectors it
+            needs.
 
     Yields:
         tasks to be collected by a call to `sinter.collect`.
     """
     yield from (
-        sinter.Task(
-            circuit=circuit,
-            json_metadata={"d": 2 * k + 1, "r": 2 * k + 1, "p": p},
-        )
+        _make_sinter_task(circuit, k, p)
         for circuit, k, p in generate_stim_circuits_with_detectors(
-            compiled_graph, ks, ps, noise_model_factory, manhattan_radius, max_workers
+            compiled_graph,
+            ks,
+            ps,
+            noise_model_factory,
+            manhattan_radius,
+            max_workers,
+            detector_database,
         )
     )
+
+
+def generate_sinter_tasks_by_observable(
+    compiled_graph: CompiledGraph,
+    ks: Iterable[int],
+    ps: Iterable[float],
+    noise_model_factory: Callable[[float], NoiseModel],
+    manhattan_radius: int,
+    max_workers: int | None = None,
+    detector_database: DetectorDatabase | None = None,
+) -> Iterator[Iterator[sinter.Task]]:
+    """Generate `sinter.Task` instances for each observable of the provided
+    compiled graph, generating each circuit only once.
+
+    Circuits only differ between observables by their ``OBSERVABLE_INCLUDE``
+    instructions. This function generates the circuits with all the
+    observables of ``compiled_graph`` once and derives the circuit of each
+    observable with :func:`filter_observables`. The ``i``-th yielded iterator
+    yields the same tasks as :func:`generate_sinter_tasks` called with a graph
+    compiled with only the ``i``-th observable, up to their order.
+
+    Tasks are generated lazily: the circuits of the first ``k`` are available
+    as soon as they have been generated. For each value of ``k``, a
+    :class:`~tqec.noise_model.ParametricNoisyCircuit` is kept in memory until
+    the tasks of all the observables have been consumed, and the circuit of
+    each ``p`` is materialized and filtered when the corresponding task is
+    consumed.
+
+    Args:
+        compiled_graph: computation to export to `stim.Circuit` instances.
+        ks: values of `k` to consider.
+        ps: values of `p`, the noise strength, to consider.
+        noise_model_factory: a callable that builds a noise model from an input
+            strength `p`.
+        manhattan_radius: radius used to automatically compute detectors. The
+            best value to set this argument to is the minimum integer such that
+            flows generated from any given reset/measurement, from any plaquette
+            at any spatial/temporal place in the QEC computation, do not
+            propagate outside of the qubits used by plaquettes spatially located
+            at maximum `manhattan_radius` plaquettes from the plaquette the
+            reset/measurement belongs to (w.r.t. the Manhattan distance).
+            Default to 2, which is sufficient for regular surface code. If
+            negative, detectors are not computed automatically and are not added
+            to the generated circuits.
+        max_workers: The maximum number of processes that can be used to
+            execute the given calls. If None or not given then as many
+            worker processes will be created as the machine has processors.
+        detector_database: an instance to retrieve from / store in detectors
+            that are computed as part of the circuit generation. It is filled
+            once with the situations needed for all the values in ``ks`` by
+            the calling process and then sent to each worker process, that only
+            computes situations that are still missing. Situations found by
+            the workers are merged back into ``detector_database``. Default to
+            ``None``, meaning that each worker computes all the detectors it
+            needs.
+
+    Yields:
+        one iterator over tasks per observable in
+        ``compiled_graph.observables``, each to be collected by a call to
+        `sinter.collect`.
+    """
+    ps = list(ps)
+    noisy_circuits = _generate_in_parallel(
+        _parallel_parametric_func,
+        compiled_graph,
+        list(ks),
+        ps,
+        noise_model_factory,
+        manhattan_radius,
+        max_workers,
+        detector_database,
+    )
+    # Each copy of the iterator keeps the items it has not consumed yet, so the
+    # circuits are generated once and only for the first consumed observable.
+    for i, observable_noisy_circuits in enumerate(
+        itertools.tee(noisy_circuits, len(compiled_graph.observables))
+    ):
+        yield _iter_observable_tasks(observable_noisy_circuits, ps, i)
+
+
+def _iter_observable_tasks(
+    noisy_circuits: Iterator[_NoisyCircuitsOfK],
+    ps: list[float],
+    observable_index: int,
+) -> Iterator[sinter.Task]:
+    for circuits in noisy_circuits:
+        for p in ps:
+            circuit = filter_observables(circuits.materialize(p), observable_index)
+            yield _make_sinter_task(circuit, circuits.k, p)
+
+
+def _make_sinter_task(circuit: stim.Circuit, k: int, p: float) -> sinter.Task:
+    return sinter.Task(
+        circuit=circuit,
+        json_metadata={"d": 2 * k + 1, "r": 2 * k + 1, "p": p},
+    )
+
+
+def filter_observables(circuit: stim.Circuit, observable_index: int) -> stim.Circuit:
+    """Returns a copy of ``circuit`` that only includes one of its observables.
+
+    Args:
+        circuit: circuit to filter. ``REPEAT`` blocks are filtered recursively.
+        observable_index: index of the observable to keep. The
+            ``OBSERVABLE_INCLUDE`` instructions of this observable are kept and
+            re-indexed to ``0``, all the other ones are removed.
+
+    Returns:
+        a copy of ``circuit`` where the only observable is the one that was
+        indexed ``observable_index`` in ``circuit``.
+    """
+    ret = stim.Circuit()
+    for instruction in circuit:
+        if isinstance(instruction, stim.CircuitRepeatBlock):
+            ret.append(
+                stim.CircuitRepeatBlock(
+                    instruction.repeat_count,
+                    filter_observables(instruction.body_copy(), observable_index),
+                )
+            )
+        elif instruction.name == "OBSERVABLE_INCLUDE":
+            if int(instruction.gate_args_copy()[0]) == observable_index:
+                ret.append(
+                    stim.CircuitInstruction(
+                        "OBSERVABLE_INCLUDE", instruction.targets_copy(), [0]
+                    )
+                )
+        else:
+            ret.append(instruction)
+    return ret
@@ -0,0 +1,116 @@
+import stim
+
+from tqec.compile.compile import compile_block_graph
+from tqec.gallery.logical_cnot import logical_cnot_block_graph
+from tqec.noise_model import NoiseModel
+from tqec.simulation.generation import (
+    filter_observables,
+    generate_sinter_tasks_by_observable,
+    generate_stim_circuits_with_detectors,
+)
+
+
+def test_filter_observables() -> None:
+    circuit = stim.Circuit("""
+M 0 1
+OBSERVABLE_INCLUDE(0) rec[-1]
+OBSERVABLE_INCLUDE(1) rec[-2]
+REPEAT 2 {
+    M 0 1
+    OBSERVABLE_INCLUDE(1) rec[-1]
+    DETECTOR rec[-1] rec[-3]
+    OBSERVABLE_INCLUDE(0) rec[-2]
+}
+""")
+    assert filter_observables(circuit, 1) == stim.Circuit("""
+M 0 1
+OBSERVABLE_INCLUDE(0) rec[-2]
+REPEAT 2 {
+    M 0 1
+    OBSERVABLE_INCLUDE(0) rec[-1]
+    DETECTOR rec[-1] rec[-3]
+}
+""")
+    assert filter_observables(circuit, 0) == stim.Circuit("""
+M 0 1
+OBSERVABLE_INCLUDE(0) rec[-1]
+REPEAT 2 {
+    M 0 1
+    DETECTOR rec[-1] rec[-3]
+    OBSERVABLE_INCLUDE(0) rec[-2]
+}
+""")
+    assert filter_observables(circuit, 2) == stim.Circuit("""
+M 0 1
+REPEAT 2 {
+    M 0 1
+    DETECTOR rec[-1] rec[-3]
+}
+""")
+
+
+def test_filter_observables_matches_single_observable_compilation() -> None:
+    block_graph = logical_cnot_block_graph("X")
+    observables, _ = block_graph.get_abstract_observables()
+    compiled_graph = compile_block_graph(block_graph, observables=observables)
+    # Detectors do not depend on the observables, skip them to save time.
+    circuit = compiled_graph.generate_stim_circuit(1, manhattan_radius=-1)
+    for i, observable in enumerate(observables):
+        single_observable_circuit = compile_block_graph(
+            block_graph, observables=[observable]
+        ).generate_stim_circuit(1, manhattan_radius=-1)
+        assert filter_observables(circuit, i) == single_observable_circuit
+
+
+def test_generate_sinter_tasks_by_observable() -> None:
+    block_graph = logical_cnot_block_graph("X")
+    observables, _ = block_graph.get_abstract_observables()
+    compiled_graph = compile_block_graph(block_graph, observables=observables)
+    ps = [0.0, 0.001]
+    tasks_by_observable = generate_sinter_tasks_by_observable(
+        compiled_graph,
+        [1],
+        ps,
+        NoiseModel.uniform_depolarizing,
+        manhattan_radius=-1,
+        max_workers=1,
+    )
+    num_observables = 0
+    for observable, tasks in zip(observables, tasks_by_observable):
+        num_observables += 1
+        single_observable_graph = compile_block_graph(
+            block_graph, observables=[observable]
+        )
+        for task, p in zip(tasks, ps, strict=True):
+            assert task.json_metadata is not None
+            assert task.json_metadata["p"] == p
+            assert task.circuit == single_observable_graph.generate_stim_circuit(
+                1,
+                noise_model=NoiseModel.uniform_depolarizing(p),
+                manhattan_radius=-1,
+            )
+    assert num_observables == len(observables)
+
+
+def test_generate_stim_circuits_with_zero_noise() -> None:
+    block_graph = logical_cnot_block_graph("X")
+    compiled_graph = compile_block_graph(block_graph)
+    ps = [0.0, 0.001]
+    circuits = sorted(
+        generate_stim_circuits_with_detectors(
+            compiled_graph,
+            [1],
+            ps,
+            NoiseModel.uniform_depolarizing,
+            manhattan_radius=-1,
+            max_workers=1,
+        ),
+        key=lambda result: result[2],
+    )
+    noiseless_circuit = compiled_graph.generate_stim_circuit(1, manhattan_radius=-1)
+    assert [p for _, _, p in circuits] == ps
+    for (circuit, k, p), expected_p in zip(circuits, ps):
+        assert k == 1
+        assert circuit == NoiseModel.uniform_depolarizing(expected_p).noisy_circuit(
+            noiseless_circuit
+        )
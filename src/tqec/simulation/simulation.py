@@ -3,13 +3,15 @@ from typing import Callable, Iterable, Iterator, Sequence
 
 import sinter
 
+from tqec.compile.cache import CompilationCache
 from tqec.compile.compile import compile_block_graph
+from tqec.compile.detectors.database import DetectorDatabase
 from tqec.compile.specs.base import BlockBuilder, SubstitutionBuilder
 from tqec.compile.specs.library.css import CSS_BLOCK_BUILDER, CSS_SUBSTITUTION_BUILDER
 from tqec.computation.block_graph import BlockGraph
 from tqec.computation.abstract_observable import AbstractObservable
 from tqec.noise_model import NoiseModel
-from tqec.simulation.generation import generate_sinter_tasks
+from tqec.simulation.generation import generate_sinter_tasks_by_observable
 
 
 def start_simulation_using_sinter(
@@ -28,6 +30,8 @@ def start_simulation_using_sinter(
     decoders: Iterable[str] = ("pymatching",),
     print_progress: bool = False,
     custom_decoders: dict[str, sinter.Decoder | sinter.Sampler] | None = None,
+    detector_database: DetectorDatabase | None = None,
+    compilation_cache: CompilationCache | None = None,
 ) -> Iterator[list[sinter.TaskStats]]:
     """Helper to run `stim` simulations using `sinter`.
 
@@ -36,9 +40,10 @@ def start_simulation_using_sinter(
 
     It remove the need to generate the `stim.Circuit` instances in parallel (due
     to the relative inefficiency of detector annotation at the moment) by
-    importing and calling :func:`generate_sinter_tasks`. It also forwards
-    several parameters to :func:`sinter.collect`, but without showing in its
-    signature arguments that we do not envision using.
+    importing and calling :func:`generate_sinter_tasks_by_observable`, that
+    only generates the circuits once for all the observables. It also
+    forwards several parameters to :func:`sinter.collect`, but without showing
+    in its signature arguments that we do not envision using.
 
     Args:
         block_graph: a representation of the QEC computation to simulate.
@@ -86,42 +91,66 @@ def start_simulation_using_sinter(
             used if requested by name by a task or by the decoders list.
             If not specified, only decoders with support built into sinter, such
             as 'pymatching' and 'fusion_blossom', can be used.
+        detector_database: an instance to retrieve from / store in detectors
+            that are computed as part of the circuit generation. The same
+            instance is shared by all the observables. See
+            :func:`~tqec.simulation.generation.generate_sinter_tasks`.
+        compilation_cache: if provided, the abstract observables and the
+            compiled graph are retrieved from / stored in this on-disk cache, so
+            that simulating the same computation again skips the correlation
+            surface search and the compilation.
 
     Yields:
         one simulation result (of type `list[sinter.TaskStats]`) per provided
         observable in `observables`.
     """
     if observables is None:
-        observables, _ = block_graph.get_abstract_observables()
+        observables, _ = (
+            compilation_cache.get_abstract_observables(block_graph)
+            if compilation_cache is not None
+            else block_graph.get_abstract_observables()
+        )
+    if not observables:
+        return
 
-    for i, observable in enumerate(observables):
+    # Circuits only differ between observables by their OBSERVABLE_INCLUDE
+    # instructions, so compile and generate them once for all the observables.
+    compile_graph = (
+        compilation_cache.compile_block_graph
+        if compilation_cache is not None
+        else compile_block_graph
+    )
+    compiled_graph = compile_graph(
+        block_graph,
+        block_builder,
+        substitution_builder,
+        observables=observables,
+    )
+    tasks_by_observable = generate_sinter_tasks_by_observable(
+        compiled_graph,
+        ks,
+        ps,
+        noise_model_factory,
+        manhattan_radius,
+        max_workers=num_workers,
+        detector_database=detector_database,
+    )
+    num_tasks_by_observable = len(ks) * len(ps)
+    for i, tasks in enumerate(tasks_by_observable):
         if print_progress:
             print(
-                f"Generating statistics for observable {i+1}/{len(observables)}",
+                f"Generating statistics for observable {i + 1}/{len(observables)}",
                 end="\r",
             )
-        compiled_graph = compile_block_graph(
-            block_graph,
-            block_builder,
-            substitution_builder,
-            observables=[observable],
-        )
         stats = sinter.collect(
             num_workers=num_workers,
-            tasks=generate_sinter_tasks(
-                compiled_graph,
-                ks,
-                ps,
-                noise_model_factory,
-                manhattan_radius,
-                max_workers=num_workers,
-            ),
+            tasks=tasks,
             progress_callback=progress_callback,
             max_shots=max_shots,
             max_errors=max_errors,
             decoders=decoders,
             print_progress=print_progress,
             custom_decoders=custom_decoders,
-            hint_num_tasks=len(ks) * len(ps),
+            hint_num_tasks=num_tasks_by_observable,
         )
         yield stats
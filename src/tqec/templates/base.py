@@ -15,6 +15,7 @@ from tqec.templates.enums import TemplateOrientation
 from tqec.templates.subtemplates import (
     UniqueSubTemplates,
     get_spatially_distinct_subtemplates,
+    get_spatially_distinct_subtemplates_from_reference,
 )
 
 
@@ -35,6 +36,12 @@ class Template(ABC):
         """
         super().__init__()
         self._default_increments = default_increments or Displacement(2, 2)
+        # Reference sub-templates used by get_spatially_distinct_subtemplates,
+        # indexed by (reference_k, manhattan_radius, avoid_zero_plaquettes).
+        self._reference_subtemplates: dict[
+            tuple[int, int, bool],
+            tuple[list[npt.NDArray[numpy.int_]], UniqueSubTemplates],
+        ] = {}
 
     @abstractmethod
     def instantiate(
@@ -119,9 +126,16 @@ class Template(ABC):
         provided manhattan radius.
 
         Note:
-            This method will likely be inefficient for large templates (i.e., large
-            values of `k`) or for large Manhattan radiuses, both in terms of memory
-            used and computation time.
+            If the template implements :meth:`_get_subtemplate_features`, the
+            sub-templates are only searched once, in the instantiation of a
+            reference value of ``k`` that only depends on ``manhattan_radius``.
+            For any larger ``k``, the features of each entry are used to look up
+            its sub-template in the reference and the template is never
+            instantiated.
+
+            Otherwise, this method will likely be inefficient for large templates
+            (i.e., large values of `k`) or for large Manhattan radiuses, both in
+            terms of memory used and computation time.
             Subclasses are invited to reimplement that method using a specialized
             algorithm (or hard-coded values) to speed things up.
 
@@ -138,10 +152,96 @@ class Template(ABC):
         Returns:
             a representation of all the sub-templates found.
         """
+        reference_k = self._get_reference_k(k, manhattan_radius)
+        if k > reference_k:
+            features = self._get_subtemplate_features(
+                k, manhattan_radius, *self._get_entry_coordinates(k)
+            )
+            if features is not None:
+                key = (reference_k, manhattan_radius, avoid_zero_plaquettes)
+                if key not in self._reference_subtemplates:
+                    reference_features = self._get_subtemplate_features(
+                        reference_k,
+                        manhattan_radius,
+                        *self._get_entry_coordinates(reference_k),
+                    )
+                    assert reference_features is not None
+                    self._reference_subtemplates[key] = (
+                        reference_features,
+                        get_spatially_distinct_subtemplates(
+                            self.instantiate(reference_k),
+                            manhattan_radius,
+                            avoid_zero_plaquettes,
+                        ),
+                    )
+                reference_features, reference = self._reference_subtemplates[key]
+                subtemplates = get_spatially_distinct_subtemplates_from_reference(
+                    features, reference_features, reference
+                )
+                if subtemplates is not None:
+                    return subtemplates
         return get_spatially_distinct_subtemplates(
             self.instantiate(k), manhattan_radius, avoid_zero_plaquettes
         )
 
+    def _get_entry_coordinates(
+        self, k: int
+    ) -> tuple[npt.NDArray[numpy.int_], npt.NDArray[numpy.int_]]:
+        """Returns the row and column of each entry of the array that would be
+        returned by :meth:`instantiate`."""
+        rows, cols = numpy.indices(self.shape(k).to_numpy_shape(), dtype=numpy.int_)
+        return rows, cols
+
+    @staticmethod
+    def _get_reference_k(k: int, manhattan_radius: int) -> int:
+        """Returns the value of ``k`` used to compute the reference sub-templates
+        in :meth:`get_spatially_distinct_subtemplates`.
+
+        It should be large enough for any feature combination that can be found
+        in an instantiation with a larger ``k`` to also be found in the reference
+        instantiation. If that is not the case, the reference lookup fails and
+        the sub-templates are computed from a full instantiation.
+
+        The returned value has the same parity as ``k`` because the center of
+        some templates (e.g., the crossing of the diagonals in
+        :class:`~tqec.templates.qubit.Qubit4WayJunctionTemplate`) depends on
+        that parity.
+        """
+        minimum_k = 6 * manhattan_radius + 6
+        return minimum_k + (k - minimum_k) % 2
+
+    def _get_subtemplate_features(
+        self,
+        k: int,
+        manhattan_radius: int,
+        rows: npt.NDArray[numpy.int_],
+        cols: npt.NDArray[numpy.int_],
+    ) -> list[npt.NDArray[numpy.int_]] | None:
+        """Returns features describing the neighbourhood of the provided
+        coordinates.
+
+        Subclasses with a regular structure are invited to override this method
+        to speed up :meth:`get_spatially_distinct_subtemplates`.
+
+        Args:
+            k: scaling parameter used to instantiate the template.
+            manhattan_radius: radius of the considered sub-templates.
+            rows: row of each considered entry in the instantiation. Might be
+                out of the instantiation bounds.
+            cols: column of each considered entry in the instantiation, with the
+                same shape as ``rows``. Might be out of the instantiation bounds.
+
+        Returns:
+            ``None`` if the template does not provide any feature, which is the
+            default. Else, a list of arrays of the same shape as ``rows`` such
+            that two entries with the same features, possibly computed for two
+            different values of ``k`` with the same parity that are at least
+            ``self._get_reference_k(k, manhattan_radius)``, are the centers of the
+            same sub-template of radius ``manhattan_radius`` in their respective
+            instantiations padded with an infinite amount of ``0``.
+        """
+        return None
+
     def instantiation_origin(self, k: int) -> Position2D:
         """Coordinates of the top-left entry origin.
 
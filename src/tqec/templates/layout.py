@@ -250,6 +250,58 @@ class LayoutTemplate(RectangularTemplate):
             ] = element_instantiation
         return ret
 
+    @override
+    def _get_subtemplate_features(
+        self,
+        k: int,
+        manhattan_radius: int,
+        rows: npt.NDArray[numpy.int_],
+        cols: npt.NDArray[numpy.int_],
+    ) -> list[npt.NDArray[numpy.int_]] | None:
+        element_shape = self.element_shape(k)
+        # Number of neighbouring elements that a sub-template centered in an
+        # element can overlap with, in each direction.
+        reach = -(-manhattan_radius // min(element_shape.x, element_shape.y))
+        element_rows = numpy.clip(rows // element_shape.y, -reach - 1, self._ny + reach)
+        element_cols = numpy.clip(cols // element_shape.x, -reach - 1, self._nx + reach)
+        local_rows = rows - element_rows * element_shape.y
+        local_cols = cols - element_cols * element_shape.x
+        # The sub-template centered on an entry is the sum of the (zero-padded)
+        # sub-templates of all the elements it overlaps with. The features of an
+        # entry are the position of its element and the features of each of the
+        # neighbouring elements, the presence and type of which is fixed by the
+        # element position.
+        no_entry = numpy.zeros((0,), dtype=numpy.int_)
+        num_features = 0
+        for element in self._layout.values():
+            features = element._get_subtemplate_features(
+                k, manhattan_radius, no_entry, no_entry
+            )
+            if features is None:
+                return None
+            num_features = max(num_features, len(features))
+        slots: list[list[npt.NDArray[numpy.int_]]] = []
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                slot = [numpy.zeros_like(rows) for _ in range(num_features)]
+                for pos, element in self._layout.items():
+                    mask = (element_rows + dy == pos.y - self._origin_shift.y) & (
+                        element_cols + dx == pos.x - self._origin_shift.x
+                    )
+                    if not numpy.any(mask):
+                        continue
+                    features = element._get_subtemplate_features(
+                        k,
+                        manhattan_radius,
+                        local_rows[mask] - dy * element_shape.y,
+                        local_cols[mask] - dx * element_shape.x,
+                    )
+                    assert features is not None
+                    for feature, values in zip(slot, features):
+                        feature[mask] = values
+                slots.append(slot)
+        return [element_rows, element_cols] + [f for slot in slots for f in slot]
+
     @override
     def instantiation_origin(self, k: int) -> Position2D:
         origin_shift = self.origin_shift
@@ -8,10 +8,35 @@ import numpy.typing as npt
 from typing_extensions import override
 
 from tqec.exceptions import TQECWarning
+from tqec.position import Shape2D
 from tqec.scale import LinearFunction, Scalable2D
 from tqec.templates.base import RectangularTemplate
 
 
+def _get_border_features(
+    shape: Shape2D,
+    manhattan_radius: int,
+    rows: npt.NDArray[numpy.int_],
+    cols: npt.NDArray[numpy.int_],
+) -> list[npt.NDArray[numpy.int_]]:
+    """Returns features describing the position of the provided coordinates
+    with respect to the borders of a template with the provided ``shape`` and a
+    bulk that is periodic with period ``2`` in both dimensions.
+
+    The distances to the 4 borders are clipped to ``manhattan_radius + 1``
+    because a sub-template only sees the borders that are closer than that.
+    """
+    bound = manhattan_radius + 1
+    return [
+        numpy.clip(rows, -bound, bound),
+        numpy.clip(shape.y - 1 - rows, -bound, bound),
+        numpy.clip(cols, -bound, bound),
+        numpy.clip(shape.x - 1 - cols, -bound, bound),
+        rows % 2,
+        cols % 2,
+    ]
+
+
 class QubitTemplate(RectangularTemplate):
     """An error-corrected qubit.
 
@@ -69,6 +94,16 @@ class QubitTemplate(RectangularTemplate):
     def expected_plaquettes_number(self) -> int:
         return 14
 
+    @override
+    def _get_subtemplate_features(
+        self,
+        k: int,
+        manhattan_radius: int,
+        rows: npt.NDArray[numpy.int_],
+        cols: npt.NDArray[numpy.int_],
+    ) -> list[npt.NDArray[numpy.int_]]:
+        return _get_border_features(self.shape(k), manhattan_radius, rows, cols)
+
 
 class Qubit4WayJunctionTemplate(RectangularTemplate):
     """An error-corrected qubit that is making a 4-way junction with other
@@ -164,3 +199,21 @@ class Qubit4WayJunctionTemplate(RectangularTemplate):
     @override
     def expected_plaquettes_number(self) -> int:
         return 15
+
+    @override
+    def _get_subtemplate_features(
+        self,
+        k: int,
+        manhattan_radius: int,
+        rows: npt.NDArray[numpy.int_],
+        cols: npt.NDArray[numpy.int_],
+    ) -> list[npt.NDArray[numpy.int_]]:
+        shape = self.shape(k)
+        # The bulk also depends on the position with respect to the two
+        # diagonals. Moving in a sub-template changes the (anti-)diagonal
+        # coordinate by at most 2 * manhattan_radius.
+        bound = 2 * manhattan_radius + 1
+        return _get_border_features(shape, manhattan_radius, rows, cols) + [
+            numpy.clip(rows - cols, -bound, bound),
+            numpy.clip(rows + cols - (shape.x - 1), -bound, bound),
+        ]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Iterable, Sequence
 
 import numpy
 import numpy.typing as npt
@@ -120,6 +120,70 @@ class UniqueSubTemplates:
         return height // 2
 
 
+def _lexicographic_ranks(
+    columns: Iterable[npt.NDArray[numpy.int_]],
+) -> npt.NDArray[numpy.int_]:
+    """Returns the rank of each row of the matrix formed by the provided
+    ``columns`` among the distinct rows of that matrix, in lexicographic order.
+
+    The matrix is never built. Instead, ranks are refined column by column: the
+    rank of each row over the first ``c`` columns is combined with the values of
+    the next columns into a single ``numpy.int64`` key and ``numpy.unique`` is
+    used to compute the rank over the extended prefix. As many columns as
+    possible are packed in each key without overflowing, so the number of calls
+    to ``numpy.unique`` is usually much lower than the number of columns.
+
+    Columns are consumed one at a time and at most one of them is kept between
+    two refinements, so ``columns`` can be a generator building each column
+    lazily to keep the memory usage independent of the number of columns.
+
+    Args:
+        columns: 1-dimensional arrays of integers, all of the same length
+            ``N``.
+
+    Returns:
+        a 1-dimensional array of length ``N`` such that ``ret[i] == ret[j]`` if
+        and only if rows ``i`` and ``j`` are equal, and ``ret[i] < ret[j]`` if and
+        only if row ``i`` is lexicographically smaller than row ``j``. Ranks are
+        contiguous and start at ``0``.
+    """
+    column_iterator = iter(columns)
+    first_column = next(column_iterator, None)
+    if first_column is None:
+        raise TQECException("Cannot compute ranks without any column.")
+    num_rows = first_column.shape[0]
+    ranks: npt.NDArray[numpy.int64] = numpy.zeros((num_rows,), dtype=numpy.int64)
+    if num_rows == 0:
+        return ranks
+
+    def shift(column: npt.NDArray[numpy.int_]) -> tuple[npt.NDArray[numpy.int64], int]:
+        # Shift the column to only have non-negative values, which preserves
+        # the order, and return the base needed to pack it in a key.
+        shifted_column = column.astype(numpy.int64)
+        shifted_column -= int(shifted_column.min())
+        return shifted_column, int(shifted_column.max()) + 1
+
+    limit = numpy.iinfo(numpy.int64).max
+    pending: tuple[npt.NDArray[numpy.int64], int] | None = shift(first_column)
+    while pending is not None:
+        # Always include at least one column to make progress.
+        column, base = pending
+        key = ranks * base + column
+        key_bound = (int(ranks.max()) + 1) * base
+        pending = None
+        for next_column in column_iterator:
+            column, base = shift(next_column)
+            if key_bound * base > limit:
+                pending = (column, base)
+                break
+            key *= base
+            key += column
+            key_bound *= base
+        _, inverse = numpy.unique(key, return_inverse=True)
+        ranks = inverse.reshape((num_rows,)).astype(numpy.int64)
+    return ranks
+
+
 def get_spatially_distinct_subtemplates(
     instantiation: npt.NDArray[numpy.int_],
     manhattan_radius: int = 1,
@@ -129,52 +193,24 @@ def get_spatially_distinct_subtemplates(
     provided manhattan radius.
 
     Note:
-        This function will likely be inefficient for large templates (i.e.,
-        large values of :math:`k`) or for large Manhattan radiuses, both in
-        terms of memory used and computation time.
-
-        Right now, with
+        With
 
         - :math:`n` the width of the provided ``instantiation`` array,
         - :math:`m` the height of the provided ``instantiation`` array,
         - :math:`r` the provided Manhattan radius,
 
-        it takes of the order of :math:`n m (2r+1)^2` memory and has to sort an
-        array of :math:`nm` elements of size :math:`(2r+1)^2` in lexicographic
-        order so require, in the worst case,
-        :math:`O\\left(nm\\log(nm) (2r+1)^2\\right)` runtime.
+        this function never copies the :math:`nm` windows of size
+        :math:`(2r+1)^2`. Windows are accessed through a zero-copy
+        ``numpy.lib.stride_tricks.sliding_window_view`` and compared one
+        entry at a time by refining their lexicographic rank (see
+        :func:`_lexicographic_ranks`). Memory usage is of the order of
+        :math:`nm` and the runtime is, in the worst case,
+        :math:`O\\left(nm\\log(nm) (2r+1)^2\\right)`, but several window
+        entries are processed by each sort in practice.
 
         Subclasses are invited to reimplement that method using a specialized
         algorithm (or hard-coded values) to speed things up.
 
-        Some timings obtained on an AMD Ryzen 9 5950X: ::
-
-            k = 10
-            ----------------------------------------------------------------------
-            radius   =         0 |         1 |         2 |         3 |         4
-            time (s) =  0.000776 |  0.000992 |   0.00151 |   0.00227 |   0.00321
-            ----------------------------------------------------------------------
-            k = 20
-            ----------------------------------------------------------------------
-            radius   =         0 |         1 |         2 |         3 |         4
-            time (s) =   0.00202 |   0.00356 |   0.00672 |    0.0116 |    0.0173
-            ----------------------------------------------------------------------
-            k = 40
-            ----------------------------------------------------------------------
-            radius   =         0 |         1 |         2 |         3 |         4
-            time (s) =   0.00778 |    0.0156 |    0.0326 |    0.0574 |    0.0889
-            ----------------------------------------------------------------------
-            k = 80
-            ----------------------------------------------------------------------
-            radius   =         0 |         1 |         2 |         3 |         4
-            time (s) =    0.0318 |    0.0706 |     0.147 |      0.27 |     0.426
-            ----------------------------------------------------------------------
-            k = 160
-            ----------------------------------------------------------------------
-            radius   =         0 |         1 |         2 |         3 |         4
-            time (s) =     0.139 |     0.309 |     0.651 |      1.25 |      1.98
-            ----------------------------------------------------------------------
-
     Args:
         instantiation: a 2-dimensional array representing the instantiated
             template on which sub-templates should be computed.
@@ -189,58 +225,117 @@ def get_spatially_distinct_subtemplates(
         a representation of all the sub-templates found.
     """
     y, x = instantiation.shape
+    width = 2 * manhattan_radius + 1
     extended_instantiation = numpy.pad(
         instantiation, manhattan_radius, "constant", constant_values=0
     )
-
-    all_possible_subarrays: list[SubTemplateType] = []
-    ignored_flattened_indices: list[int] = []
-    considered_flattened_indices: list[int] = []
-    for i in range(manhattan_radius, manhattan_radius + y):
-        for j in range(manhattan_radius, manhattan_radius + x):
-            # Do not generate anything if the center plaquette is 0 in the
-            # original instantiation.
-            if avoid_zero_plaquettes and extended_instantiation[i, j] == 0:
-                ignored_flattened_indices.append(
-                    (i - manhattan_radius) * x + (j - manhattan_radius)
-                )
-                continue
-            considered_flattened_indices.append(
-                (i - manhattan_radius) * x + (j - manhattan_radius)
-            )
-            all_possible_subarrays.append(
-                extended_instantiation[
-                    i - manhattan_radius : i + manhattan_radius + 1,
-                    j - manhattan_radius : j + manhattan_radius + 1,
-                ]
-            )
-    # Shape of the array provided to numpy.unique:
-    #    (x * y, 2 * manhattan_radius + 1, 2 * manhattan_radius + 1)
-    # Calling numpy.unique
-    unique_situations, inverse_indices = numpy.unique(
-        all_possible_subarrays, axis=0, return_inverse=True
+    # Zero-copy view of shape (y, x, width, width) such that windows[i, j] is
+    # the sub-template centered on instantiation[i, j].
+    windows = numpy.lib.stride_tricks.sliding_window_view(
+        extended_instantiation, (width, width)
     )
-
-    # Note that the `inverse_indices` DO NOT include the ignored sub-templates because
-    # their center was a 0 plaquette if `avoid_zero_plaquettes` is `True` so we
-    # should reconstruct the full indices from `inverse_indices` and
-    # `ignored_flattened_indices`.
-    # By convention, the index 0 will represent the ignored sub-templates, so we
-    # also have to shift the `inverse_indices` and `unique_situations` keys by 1.
-    # Start by shifting by 1.
-    inverse_indices += 1
-    subtemplates_by_indices = {
-        i + 1: situation for i, situation in enumerate(unique_situations)
-    }
+    # Do not consider anything if the center plaquette is 0 in the original
+    # instantiation.
     if avoid_zero_plaquettes:
-        final_indices = numpy.zeros((y * x,), dtype=numpy.int_)
-        final_indices[ignored_flattened_indices] = 0
-        final_indices[considered_flattened_indices] = inverse_indices
+        considered_flattened_indices = numpy.flatnonzero(instantiation)
     else:
-        final_indices = inverse_indices.astype(numpy.int_)
+        considered_flattened_indices = numpy.arange(y * x)
+
+    # Each window entry is extracted as a 1-dimensional column, in row-major
+    # order over the window, so that ranks follow the lexicographic order that
+    # would be obtained by sorting the flattened windows. Columns are built
+    # lazily, one at a time, by the ranking.
+    columns = (
+        windows[:, :, wi, wj].reshape(-1)[considered_flattened_indices]
+        for wi in range(width)
+        for wj in range(width)
+    )
+    ranks = _lexicographic_ranks(columns)
+    _, first_occurrences = numpy.unique(ranks, return_index=True)
+
+    # By convention, the index 0 will represent the ignored sub-templates, so we
+    # have to shift the ranks by 1.
+    subtemplates_by_indices: dict[int, SubTemplateType] = {}
+    for rank, occurrence in enumerate(first_occurrences):
+        i, j = divmod(int(considered_flattened_indices[occurrence]), x)
+        subtemplates_by_indices[rank + 1] = windows[i, j].copy()
+    final_indices = numpy.zeros((y * x,), dtype=numpy.int_)
+    final_indices[considered_flattened_indices] = ranks + 1
     return UniqueSubTemplates(final_indices.reshape((y, x)), subtemplates_by_indices)
 
 
+def get_spatially_distinct_subtemplates_from_reference(
+    features: Sequence[npt.NDArray[numpy.int_]],
+    reference_features: Sequence[npt.NDArray[numpy.int_]],
+    reference: UniqueSubTemplates,
+) -> UniqueSubTemplates | None:
+    """Returns a representation of all the distinct sub-templates of a template
+    instantiation that is never built, using the sub-templates of a reference
+    instantiation.
+
+    This function expects one or more "feature" arrays describing each entry of
+    the (not built) template instantiation and of the reference instantiation.
+    Features should be chosen such that two entries with the same features (in
+    the same or in different instantiations) are guaranteed to be the center of
+    the same sub-template. Each entry of the template instantiation then simply
+    takes the sub-template index of a reference entry with the same features.
+
+    Args:
+        features: 2-dimensional arrays, all of the same shape as the template
+            instantiation, containing the features of each entry.
+        reference_features: 2-dimensional arrays, all of the same shape as the
+            reference instantiation, containing the features of each entry of the
+            reference instantiation, in the same order as ``features``.
+        reference: the sub-templates of the reference instantiation, as
+            returned by :func:`get_spatially_distinct_subtemplates`.
+
+    Raises:
+        TQECException: if ``features`` and ``reference_features`` do not have
+            the same number of entries.
+
+    Returns:
+        a representation of all the sub-templates found, exactly equal to the
+        one that :func:`get_spatially_distinct_subtemplates` would return on the
+        template instantiation, or ``None`` if at least one entry does not have
+        any counterpart with the same features in the reference instantiation.
+    """
+    if len(features) != len(reference_features) or not features:
+        raise TQECException(
+            "Expected the same non-zero number of features for the template and "
+            f"the reference. Got {len(features)} and {len(reference_features)}."
+        )
+    y, x = features[0].shape
+    num_reference_entries = reference.subtemplate_indices.size
+    ranks = _lexicographic_ranks(
+        numpy.concatenate([ref.reshape(-1), f.reshape(-1)])
+        for f, ref in zip(features, reference_features)
+    )
+    reference_ranks = ranks[:num_reference_entries]
+    ranks = ranks[num_reference_entries:]
+    # Sub-template index of the reference entries with a given rank, or -1 if
+    # the rank does not appear in the reference.
+    index_by_rank = numpy.full(
+        (int(max(reference_ranks.max(), ranks.max(initial=0))) + 1,),
+        -1,
+        dtype=numpy.int_,
+    )
+    index_by_rank[reference_ranks] = reference.subtemplate_indices.reshape(-1)
+    reference_indices = index_by_rank[ranks]
+    if numpy.any(reference_indices < 0):
+        return None
+    # Some of the reference sub-templates might not be present. Renumbering the
+    # remaining ones in increasing order gives back the lexicographic numbering
+    # of get_spatially_distinct_subtemplates.
+    used_indices = numpy.unique(reference_indices)
+    used_indices = used_indices[used_indices != 0]
+    new_indices = numpy.zeros((int(index_by_rank.max()) + 1,), dtype=numpy.int_)
+    new_indices[used_indices] = numpy.arange(1, used_indices.size + 1)
+    return UniqueSubTemplates(
+        new_indices[reference_indices].reshape((y, x)),
+        {int(new_indices[i]): reference.subtemplates[int(i)] for i in used_indices},
+    )
+
+
 @dataclass(frozen=True)
 class Unique3DSubTemplates:
     """Stores information on the sub-templates of a specific spatial radius
@@ -340,21 +435,18 @@ def get_spatially_distinct_3d_subtemplates(
     of the provided manhattan radius.
 
     Note:
-        This function will likely be inefficient for large templates (i.e.,
-        large values of :math:`k`) or for large Manhattan radiuses, both in
-        terms of memory used and computation time.
-
-        Right now, with
+        With
 
         - :math:`n` the width of the ``instantiations`` array entries,
         - :math:`m` the height of the ``instantiations`` array entries,
         - :math:`t` the number of time slices (``len(instantiations)``),
         - :math:`r` the provided Manhattan radius,
 
-        it takes of the order of up to :math:`nmt(2r+1)^2` memory, has to sort
-        :math:`t` arrays of :math:`nm` elements of size :math:`(2r+1)^2` in
-        lexicographic order, so require, in the worst case,
-        :math:`O\\left(tnm\\log(nm)(2r+1)^2\\right)` runtime.
+        this function calls :func:`get_spatially_distinct_subtemplates` on each
+        time slice and then combines the :math:`t` resulting 2-dimensional
+        sub-template indices with :func:`_lexicographic_ranks`. Memory usage is
+        of the order of :math:`nmt` and the runtime is, in the worst case,
+        :math:`O\\left(tnm\\log(nm)(2r+1)^2\\right)`.
 
     Warning:
         This function assumes that the provided ``instantiations`` are compatible
@@ -386,34 +478,55 @@ def get_spatially_distinct_3d_subtemplates(
         )
         for inst in instantiations
     ]
+    return stack_spatially_distinct_subtemplates(unique_2d_subtemplates)
+
 
+def stack_spatially_distinct_subtemplates(
+    unique_2d_subtemplates: Sequence[UniqueSubTemplates],
+) -> Unique3DSubTemplates:
+    """Combines the 2-dimensional sub-templates of several stacked
+    instantiations into 3-dimensional sub-templates.
+
+    Warning:
+        The provided sub-templates should have been computed on compatible
+        instantiations. See :func:`get_spatially_distinct_3d_subtemplates`.
+
+    Args:
+        unique_2d_subtemplates: the 2-dimensional sub-templates of each of the
+            stacked instantiations, in time order. They should all have the
+            same Manhattan radius and their ``subtemplate_indices`` should all
+            have the same shape.
+
+    Returns:
+        the same representation of all the 3-dimensional sub-templates found
+        as :func:`get_spatially_distinct_3d_subtemplates`.
+    """
+    manhattan_radius = unique_2d_subtemplates[0].manhattan_radius
     subtemplates_indices = numpy.stack(
         [u2ds.subtemplate_indices for u2ds in unique_2d_subtemplates], axis=2
     )
     n, m, t = subtemplates_indices.shape
-    subtemplates: dict[tuple[int, ...], npt.NDArray[numpy.int_]] = {}
+    flattened_indices = subtemplates_indices.reshape(n * m, t)
+    ranks = _lexicographic_ranks(flattened_indices[:, i] for i in range(t))
+    _, first_occurrences = numpy.unique(ranks, return_index=True)
 
-    unique_3d_indices = numpy.unique(subtemplates_indices.reshape(n * m, t), axis=0)
     # We might have 0 indices on some 2-dimensional slices. Because 0 will not be
     # a valid index for the 2-dimensional subtemplates we got from
     # get_spatially_distinct_subtemplates, pre-generate the corresponding array.
     zeros_2d = numpy.zeros(
         (2 * manhattan_radius + 1, 2 * manhattan_radius + 1), dtype=numpy.int_
     )
-    for indices in unique_3d_indices:
+    subtemplates: dict[tuple[int, ...], npt.NDArray[numpy.int_]] = {}
+    for occurrence in first_occurrences:
+        indices = tuple(int(i) for i in flattened_indices[occurrence])
         if all(i == 0 for i in indices):
             continue
-        # Get the list of subtemplates that should be stacked in the time dimension.
-        subtemplates_2d_to_stack: list[npt.NDArray[numpy.int_]] = []
-        for t, i in enumerate(indices):
-            if i == 0:
-                subtemplates_2d_to_stack.append(zeros_2d)
-            else:
-                subtemplates_2d_to_stack.append(
-                    unique_2d_subtemplates[t].subtemplates[i]
-                )
         # Stack the 2-dimensional subtemplates into a 3-dimensional one.
-        subtemplate = numpy.stack(subtemplates_2d_to_stack, axis=2)
-        # Add the 3-dimensional subtemplate to the mapping.
-        subtemplates[tuple(indices)] = subtemplate
+        subtemplates[indices] = numpy.stack(
+            [
+                zeros_2d if i == 0 else unique_2d_subtemplates[ti].subtemplates[i]
+                for ti, i in enumerate(indices)
+            ],
+            axis=2,
+        )
     return Unique3DSubTemplates(subtemplates_indices, subtemplates)
@@ -12,8 +12,10 @@ from tqec.templates.qubit import (
     QubitTemplate,
 )
 from tqec.templates.subtemplates import (
+    _lexicographic_ranks,  # pyright: ignore[reportPrivateUsage]
     get_spatially_distinct_3d_subtemplates,
     get_spatially_distinct_subtemplates,
+    get_spatially_distinct_subtemplates_from_reference,
 )
 
 _TEMPLATES_TO_TEST = [
@@ -168,3 +170,87 @@ def test_get_spatially_distinct_3d_subtemplates(
     right_border = instantiation_reconstruction[:, r + m :, :]
     for border in [top_border, bottom_border, left_border, right_border]:
         numpy.testing.assert_array_equal(border, numpy.zeros_like(border))
+
+
+def test_lexicographic_ranks() -> None:
+    rng = numpy.random.default_rng(42)
+    rows = rng.integers(-3, 4, size=(500, 30))
+    ranks = _lexicographic_ranks([rows[:, i] for i in range(rows.shape[1])])
+    _, expected_ranks = numpy.unique(rows, axis=0, return_inverse=True)
+    numpy.testing.assert_array_equal(ranks, expected_ranks.reshape(-1))
+
+
+def test_spatially_distinct_subtemplates_lexicographic_order() -> None:
+    instantiation = QubitTemplate().instantiate(4)
+    unique_subtemplates = get_spatially_distinct_subtemplates(instantiation, 2)
+    flattened = [
+        tuple(unique_subtemplates.subtemplates[i].reshape(-1))
+        for i in sorted(unique_subtemplates.subtemplates)
+    ]
+    assert flattened == sorted(flattened)
+
+
+@pytest.mark.parametrize(
+    "template,r,avoid_zero_plaquettes",
+    itertools.product(
+        _TEMPLATES_TO_TEST
+        + [
+            LayoutTemplate(
+                {
+                    Position2D(0, 0): QubitTemplate(),
+                    Position2D(1, 0): Qubit4WayJunctionTemplate(),
+                    Position2D(1, 1): QubitTemplate(),
+                    Position2D(3, 1): QubitTemplate(),
+                }
+            )
+        ],
+        _VALUES_OF_MANHATTAN_RADIUS_TO_TEST,
+        [True, False],
+    ),
+)
+def test_template_spatially_distinct_subtemplates_from_reference(
+    template: Template, r: int, avoid_zero_plaquettes: bool
+) -> None:
+    reference_k = 6 * r + 6
+    for k in [reference_k + 1, reference_k + 2, reference_k + 3, reference_k + 10]:
+        expected = get_spatially_distinct_subtemplates(
+            template.instantiate(k), r, avoid_zero_plaquettes
+        )
+        unique_subtemplates = template.get_spatially_distinct_subtemplates(
+            k, r, avoid_zero_plaquettes
+        )
+        numpy.testing.assert_array_equal(
+            unique_subtemplates.subtemplate_indices, expected.subtemplate_indices
+        )
+        assert unique_subtemplates.subtemplates.keys() == expected.subtemplates.keys()
+        for i, subtemplate in expected.subtemplates.items():
+            numpy.testing.assert_array_equal(
+                unique_subtemplates.subtemplates[i], subtemplate
+            )
+
+
+def test_template_spatially_distinct_subtemplates_does_not_instantiate(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    template = QubitTemplate()
+    # Warm up the reference sub-templates.
+    template.get_spatially_distinct_subtemplates(20, 2)
+
+    def _fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("Should not instantiate the template.")
+
+    monkeypatch.setattr(template, "instantiate", _fail)
+    unique_subtemplates = template.get_spatially_distinct_subtemplates(200, 2)
+    assert unique_subtemplates.subtemplate_indices.shape == (402, 402)
+
+
+def test_get_spatially_distinct_subtemplates_from_reference_missing_features() -> None:
+    instantiation = QubitTemplate().instantiate(2)
+    reference = get_spatially_distinct_subtemplates(instantiation, 1)
+    reference_features = [numpy.zeros_like(instantiation)]
+    assert (
+        get_spatially_distinct_subtemplates_from_reference(
+            [numpy.ones((3, 3), dtype=numpy.int_)], reference_features, reference
+        )
+        is None
+    )